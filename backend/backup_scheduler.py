@@ -9,6 +9,7 @@ import io
 from motor.motor_asyncio import AsyncIOMotorClient
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
+from payload_store import expand_payload
 
 logger = logging.getLogger(__name__)
 
@@ -37,7 +38,7 @@ class BackupScheduler:
                 "created_at": datetime.now(timezone.utc).isoformat(),
                 "users": await self.db.users.find({}, {"_id": 0, "password_hash": 0}).to_list(1000),
                 "webhook_endpoints": await self.db.webhook_endpoints.find({}, {"_id": 0}).to_list(1000),
-                "webhook_logs": await self.db.webhook_logs.find({}, {"_id": 0}).sort("timestamp", -1).limit(1000).to_list(1000),
+                "webhook_logs": [expand_payload(log) for log in await self.db.webhook_logs.find({}, {"_id": 0}).sort("timestamp", -1).limit(1000).to_list(1000)],
                 "api_keys": []
             }
             
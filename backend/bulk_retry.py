@@ -0,0 +1,203 @@
+"""
+Bulk Retry Module
+Replays failed webhook logs as a background job: logs matching a filter are
+streamed from webhook_logs and replayed with bounded concurrency and a
+per-integration rate limit, with progress persisted in retry_jobs.
+"""
+
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, Any, Optional
+
+from pymongo.errors import PyMongoError
+
+logger = logging.getLogger(__name__)
+
+# Replays per second per integration (None = unlimited)
+DEFAULT_RATE_LIMITS: Dict[str, float] = {
+    "sendgrid": 10,
+    "discord": 5,
+    "slack": 1,
+    "telegram": 20,
+    "ntfy": 5,
+}
+
+RUNNING = "running"
+COMPLETED = "completed"
+CANCELLED = "cancelled"
+INTERRUPTED = "interrupted"
+FAILED = "failed"
+
+ReplayHandler = Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+
+def parse_rate_limits(value: str) -> Dict[str, float]:
+    """Parse "sendgrid=10,slack=1" into a rate limit mapping"""
+    limits = {}
+    for item in value.split(','):
+        if '=' in item:
+            name, rate = item.split('=', 1)
+            limits[name.strip()] = float(rate)
+    return limits
+
+
+class _IntervalLimiter:
+    """Spaces calls at least 1/rate seconds apart"""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            now = loop.time()
+            if self._next > now:
+                await asyncio.sleep(self._next - now)
+                now = self._next
+            self._next = now + self.interval
+
+
+class BulkRetryManager:
+    """Runs and tracks bulk replay jobs"""
+
+    def __init__(self, db, replay: ReplayHandler, concurrency: int = 5,
+                 rate_limits: Optional[Dict[str, float]] = None, progress_interval: float = 1.0):
+        self.db = db
+        self.collection = db.retry_jobs
+        self.replay = replay
+        self.concurrency = concurrency
+        self.rate_limits = {**DEFAULT_RATE_LIMITS, **(rate_limits or {})}
+        self.progress_interval = progress_interval
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    async def initialize(self):
+        """Mark jobs left running by a previous process as interrupted"""
+        await self.collection.update_many(
+            {"status": RUNNING},
+            {"$set": {"status": INTERRUPTED, "finished_at": datetime.now(timezone.utc)}}
+        )
+
+    async def start_job(self, query: Dict[str, Any], created_by: str, limit: Optional[int] = None) -> Dict[str, Any]:
+        total = await self.db.webhook_logs.count_documents(query)
+        if limit:
+            total = min(total, limit)
+        now = datetime.now(timezone.utc)
+        job = {
+            "id": str(uuid.uuid4()),
+            "status": RUNNING,
+            "total": total,
+            "processed": 0,
+            "succeeded": 0,
+            "failed": 0,
+            "skipped": 0,
+            "concurrency": self.concurrency,
+            "created_by": created_by,
+            "created_at": now,
+            "updated_at": now,
+            "finished_at": None,
+            "error": None
+        }
+        await self.collection.insert_one(dict(job))
+        self._tasks[job['id']] = asyncio.create_task(self._run(job, query, limit))
+        return job
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return await self.collection.find_one({"id": job_id}, {"_id": 0})
+
+    async def list(self, limit: int = 20):
+        return await self.collection.find({}, {"_id": 0}).sort("created_at", -1).limit(limit).to_list(limit)
+
+    def cancel(self, job_id: str) -> bool:
+        task = self._tasks.get(job_id)
+        if not task or task.done():
+            return False
+        task.cancel()
+        return True
+
+    async def stop(self):
+        for task in list(self._tasks.values()):
+            task.cancel()
+        for task in list(self._tasks.values()):
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks.clear()
+
+    def _limiter(self, limiters: Dict[str, _IntervalLimiter], integration: str) -> Optional[_IntervalLimiter]:
+        rate = self.rate_limits.get(integration)
+        if not rate:
+            return None
+        if integration not in limiters:
+            limiters[integration] = _IntervalLimiter(rate)
+        return limiters[integration]
+
+    async def _save_progress(self, job: Dict[str, Any], **fields):
+        job.update(fields)
+        job['updated_at'] = datetime.now(timezone.utc)
+        progress = {key: job[key] for key in ("status", "processed", "succeeded", "failed", "skipped", "updated_at", "finished_at", "error")}
+        try:
+            await self.collection.update_one({"id": job['id']}, {"$set": progress})
+        except PyMongoError as e:
+            logger.error(f"Failed to save retry job {job['id']} progress: {e}")
+
+    async def _run(self, job: Dict[str, Any], query: Dict[str, Any], limit: Optional[int]):
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * 2)
+        limiters: Dict[str, _IntervalLimiter] = {}
+        loop = asyncio.get_running_loop()
+        last_saved = loop.time()
+
+        async def worker():
+            nonlocal last_saved
+            while True:
+                log = await queue.get()
+                try:
+                    if log is None:
+                        return
+                    limiter = self._limiter(limiters, log.get('integration') or 'sendgrid')
+                    if limiter:
+                        await limiter.acquire()
+                    try:
+                        result = await self.replay(log)
+                    except Exception as e:
+                        logger.error(f"Bulk retry of log {log.get('id')} failed: {e}", exc_info=True)
+                        result = {"status": "failed"}
+                    outcome = {"success": "succeeded", "skipped": "skipped"}.get(result.get('status'), "failed")
+                    job[outcome] += 1
+                    job['processed'] += 1
+                    if loop.time() - last_saved >= self.progress_interval:
+                        last_saved = loop.time()
+                        await self._save_progress(job)
+                finally:
+                    queue.task_done()
+
+        workers = [asyncio.create_task(worker()) for _ in range(self.concurrency)]
+        try:
+            cursor = self.db.webhook_logs.find(query, {"_id": 0}).sort("timestamp", 1)
+            if limit:
+                cursor = cursor.limit(limit)
+            async for log in cursor:
+                await queue.put(log)
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+            await self._save_progress(job, status=COMPLETED, finished_at=datetime.now(timezone.utc))
+            logger.info(f"Bulk retry job {job['id']} completed: {job['succeeded']} succeeded, {job['failed']} failed, {job['skipped']} skipped")
+        except asyncio.CancelledError:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            await self._save_progress(job, status=CANCELLED, finished_at=datetime.now(timezone.utc))
+            raise
+        except Exception as e:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            logger.error(f"Bulk retry job {job['id']} failed: {e}", exc_info=True)
+            await self._save_progress(job, status=FAILED, error=str(e), finished_at=datetime.now(timezone.utc))
+        finally:
+            self._tasks.pop(job['id'], None)
@@ -0,0 +1,218 @@
+"""
+Circuit Breaker Module
+Per-provider protection for outbound deliveries: a circuit breaker that
+opens on a high failure or slow-call rate and fails fast until a few
+half-open probes succeed, plus an AIMD concurrency limit that shrinks when
+the provider degrades and grows back while it is healthy. Waits inside a
+guarded call that are not the provider's doing (rate-limit tokens) run
+outside_guard: they free the concurrency slot and are left out of latency.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Closed / open / half-open breaker over a sliding window of recent calls"""
+
+    def __init__(self, name: str, failure_rate: float = 0.5, slow_call_ms: float = 10000,
+                 slow_call_rate: float = 0.8, window_size: int = 20, min_calls: int = 10,
+                 open_seconds: float = 30, half_open_calls: int = 3):
+        self.name = name
+        self.failure_rate = failure_rate
+        self.slow_call_ms = slow_call_ms
+        self.slow_call_rate = slow_call_rate
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+        self.state = CLOSED
+        self._window = deque(maxlen=window_size)  # (failed, slow)
+        self._opened_at = 0.0
+        self._probes = 0
+        self._probe_successes = 0
+
+    def allow(self) -> bool:
+        if self.state == OPEN:
+            if time.monotonic() - self._opened_at < self.open_seconds:
+                return False
+            self._transition(HALF_OPEN)
+        if self.state == HALF_OPEN:
+            if self._probes >= self.half_open_calls:
+                return False
+            self._probes += 1
+        return True
+
+    def record(self, success: bool, duration_ms: float):
+        slow = duration_ms >= self.slow_call_ms
+        if self.state == HALF_OPEN:
+            if not success or slow:
+                self._transition(OPEN)
+                return
+            self._probe_successes += 1
+            if self._probe_successes >= self.half_open_calls:
+                self._transition(CLOSED)
+            return
+
+        self._window.append((not success, slow))
+        calls = len(self._window)
+        if calls < self.min_calls:
+            return
+        failures = sum(1 for failed, _ in self._window if failed)
+        slow_calls = sum(1 for _, was_slow in self._window if was_slow)
+        if failures / calls >= self.failure_rate or slow_calls / calls >= self.slow_call_rate:
+            self._transition(OPEN)
+
+    def _transition(self, state: str):
+        if state == self.state:
+            return
+        logger.warning(f"Circuit for {self.name} {self.state} -> {state}")
+        self.state = state
+        self._probes = 0
+        self._probe_successes = 0
+        if state == OPEN:
+            self._opened_at = time.monotonic()
+        elif state == CLOSED:
+            self._window.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        calls = len(self._window)
+        return {
+            "state": self.state,
+            "recent_calls": calls,
+            "recent_failures": sum(1 for failed, _ in self._window if failed),
+            "recent_slow_calls": sum(1 for _, slow in self._window if slow),
+            "retry_in_seconds": max(0.0, round(self.open_seconds - (time.monotonic() - self._opened_at), 1)) if self.state == OPEN else None
+        }
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limit: +1/limit per healthy call, halved on failure or slow call"""
+
+    def __init__(self, initial: int = 10, min_limit: int = 1, max_limit: int = 50):
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.in_flight = 0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self, timeout: float):
+        async with self._condition:
+            await asyncio.wait_for(
+                self._condition.wait_for(lambda: self.in_flight < int(self.limit)),
+                timeout
+            )
+            self.in_flight += 1
+
+    async def release(self, healthy: Optional[bool]):
+        """Free a slot; healthy=None leaves the limit unchanged"""
+        async with self._condition:
+            self.in_flight -= 1
+            if healthy:
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            elif healthy is not None:
+                self.limit = max(self.min_limit, self.limit / 2)
+            self._condition.notify_all()
+
+
+class _GuardedCall:
+    """State of the delivery running under ProviderGuards.call in this context"""
+
+    def __init__(self, limiter: AdaptiveLimiter):
+        self.limiter = limiter
+        self.holding_slot = True
+        self.waited = 0.0
+
+
+_current_call: ContextVar[Optional[_GuardedCall]] = ContextVar("guarded_call", default=None)
+
+
+@asynccontextmanager
+async def outside_guard():
+    """
+    Wait without holding the current guarded call's concurrency slot; the time
+    spent (including getting the slot back) is not counted as provider latency
+    """
+    call = _current_call.get()
+    if call is None or not call.holding_slot:
+        yield
+        return
+    started = time.perf_counter()
+    call.holding_slot = False
+    await call.limiter.release(None)
+    try:
+        yield
+    finally:
+        await call.limiter.acquire(None)
+        call.holding_slot = True
+        call.waited += time.perf_counter() - started
+
+
+class ProviderGuards:
+    """A breaker and a concurrency limiter per downstream provider"""
+
+    def __init__(self, breaker_options: Optional[Dict[str, Any]] = None, initial_concurrency: int = 10,
+                 max_concurrency: int = 50, acquire_timeout: float = 10.0):
+        self.breaker_options = breaker_options or {}
+        self.initial_concurrency = initial_concurrency
+        self.max_concurrency = max_concurrency
+        self.acquire_timeout = acquire_timeout
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._limiters: Dict[str, AdaptiveLimiter] = {}
+
+    def _guards(self, provider: str):
+        if provider not in self._breakers:
+            self._breakers[provider] = CircuitBreaker(provider, **self.breaker_options)
+            self._limiters[provider] = AdaptiveLimiter(self.initial_concurrency, max_limit=self.max_concurrency)
+        return self._breakers[provider], self._limiters[provider]
+
+    async def call(self, provider: str, deliver: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        """
+        Run a delivery under the provider's breaker and concurrency limit.
+        Rejected calls return a retryable failure instead of waiting on the provider.
+        """
+        breaker, limiter = self._guards(provider)
+        if not breaker.allow():
+            return {"status": "failed", "message": f"{provider} is unavailable (circuit open), delivery deferred", "retryable": True}
+        try:
+            await limiter.acquire(self.acquire_timeout)
+        except asyncio.TimeoutError:
+            # Counts against the breaker: the provider is too slow to drain its calls
+            breaker.record(False, 0)
+            return {"status": "failed", "message": f"{provider} concurrency limit reached, delivery deferred", "retryable": True}
+
+        started = time.perf_counter()
+        success = False
+        call = _GuardedCall(limiter)
+        token = _current_call.set(call)
+        try:
+            result = await deliver()
+            # Non-retryable failures are caused by the payload, not the provider
+            success = result.get('status') == 'success' or not result.get('retryable')
+            return result
+        finally:
+            _current_call.reset(token)
+            duration_ms = max(0.0, time.perf_counter() - started - call.waited) * 1000
+            breaker.record(success, duration_ms)
+            if call.holding_slot:
+                await limiter.release(success and duration_ms < breaker.slow_call_ms)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            provider: {
+                **breaker.snapshot(),
+                "concurrency_limit": int(self._limiters[provider].limit),
+                "in_flight": self._limiters[provider].in_flight
+            }
+            for provider, breaker in self._breakers.items()
+        }
@@ -0,0 +1,67 @@
+"""
+Contact Batcher Module
+Coalesces single-contact add_contact webhooks into larger SendGrid upserts.
+Contacts are buffered per (endpoint_id, list_id) and flushed when the
+batch window elapses or the size cap is reached.
+"""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Any, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+BatchKey = Tuple[str, Optional[str]]
+# (log_id, mapped SendGrid contact)
+BatchEntry = Tuple[str, Dict[str, Any]]
+
+
+class ContactBatcher:
+    """Per-(endpoint, list) contact buffers with time and size flush triggers"""
+
+    def __init__(self, flush: Callable[[BatchKey, List[BatchEntry]], Awaitable[None]],
+                 window_seconds: float = 2.0, max_contacts: int = 1000):
+        self.flush_callback = flush
+        self.window_seconds = window_seconds
+        self.max_contacts = max_contacts
+        self._buffers: Dict[BatchKey, List[BatchEntry]] = {}
+        self._timers: Dict[BatchKey, asyncio.Task] = {}
+        self._inflight: set = set()
+
+    def add(self, key: BatchKey, log_id: str, contacts: List[Dict[str, Any]]):
+        """Buffer the contacts of one webhook; they resolve log_id when flushed"""
+        buffer = self._buffers.setdefault(key, [])
+        buffer.extend((log_id, contact) for contact in contacts)
+
+        if len(buffer) >= self.max_contacts:
+            self._flush_now(key)
+        elif key not in self._timers:
+            self._timers[key] = asyncio.create_task(self._flush_later(key))
+
+    async def _flush_later(self, key: BatchKey):
+        await asyncio.sleep(self.window_seconds)
+        self._timers.pop(key, None)
+        self._flush_now(key)
+
+    def _flush_now(self, key: BatchKey):
+        timer = self._timers.pop(key, None)
+        if timer and timer is not asyncio.current_task():
+            timer.cancel()
+        entries = self._buffers.pop(key, None)
+        if entries:
+            task = asyncio.create_task(self._run_flush(key, entries))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _run_flush(self, key: BatchKey, entries: List[BatchEntry]):
+        try:
+            await self.flush_callback(key, entries)
+        except Exception as e:
+            logger.error(f"Contact batch flush failed for {key}: {e}", exc_info=True)
+
+    async def flush_all(self):
+        """Flush every buffer and wait for pending flushes (used on shutdown)"""
+        for key in list(self._buffers):
+            self._flush_now(key)
+        if self._inflight:
+            await asyncio.gather(*list(self._inflight), return_exceptions=True)
@@ -0,0 +1,190 @@
+"""
+Contact Import Module
+Streaming NDJSON contact imports for add_contact endpoints. Records are
+parsed line by line as the request body arrives, mapped with the endpoint's
+compiled field mapping and upserted to SendGrid in fixed-size chunks, with
+a bounded number of upserts in flight so memory stays constant however
+large the import is. Progress is persisted in contact_imports.
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import AsyncIterator, Awaitable, Callable, Dict, Any, List, Optional
+
+from pymongo.errors import PyMongoError
+
+from ingest import loads
+from sendgrid_contacts import chunk_contacts
+
+logger = logging.getLogger(__name__)
+
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+INTERRUPTED = "interrupted"
+
+# Line numbers of invalid records kept on the import document
+MAX_RECORDED_ERRORS = 20
+
+Upsert = Callable[[List[Dict[str, Any]]], Awaitable[Dict[str, Any]]]
+
+
+class LineTooLong(Exception):
+    """A single NDJSON record exceeds the line size limit"""
+
+
+class ContactImports:
+    """Runs streaming imports and tracks their progress"""
+
+    def __init__(self, db, chunk_size: int = 5000, concurrency: int = 4,
+                 max_line_bytes: int = 1024 * 1024, progress_interval: float = 1.0):
+        self.collection = db.contact_imports
+        self.chunk_size = chunk_size
+        self.concurrency = concurrency
+        self.max_line_bytes = max_line_bytes
+        self.progress_interval = progress_interval
+
+    async def initialize(self):
+        """Mark imports left running by a previous process as interrupted"""
+        await self.collection.update_many(
+            {"status": RUNNING},
+            {"$set": {"status": INTERRUPTED, "finished_at": datetime.now(timezone.utc)}}
+        )
+
+    async def get(self, import_id: str) -> Optional[Dict[str, Any]]:
+        return await self.collection.find_one({"id": import_id}, {"_id": 0})
+
+    async def list(self, endpoint_id: Optional[str] = None, limit: int = 20):
+        query = {"endpoint_id": endpoint_id} if endpoint_id else {}
+        return await self.collection.find(query, {"_id": 0}).sort("created_at", -1).limit(limit).to_list(limit)
+
+    async def _save_progress(self, job: Dict[str, Any]):
+        job['updated_at'] = datetime.now(timezone.utc)
+        progress = {key: value for key, value in job.items() if key not in ("id", "created_at")}
+        try:
+            await self.collection.update_one({"id": job['id']}, {"$set": progress})
+        except PyMongoError as e:
+            logger.error(f"Failed to save contact import {job['id']} progress: {e}")
+
+    async def run(self, endpoint: Dict[str, Any], chunks: AsyncIterator[bytes], mapping, upsert: Upsert,
+                  source_ip: str) -> Dict[str, Any]:
+        """
+        Import the NDJSON records read from chunks and return the final import
+        document. Upsert failures are counted, not raised; a broken stream
+        (e.g. an over-long line) marks the import failed and re-raises.
+        """
+        now = datetime.now(timezone.utc)
+        job = {
+            "id": str(uuid.uuid4()),
+            "endpoint_id": endpoint['id'],
+            "endpoint_name": endpoint['name'],
+            "source_ip": source_ip,
+            "status": RUNNING,
+            "bytes_received": 0,
+            "records": 0,  # non-empty lines
+            "invalid": 0,  # lines that are not a JSON object
+            "skipped": 0,  # records without an email
+            "submitted": 0,  # contacts sent to SendGrid
+            "upserted": 0,
+            "failed": 0,
+            "requests": 0,
+            "job_ids": [],
+            "errors": [],
+            "created_at": now,
+            "updated_at": now,
+            "finished_at": None
+        }
+        await self.collection.insert_one(dict(job))
+
+        semaphore = asyncio.Semaphore(max(1, self.concurrency))
+        pending = set()
+        last_saved = time.monotonic()
+
+        async def submit(contacts: List[Dict[str, Any]]):
+            try:
+                result = await upsert(contacts)
+            except Exception as e:
+                result = {'success': False, 'message': str(e) or type(e).__name__}
+            finally:
+                semaphore.release()
+            job['requests'] += 1
+            if result.get('success'):
+                job['upserted'] += len(contacts)
+                job['job_ids'].append(result.get('job_id'))
+            else:
+                job['failed'] += len(contacts)
+                if len(job['errors']) < MAX_RECORDED_ERRORS:
+                    job['errors'].append(f"SendGrid upsert of {len(contacts)} contacts failed: {result.get('message')}")
+
+        async def flush(contacts: List[Dict[str, Any]]):
+            for request_contacts in chunk_contacts(contacts):
+                # Waiting for a free slot stops reading the body: backpressure on the client
+                await semaphore.acquire()
+                job['submitted'] += len(request_contacts)
+                task = asyncio.create_task(submit(request_contacts))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+
+        def parse(line: bytes):
+            line = line.strip()
+            if not line:
+                return None
+            job['records'] += 1
+            try:
+                record = loads(line)
+            except ValueError:
+                record = None
+            if not isinstance(record, dict):
+                job['invalid'] += 1
+                if len(job['errors']) < MAX_RECORDED_ERRORS:
+                    job['errors'].append(f"Record {job['records']}: not a JSON object")
+                return None
+            contact = mapping.map_contact(record)
+            if contact is None:
+                job['skipped'] += 1
+            return contact
+
+        batch: List[Dict[str, Any]] = []
+        buffer = b''
+        try:
+            async for chunk in chunks:
+                job['bytes_received'] += len(chunk)
+                buffer += chunk
+                lines = buffer.split(b'\n')
+                buffer = lines.pop()
+                if len(buffer) > self.max_line_bytes:
+                    raise LineTooLong(f"Record {job['records'] + 1} exceeds {self.max_line_bytes} bytes")
+                for line in lines:
+                    contact = parse(line)
+                    if contact is not None:
+                        batch.append(contact)
+                if len(batch) >= self.chunk_size:
+                    await flush(batch)
+                    batch = []
+                if time.monotonic() - last_saved >= self.progress_interval:
+                    last_saved = time.monotonic()
+                    await self._save_progress(job)
+
+            contact = parse(buffer)
+            if contact is not None:
+                batch.append(contact)
+            if batch:
+                await flush(batch)
+            await asyncio.gather(*pending)
+            job['status'] = COMPLETED if not job['failed'] else FAILED
+        except BaseException as e:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            job['status'] = FAILED
+            job['errors'].append(str(e) or type(e).__name__)
+            raise
+        finally:
+            job['finished_at'] = datetime.now(timezone.utc)
+            await self._save_progress(job)
+            logger.info(f"Contact import {job['id']} {job['status']}: {job['records']} records, "
+                        f"{job['upserted']} upserted, {job['failed']} failed, {job['skipped']} skipped, {job['invalid']} invalid")
+        return job
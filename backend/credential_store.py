@@ -0,0 +1,61 @@
+"""
+Credential Store Module
+Caches decrypted integration credentials per service so webhook delivery
+does not query api_keys and run a Fernet decrypt on every request.
+"""
+
+import time
+import logging
+from typing import Callable, Dict, Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Fields encrypted at rest by create_api_key
+SENSITIVE_FIELDS = ['api_key', 'token', 'secret', 'refresh_token', 'access_token']
+
+
+def clean_secret(value: str) -> str:
+    """Strip non-ASCII characters and surrounding whitespace from a secret"""
+    return value.encode('ascii', 'ignore').decode('ascii').strip()
+
+
+class CredentialStore:
+    """TTL cache of decrypted credentials keyed by service_name"""
+
+    def __init__(self, db, decrypt: Callable[[str], str], ttl: float = 60.0):
+        self.db = db
+        self.decrypt = decrypt
+        self.ttl = ttl
+        self._entries: Dict[str, Tuple[float, Optional[Dict[str, Any]]]] = {}
+
+    async def get(self, service_name: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the decrypted credentials for a service, or None when the
+        service is not configured. Misses are cached too, so unconfigured
+        integrations do not hit the database on every webhook.
+        """
+        entry = self._entries.get(service_name)
+        now = time.monotonic()
+        if entry and entry[0] > now:
+            return entry[1]
+
+        key_doc = await self.db.api_keys.find_one({"service_name": service_name}, {"_id": 0})
+        credentials = self._decrypt_credentials(key_doc['credentials']) if key_doc else None
+        self._entries[service_name] = (now + self.ttl, credentials)
+        return credentials
+
+    def _decrypt_credentials(self, stored: Dict[str, str]) -> Dict[str, Any]:
+        credentials = {}
+        for k, v in stored.items():
+            if k in SENSITIVE_FIELDS and v:
+                credentials[k] = clean_secret(self.decrypt(v))
+            else:
+                credentials[k] = v
+        return credentials
+
+    def invalidate(self, service_name: Optional[str] = None):
+        """Drop one service (or everything) from the cache"""
+        if service_name is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(service_name, None)
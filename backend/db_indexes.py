@@ -0,0 +1,162 @@
+"""
+Database Index Module
+Declarative index registry applied idempotently at startup, plus an
+index report combining $indexStats usage counters with query plans for
+the application's hot queries.
+"""
+
+import logging
+from datetime import datetime, timezone, timedelta
+from typing import Dict, Any, List, Tuple
+
+from pymongo import ASCENDING, DESCENDING, TEXT
+from pymongo.errors import PyMongoError
+
+logger = logging.getLogger(__name__)
+
+# collection -> [(keys, options)]
+INDEXES: Dict[str, List[Tuple[List[Tuple[str, int]], Dict[str, Any]]]] = {
+    "users": [
+        ([("id", ASCENDING)], {"unique": True}),
+        ([("username", ASCENDING)], {}),
+    ],
+    "webhook_endpoints": [
+        ([("id", ASCENDING)], {"unique": True}),
+        ([("path", ASCENDING), ("enabled", ASCENDING)], {}),
+    ],
+    "webhook_logs": [
+        ([("id", ASCENDING)], {"unique": True}),
+        # (timestamp, id) is the keyset used to page through logs
+        ([("timestamp", DESCENDING), ("id", DESCENDING)], {}),
+        ([("endpoint_id", ASCENDING), ("timestamp", DESCENDING), ("id", DESCENDING)], {}),
+        ([("integration", ASCENDING), ("timestamp", DESCENDING), ("id", DESCENDING)], {}),
+        ([("status", ASCENDING), ("timestamp", DESCENDING), ("id", DESCENDING)], {}),
+        ([("mode", ASCENDING), ("timestamp", DESCENDING), ("id", DESCENDING)], {}),
+        ([("source_ip", ASCENDING), ("timestamp", DESCENDING), ("id", DESCENDING)], {}),
+        ([("response_message", TEXT)], {}),
+        # Retention: the TTL monitor removes logs once expire_at has passed
+        ([("expire_at", ASCENDING)], {"expireAfterSeconds": 0}),
+        ([("archive_at", ASCENDING)], {"sparse": True}),
+    ],
+    "api_keys": [
+        ([("service_name", ASCENDING)], {"unique": True}),
+    ],
+    "webhook_jobs": [
+        ([("id", ASCENDING)], {"unique": True}),
+        ([("status", ASCENDING), ("next_attempt_at", ASCENDING)], {}),
+        # Finished (succeeded/dead) jobs are kept for a week for status lookups
+        ([("completed_at", ASCENDING)], {"expireAfterSeconds": 7 * 24 * 3600}),
+    ],
+    "dead_letters": [
+        ([("id", ASCENDING)], {"unique": True}),
+        ([("dead_at", DESCENDING)], {}),
+        ([("endpoint_id", ASCENDING), ("dead_at", DESCENDING)], {}),
+    ],
+    "contact_imports": [
+        ([("id", ASCENDING)], {"unique": True}),
+        ([("endpoint_id", ASCENDING), ("created_at", DESCENDING)], {}),
+        ([("created_at", DESCENDING)], {}),
+    ],
+    "webhook_rollups": [
+        ([("granularity", ASCENDING), ("endpoint_id", ASCENDING), ("bucket", ASCENDING)], {}),
+        ([("expire_at", ASCENDING)], {"expireAfterSeconds": 0}),
+    ],
+    "syslog_config": [
+        ([("enabled", ASCENDING)], {}),
+    ],
+}
+
+HotQuery = Tuple[str, str, Dict[str, Any], List[Tuple[str, int]]]
+
+# Queries on the request path: (name, collection, filter, sort)
+HOT_QUERIES: List[HotQuery] = [
+    ("Webhook routing", "webhook_endpoints", {"path": "_", "enabled": True}, []),
+    ("Authenticate user", "users", {"id": "_"}, []),
+    ("Login", "users", {"username": "_"}, []),
+    ("Integration credentials", "api_keys", {"service_name": "_"}, []),
+    ("Recent logs", "webhook_logs", {}, [("timestamp", DESCENDING), ("id", DESCENDING)]),
+    ("Logs by endpoint", "webhook_logs", {"endpoint_id": "_"}, [("timestamp", DESCENDING), ("id", DESCENDING)]),
+    ("Logs by integration", "webhook_logs", {"integration": "_"}, [("timestamp", DESCENDING), ("id", DESCENDING)]),
+    ("Logs by status", "webhook_logs", {"status": "failed"}, [("timestamp", DESCENDING), ("id", DESCENDING)]),
+    ("Logs by mode", "webhook_logs", {"mode": "_"}, [("timestamp", DESCENDING), ("id", DESCENDING)]),
+    ("Logs by source IP", "webhook_logs", {"source_ip": "_"}, [("timestamp", DESCENDING), ("id", DESCENDING)]),
+    ("Log by id", "webhook_logs", {"id": "_"}, []),
+]
+
+
+def _timed_hot_queries(now: datetime) -> List[HotQuery]:
+    """Hot queries whose filters are relative to the current time"""
+    return [
+        ("Dashboard timeseries", "webhook_rollups", {"granularity": "hour", "endpoint_id": "_all", "bucket": {"$gte": now - timedelta(days=1)}}, [("bucket", ASCENDING)]),
+        ("Due delivery jobs", "webhook_jobs", {"status": {"$in": ["pending", "failed"]}, "next_attempt_at": {"$lte": now}}, [("next_attempt_at", ASCENDING)]),
+    ]
+
+
+async def ensure_indexes(db):
+    """Create every registered index; existing indexes are left untouched"""
+    created = 0
+    for collection, specs in INDEXES.items():
+        for keys, options in specs:
+            try:
+                await db[collection].create_index(keys, **options)
+                created += 1
+            except PyMongoError as e:
+                # e.g. duplicates preventing a unique index - keep starting up
+                logger.error(f"Failed to create index {keys} on {collection}: {e}")
+    logger.info(f"Ensured {created} indexes")
+
+
+def _plan_stages(plan: Dict[str, Any]) -> List[str]:
+    stages = [plan.get('stage', '')]
+    for child_key in ('inputStage', 'queryPlan'):
+        if child_key in plan:
+            stages.extend(_plan_stages(plan[child_key]))
+    for child in plan.get('inputStages', []):
+        stages.extend(_plan_stages(child))
+    return stages
+
+
+async def index_report(db) -> Dict[str, Any]:
+    """Index usage per collection and the plan used by each hot query"""
+    collections = {}
+    for collection in INDEXES:
+        try:
+            stats = await db[collection].aggregate([{"$indexStats": {}}]).to_list(None)
+        except PyMongoError as e:
+            collections[collection] = {"error": str(e)}
+            continue
+        collections[collection] = {
+            "indexes": [
+                {
+                    "name": stat['name'],
+                    "key": dict(stat['key']),
+                    "ops": stat.get('accesses', {}).get('ops', 0),
+                    "since": stat.get('accesses', {}).get('since')
+                }
+                for stat in stats
+            ]
+        }
+
+    queries = []
+    for name, collection, query_filter, sort in HOT_QUERIES + _timed_hot_queries(datetime.now(timezone.utc)):
+        command = {"find": collection, "filter": query_filter, "limit": 1}
+        if sort:
+            command["sort"] = dict(sort)
+        try:
+            explain = await db.command({"explain": command, "verbosity": "queryPlanner"})
+            winning_plan = explain.get('queryPlanner', {}).get('winningPlan', {})
+            stages = _plan_stages(winning_plan)
+            queries.append({
+                "name": name,
+                "collection": collection,
+                "plan": " <- ".join(stage for stage in stages if stage),
+                "unindexed": "COLLSCAN" in stages or "SORT" in stages
+            })
+        except PyMongoError as e:
+            queries.append({"name": name, "collection": collection, "error": str(e)})
+
+    return {
+        "collections": collections,
+        "hot_queries": queries,
+        "unindexed_queries": [q['name'] for q in queries if q.get('unindexed')]
+    }
@@ -0,0 +1,244 @@
+"""
+Delivery Queue Module
+Durable MongoDB-backed job queue for webhook deliveries. Async-mode
+requests insert a job and return immediately; failed sync deliveries are
+queued for retry. In-process asyncio workers claim due jobs by
+next_attempt_at, retry failures with exponential backoff and jitter, and
+move jobs that exhaust their attempts to the dead_letters collection.
+"""
+
+import asyncio
+import logging
+import random
+import uuid
+from datetime import datetime, timezone, timedelta
+from typing import Awaitable, Callable, Dict, Any, List, Optional
+
+from pymongo import ASCENDING, ReturnDocument
+from pymongo.errors import PyMongoError
+
+logger = logging.getLogger(__name__)
+
+# Job states: pending -> in_flight -> succeeded | failed (retry due) -> ... -> dead
+PENDING = "pending"
+IN_FLIGHT = "in_flight"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+DEAD = "dead"
+
+DEFAULT_RETRY_POLICY: Dict[str, Any] = {
+    "max_attempts": 5,
+    "base_delay_seconds": 30.0,
+    "max_delay_seconds": 3600.0
+}
+
+
+def backoff_delay(policy: Dict[str, Any], attempts: int) -> float:
+    """Exponential backoff with equal jitter: half the capped delay plus a random half"""
+    delay = min(policy['max_delay_seconds'], policy['base_delay_seconds'] * 2 ** (attempts - 1))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+class DeliveryQueue:
+    """Mongo job queue drained by a pool of asyncio workers"""
+
+    def __init__(self, db, handler: Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]],
+                 workers: int = 4, poll_interval: float = 1.0, lease_seconds: int = 300,
+                 default_policy: Optional[Dict[str, Any]] = None):
+        self.db = db
+        self.collection = db.webhook_jobs
+        self.dead_letters = db.dead_letters
+        self.handler = handler
+        self.default_policy = {**DEFAULT_RETRY_POLICY, **(default_policy or {})}
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup = asyncio.Event()
+
+    async def initialize(self):
+        """Release jobs orphaned by a previous run (indexes live in db_indexes)"""
+        await self.release_expired()
+
+    def policy(self, endpoint: Dict[str, Any]) -> Dict[str, Any]:
+        """The endpoint's retry policy over the queue defaults"""
+        overrides = endpoint.get('retry_policy') or {}
+        return {**self.default_policy, **{key: value for key, value in overrides.items() if value is not None}}
+
+    def will_retry(self, job: Dict[str, Any], result: Dict[str, Any]) -> bool:
+        """Whether a failed attempt of the job will be retried rather than dead-lettered"""
+        policy = job.get('retry_policy') or self.default_policy
+        return job['attempts'] < policy['max_attempts'] and bool(result.get('retryable'))
+
+    async def enqueue(self, endpoint: Dict[str, Any], payload: Dict[str, Any], source_ip: str) -> str:
+        """Persist a delivery job and return its id"""
+        now = datetime.now(timezone.utc)
+        job = self._new_job(endpoint, payload, source_ip, now)
+        await self.collection.insert_one(job)
+        self._wakeup.set()
+        return job['id']
+
+    async def enqueue_retry(self, endpoint: Dict[str, Any], payload: Dict[str, Any], source_ip: str,
+                            result: Dict[str, Any]) -> Optional[str]:
+        """
+        Schedule a retry of a delivery that already failed once; None if the
+        failure is not marked retryable or the policy allows no retries
+        """
+        if not result.get('retryable'):
+            return None
+        policy = self.policy(endpoint)
+        if policy['max_attempts'] <= 1:
+            return None
+        now = datetime.now(timezone.utc)
+        job = self._new_job(endpoint, payload, source_ip, now)
+        job.update({
+            "status": FAILED,
+            "attempts": 1,
+            "last_error": result.get('message', ''),
+            "next_attempt_at": now + timedelta(seconds=backoff_delay(policy, 1))
+        })
+        await self.collection.insert_one(job)
+        return job['id']
+
+    def _new_job(self, endpoint: Dict[str, Any], payload: Dict[str, Any], source_ip: str, now: datetime) -> Dict[str, Any]:
+        return {
+            "id": str(uuid.uuid4()),
+            "endpoint_id": endpoint['id'],
+            "endpoint_name": endpoint['name'],
+            "payload": payload,
+            "source_ip": source_ip,
+            "status": PENDING,
+            "attempts": 0,
+            "retry_policy": self.policy(endpoint),
+            "next_attempt_at": now,
+            "created_at": now,
+            "updated_at": now
+        }
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return await self.collection.find_one({"id": job_id}, {"_id": 0, "payload": 0})
+
+    async def is_scheduled(self, job_id: str) -> bool:
+        """Whether the job is still waiting for (another) delivery attempt"""
+        job = await self.collection.find_one({"id": job_id}, {"_id": 0, "status": 1})
+        return bool(job) and job['status'] in (PENDING, IN_FLIGHT, FAILED)
+
+    async def list_dead_letters(self, endpoint_id: Optional[str] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        query = {"endpoint_id": endpoint_id} if endpoint_id else {}
+        return await self.dead_letters.find(query, {"_id": 0, "payload": 0}).sort("dead_at", -1).limit(limit).to_list(limit)
+
+    async def get_dead_letter(self, dead_letter_id: str) -> Optional[Dict[str, Any]]:
+        return await self.dead_letters.find_one({"id": dead_letter_id}, {"_id": 0})
+
+    async def replay_dead_letter(self, dead_letter: Dict[str, Any], endpoint: Dict[str, Any]) -> str:
+        """Queue a dead letter again as a fresh job and remove it from the dead-letter collection"""
+        job_id = await self.enqueue(endpoint, dead_letter['payload'], dead_letter.get('source_ip'))
+        await self.dead_letters.delete_one({"id": dead_letter['id']})
+        return job_id
+
+    async def delete_dead_letter(self, dead_letter_id: str) -> bool:
+        result = await self.dead_letters.delete_one({"id": dead_letter_id})
+        return result.deleted_count > 0
+
+    async def release_expired(self):
+        """Return in-flight jobs whose lease ran out (crashed worker) to the queue"""
+        now = datetime.now(timezone.utc)
+        result = await self.collection.update_many(
+            {"status": IN_FLIGHT, "locked_until": {"$lt": now}},
+            {"$set": {"status": PENDING, "next_attempt_at": now, "updated_at": now}}
+        )
+        if result.modified_count:
+            logger.warning(f"Released {result.modified_count} expired delivery jobs")
+
+    async def _claim(self) -> Optional[Dict[str, Any]]:
+        now = datetime.now(timezone.utc)
+        return await self.collection.find_one_and_update(
+            {"status": {"$in": [PENDING, FAILED]}, "next_attempt_at": {"$lte": now}},
+            {
+                "$set": {
+                    "status": IN_FLIGHT,
+                    "locked_until": now + timedelta(seconds=self.lease_seconds),
+                    "updated_at": now
+                },
+                "$inc": {"attempts": 1}
+            },
+            sort=[("next_attempt_at", ASCENDING)],
+            projection={"_id": 0},
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def _complete(self, job: Dict[str, Any], result: Dict[str, Any]):
+        now = datetime.now(timezone.utc)
+        message = result.get('message', '')
+        unset = {"locked_until": ""}
+        if result.get('status') == 'success':
+            update = {"status": SUCCEEDED, "result_message": message, "completed_at": now}
+        else:
+            policy = job.get('retry_policy') or self.default_policy
+            if self.will_retry(job, result):
+                delay = backoff_delay(policy, job['attempts'])
+                update = {"status": FAILED, "last_error": message, "next_attempt_at": now + timedelta(seconds=delay)}
+                logger.info(f"Delivery job {job['id']} attempt {job['attempts']} failed, retrying in {delay:.0f}s")
+            else:
+                await self._bury(job, message, now)
+                update = {"status": DEAD, "last_error": message, "completed_at": now}
+                # The dead letter keeps the payload
+                unset["payload"] = ""
+        update["updated_at"] = now
+        await self.collection.update_one({"id": job['id']}, {"$set": update, "$unset": unset})
+
+    async def _bury(self, job: Dict[str, Any], message: str, now: datetime):
+        """Copy an exhausted job into the dead-letter collection"""
+        dead_letter = {key: value for key, value in job.items() if key not in ('status', 'locked_until', 'next_attempt_at')}
+        dead_letter.update({"id": str(uuid.uuid4()), "job_id": job['id'], "last_error": message, "dead_at": now})
+        await self.dead_letters.insert_one(dead_letter)
+        logger.warning(f"Delivery job {job['id']} moved to dead letters after {job['attempts']} attempts")
+
+    async def _worker(self, index: int):
+        while True:
+            try:
+                job = await self._claim()
+            except PyMongoError as e:
+                logger.error(f"Delivery worker {index} failed to claim job: {e}")
+                job = None
+
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            try:
+                result = await self.handler(job)
+            except Exception as e:
+                logger.error(f"Delivery job {job['id']} failed: {e}", exc_info=True)
+                result = {"status": "failed", "message": str(e) or "Unknown error occurred", "retryable": True}
+
+            try:
+                await self._complete(job, result)
+            except PyMongoError as e:
+                logger.error(f"Failed to record result of delivery job {job['id']}: {e}")
+
+    async def _reaper(self):
+        while True:
+            await asyncio.sleep(60)
+            try:
+                await self.release_expired()
+            except PyMongoError as e:
+                logger.error(f"Failed to release expired delivery jobs: {e}")
+
+    def start(self):
+        """Start the worker pool"""
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+            self._tasks.append(asyncio.create_task(self._reaper()))
+            logger.info(f"Delivery queue started with {self.workers} workers")
+
+    async def stop(self):
+        """Stop the worker pool; interrupted jobs are released once their lease expires"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
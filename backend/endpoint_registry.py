@@ -0,0 +1,183 @@
+"""
+Endpoint Registry Module
+Keeps an in-process path -> endpoint index so inbound hooks are routed
+without a MongoDB round trip. The index is kept current by local writes and,
+for changes made by other workers, by a change stream (replica sets) or a
+version-polling fallback (standalone servers).
+"""
+
+import asyncio
+import logging
+from typing import Dict, Any, Optional
+
+from pymongo import ReturnDocument
+from pymongo.errors import PyMongoError
+
+from field_mapping import CompiledFieldMapping
+
+logger = logging.getLogger(__name__)
+
+VERSION_DOC_ID = "webhook_endpoints"
+
+
+class EndpointRegistry:
+    """In-memory routing table for webhook endpoints"""
+
+    def __init__(self, db, poll_interval: float = 5.0):
+        self.db = db
+        self.poll_interval = poll_interval
+        self._by_path: Dict[str, Dict[str, Any]] = {}
+        self._by_id: Dict[str, Dict[str, Any]] = {}
+        self._id_by_oid: Dict[Any, str] = {}
+        self._compiled: Dict[str, CompiledFieldMapping] = {}
+        self._version = None
+        self._task: Optional[asyncio.Task] = None
+        self.loaded = False
+
+    async def load(self):
+        """(Re)build the whole index from the database"""
+        by_path, by_id, id_by_oid = {}, {}, {}
+        async for doc in self.db.webhook_endpoints.find({}):
+            oid = doc.pop('_id', None)
+            by_path[doc['path']] = doc
+            by_id[doc['id']] = doc
+            id_by_oid[oid] = doc['id']
+        self._by_path, self._by_id, self._id_by_oid = by_path, by_id, id_by_oid
+        self._compiled = {}
+        self._version = await self._read_version()
+        self.loaded = True
+        logger.info(f"Endpoint registry loaded ({len(by_id)} endpoints)")
+
+    def get(self, path: str) -> Optional[Dict[str, Any]]:
+        """Return the enabled endpoint routed at path, if any"""
+        endpoint = self._by_path.get(path)
+        if endpoint and endpoint.get('enabled') is True:
+            return endpoint
+        return None
+
+    def get_by_id(self, endpoint_id: str) -> Optional[Dict[str, Any]]:
+        return self._by_id.get(endpoint_id)
+
+    def count(self) -> int:
+        return len(self._by_id)
+
+    def compiled_mapping(self, endpoint: Dict[str, Any]) -> CompiledFieldMapping:
+        """
+        Return the compiled add_contact field mapping for an endpoint.
+
+        Compiled once per endpoint version; a new version replaces the
+        endpoint dict (and its field_mapping), which invalidates the entry.
+        """
+        field_mapping = endpoint.get('field_mapping')
+        compiled = self._compiled.get(endpoint['id'])
+        if compiled is None or compiled.source is not field_mapping:
+            compiled = CompiledFieldMapping(field_mapping)
+            if endpoint['id'] in self._by_id:
+                self._compiled[endpoint['id']] = compiled
+        return compiled
+
+    def _apply(self, doc: Dict[str, Any], oid=None):
+        previous = self._by_id.get(doc['id'])
+        if previous and previous['path'] != doc['path']:
+            self._by_path.pop(previous['path'], None)
+        self._by_path[doc['path']] = doc
+        self._by_id[doc['id']] = doc
+        if oid is not None:
+            self._id_by_oid[oid] = doc['id']
+
+    def _discard(self, endpoint_id: str):
+        self._compiled.pop(endpoint_id, None)
+        previous = self._by_id.pop(endpoint_id, None)
+        if previous and self._by_path.get(previous['path']) is previous:
+            del self._by_path[previous['path']]
+
+    async def refresh(self, endpoint_id: str):
+        """Re-read one endpoint after a local write and notify other workers"""
+        doc = await self.db.webhook_endpoints.find_one({"id": endpoint_id})
+        if doc:
+            oid = doc.pop('_id', None)
+            self._apply(doc, oid)
+        else:
+            self._discard(endpoint_id)
+        await self._bump_version()
+
+    async def remove(self, endpoint_id: str):
+        """Drop an endpoint after a local delete and notify other workers"""
+        self._discard(endpoint_id)
+        await self._bump_version()
+
+    async def _read_version(self):
+        doc = await self.db.cache_versions.find_one({"_id": VERSION_DOC_ID})
+        return doc.get('version', 0) if doc else 0
+
+    async def _bump_version(self):
+        try:
+            doc = await self.db.cache_versions.find_one_and_update(
+                {"_id": VERSION_DOC_ID},
+                {"$inc": {"version": 1}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+            self._version = doc.get('version', 0)
+        except PyMongoError as e:
+            logger.error(f"Failed to bump endpoint registry version: {e}")
+
+    def start(self):
+        """Start watching for changes made by other workers"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._watch())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _watch(self):
+        try:
+            async with self.db.webhook_endpoints.watch(full_document='updateLookup') as stream:
+                logger.info("Endpoint registry following change stream")
+                # Catch up on anything written between load() and the watch
+                await self.load()
+                async for change in stream:
+                    self._on_change(change)
+        except asyncio.CancelledError:
+            raise
+        except PyMongoError as e:
+            # Change streams need a replica set; fall back to version polling
+            logger.info(f"Endpoint registry change stream unavailable ({e}), polling every {self.poll_interval}s")
+        await self._poll()
+
+    def _on_change(self, change: Dict[str, Any]):
+        operation = change.get('operationType')
+        oid = change.get('documentKey', {}).get('_id')
+        if operation == 'delete':
+            endpoint_id = self._id_by_oid.pop(oid, None)
+            if endpoint_id:
+                self._discard(endpoint_id)
+        elif operation in ('insert', 'update', 'replace'):
+            doc = change.get('fullDocument')
+            if doc:
+                doc.pop('_id', None)
+                self._apply(doc, oid)
+            else:
+                # Document deleted before the lookup ran
+                endpoint_id = self._id_by_oid.pop(oid, None)
+                if endpoint_id:
+                    self._discard(endpoint_id)
+        elif operation in ('drop', 'rename', 'dropDatabase', 'invalidate'):
+            self._by_path, self._by_id, self._id_by_oid = {}, {}, {}
+            self._compiled = {}
+
+    async def _poll(self):
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                version = await self._read_version()
+                if version != self._version:
+                    await self.load()
+            except PyMongoError as e:
+                logger.error(f"Endpoint registry poll failed: {e}")
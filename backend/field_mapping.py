@@ -0,0 +1,77 @@
+"""
+Field Mapping Module
+Compiles an endpoint's add_contact field_mapping once into flat extractor
+lists, so mapping a bulk payload is a tight loop with no per-contact
+re-parsing of the old (str) vs. new (dict) mapping formats.
+"""
+
+import logging
+from typing import Dict, Any, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class CompiledFieldMapping:
+    """Flat extractor operations for one field_mapping"""
+
+    __slots__ = ('source', 'email_field', 'standard', 'custom')
+
+    def __init__(self, field_mapping: Optional[Dict[str, Any]]):
+        # Kept so callers can tell whether the endpoint's mapping changed
+        self.source = field_mapping
+        field_mapping = field_mapping or {}
+        email_config = field_mapping.get('email', 'email')
+        self.email_field = email_config if isinstance(email_config, str) else email_config.get('payload_field', 'email')
+
+        # (SendGrid field, payload field) pairs
+        self.standard: List[Tuple[str, str]] = []
+        self.custom: List[Tuple[str, str]] = []
+        for sendgrid_field, config in field_mapping.items():
+            if sendgrid_field == 'email':
+                continue
+            # Old format: {"first_name": "firstname"}
+            # New format: {"first_name": {"payload_field": "firstname", "is_custom": false}}
+            if isinstance(config, str):
+                self.standard.append((sendgrid_field, config))
+            elif config.get('is_custom', False):
+                self.custom.append((sendgrid_field, config.get('payload_field', '')))
+            else:
+                self.standard.append((sendgrid_field, config.get('payload_field', '')))
+
+    def map_contact(self, contact_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Map one payload contact to a SendGrid contact, or None without an email"""
+        email = contact_data.get(self.email_field)
+        if not email:
+            return None
+
+        sendgrid_contact = {"email": email}
+        for sendgrid_field, payload_field in self.standard:
+            field_value = contact_data.get(payload_field)
+            if field_value:
+                sendgrid_contact[sendgrid_field] = field_value
+
+        custom_fields = None
+        for sendgrid_field, payload_field in self.custom:
+            field_value = contact_data.get(payload_field)
+            if field_value:
+                if custom_fields is None:
+                    custom_fields = sendgrid_contact['custom_fields'] = {}
+                custom_fields[sendgrid_field] = field_value
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Mapped contact {contact_data} -> {sendgrid_contact}")
+        return sendgrid_contact
+
+    def map_contacts(self, raw_contacts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Map a list of payload contacts, skipping those without an email"""
+        map_contact = self.map_contact
+        sendgrid_contacts = []
+        for contact_data in raw_contacts:
+            sendgrid_contact = map_contact(contact_data)
+            if sendgrid_contact is not None:
+                sendgrid_contacts.append(sendgrid_contact)
+
+        skipped = len(raw_contacts) - len(sendgrid_contacts)
+        if skipped:
+            logger.warning(f"Skipped {skipped} contact(s) - Email field '{self.email_field}' not found in contact data")
+        return sendgrid_contacts
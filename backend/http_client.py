@@ -0,0 +1,85 @@
+"""
+Shared HTTP Client Module
+Provides a single application-scoped async HTTP client used by every outbound
+integration (SendGrid, Ntfy, Discord, Slack, Telegram, GitHub).
+"""
+
+import os
+import asyncio
+import logging
+from typing import Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Pool configuration (overridable from .env)
+HTTP_MAX_CONNECTIONS = int(os.getenv('HTTP_MAX_CONNECTIONS', '100'))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv('HTTP_MAX_KEEPALIVE_CONNECTIONS', '20'))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv('HTTP_KEEPALIVE_EXPIRY', '30'))
+HTTP_CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', '5'))
+HTTP_READ_TIMEOUT = float(os.getenv('HTTP_READ_TIMEOUT', '30'))
+HTTP_WRITE_TIMEOUT = float(os.getenv('HTTP_WRITE_TIMEOUT', '30'))
+HTTP_POOL_TIMEOUT = float(os.getenv('HTTP_POOL_TIMEOUT', '10'))
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def _build_client() -> httpx.AsyncClient:
+    limits = httpx.Limits(
+        max_connections=HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=HTTP_KEEPALIVE_EXPIRY
+    )
+    timeout = httpx.Timeout(
+        connect=HTTP_CONNECT_TIMEOUT,
+        read=HTTP_READ_TIMEOUT,
+        write=HTTP_WRITE_TIMEOUT,
+        pool=HTTP_POOL_TIMEOUT
+    )
+    return httpx.AsyncClient(limits=limits, timeout=timeout, follow_redirects=True)
+
+
+async def start_http_client() -> httpx.AsyncClient:
+    """Create the shared client (called from the app startup hook)"""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _build_client()
+        logger.info(
+            f"HTTP client pool started (max_connections={HTTP_MAX_CONNECTIONS}, "
+            f"keepalive={HTTP_MAX_KEEPALIVE_CONNECTIONS})"
+        )
+    return _client
+
+
+async def close_http_client():
+    """Close the shared client and release pooled connections"""
+    global _client
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+        logger.info("HTTP client pool closed")
+    _client = None
+
+
+def is_retryable_status(status_code: int) -> bool:
+    """Whether an HTTP error status is transient (timeout, rate limit, server error)"""
+    return status_code in (408, 429) or status_code >= 500
+
+
+def is_retryable_error(error: BaseException) -> bool:
+    """Whether an exception raised by a delivery is transient (connection, timeout)"""
+    return isinstance(error, (httpx.TransportError, asyncio.TimeoutError, ConnectionError))
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Return the shared client.
+
+    Connections are pooled per host, so repeated calls to SendGrid or a
+    Discord webhook reuse the same keep-alive connection. The client is
+    created lazily if the startup hook has not run (e.g. scripts).
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _build_client()
+    return _client
@@ -0,0 +1,89 @@
+"""
+Ingest Module
+Reads inbound webhook bodies as a stream with a size cap, rejecting
+oversized requests from Content-Length before reading and otherwise as soon
+as the cap is crossed. Chunks can be fed to a signature check as they
+arrive, and the raw bytes are kept for logging; bodies too large to hold
+can be spooled to a temporary file. JSON is decoded with orjson when it is
+installed.
+"""
+
+import json
+import logging
+import tempfile
+from typing import Any, AsyncIterator, Callable, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# Spooled bodies move from memory to a temporary file above this size
+SPOOL_MEMORY_BYTES = 1024 * 1024
+
+
+class PayloadTooLarge(Exception):
+    """The request body exceeds the endpoint's size limit"""
+
+    def __init__(self, size: int, max_bytes: int):
+        super().__init__(f"Payload of {size} bytes exceeds the {max_bytes} byte limit")
+        self.size = size
+        self.max_bytes = max_bytes
+
+
+async def iter_body(request, max_bytes: int, on_chunk: Optional[Callable[[bytes], None]] = None) -> AsyncIterator[bytes]:
+    """Yield the request body chunk by chunk, at most max_bytes, passing each chunk to on_chunk"""
+    declared = request.headers.get('content-length')
+    if declared and declared.isdigit() and int(declared) > max_bytes:
+        raise PayloadTooLarge(int(declared), max_bytes)
+
+    size = 0
+    async for chunk in request.stream():
+        if not chunk:
+            continue
+        size += len(chunk)
+        if size > max_bytes:
+            raise PayloadTooLarge(size, max_bytes)
+        if on_chunk is not None:
+            on_chunk(chunk)
+        yield chunk
+
+
+async def read_body(request, max_bytes: int, on_chunk: Optional[Callable[[bytes], None]] = None) -> bytes:
+    """Read the request body, at most max_bytes, passing each chunk to on_chunk"""
+    return b''.join([chunk async for chunk in iter_body(request, max_bytes, on_chunk)])
+
+
+async def spool_body(request, max_bytes: int, on_chunk: Optional[Callable[[bytes], None]] = None,
+                     memory_bytes: int = SPOOL_MEMORY_BYTES):
+    """
+    Read the request body into a temporary file (kept in memory up to
+    memory_bytes), for bodies that must be fully verified before use.
+    """
+    spool = tempfile.SpooledTemporaryFile(max_size=memory_bytes)
+    try:
+        async for chunk in iter_body(request, max_bytes, on_chunk):
+            spool.write(chunk)
+    except BaseException:
+        spool.close()
+        raise
+    spool.seek(0)
+    return spool
+
+
+async def iter_file(f, chunk_size: int = 64 * 1024) -> AsyncIterator[bytes]:
+    """Yield a spooled body back in chunks"""
+    while True:
+        chunk = f.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def loads(data: bytes) -> Any:
+    """Decode JSON (raises ValueError on invalid input)"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
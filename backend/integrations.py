@@ -4,87 +4,230 @@ Handles sending notifications to various services: Ntfy, Discord, Slack, Telegra
 Also handles syslog forwarding
 """
 
-import requests
 import json
+import ssl
+import asyncio
 import logging
 import socket
-import time
 from datetime import datetime, timezone
 from typing import Dict, Any, Optional
 
+from http_client import get_http_client, is_retryable_status
+from rate_limiter import get_rate_limiter, destination_key
+
 logger = logging.getLogger(__name__)
 
 # Syslog functionality
-class SyslogSender:
-    """Send logs to remote syslog server using RFC 5424 format"""
-    
-    def __init__(self, host: str, port: int, protocol: str = 'udp'):
-        self.host = host
-        self.port = port
-        self.protocol = protocol.lower()
-        
-    def send_log(self, log_data: Dict[str, Any]) -> bool:
-        """Send webhook log to syslog server"""
-        try:
-            # Build RFC 5424 syslog message
-            # Priority: Facility=16 (local0), Severity=6 (info) = 16*8 + 6 = 134
-            priority = 134
-            timestamp = datetime.now(timezone.utc).isoformat()
-            hostname = socket.gethostname()
-            app_name = "webhook-gateway"
-            
-            # Structured data with webhook log info
-            log_json = json.dumps(log_data, default=str)
-            
-            # RFC 5424 format: <PRI>VERSION TIMESTAMP HOSTNAME APP-NAME PROCID MSGID STRUCTURED-DATA MSG
-            syslog_message = (
-                f"<{priority}>1 {timestamp} {hostname} {app_name} - - - {log_json}\n"
-            )
-            
-            if self.protocol == 'tcp':
-                return self._send_tcp(syslog_message)
-            else:
-                return self._send_udp(syslog_message)
-                
-        except Exception as e:
-            logger.error(f"Error sending to syslog: {e}")
-            return False
-    
-    def _send_udp(self, message: str) -> bool:
-        """Send via UDP"""
+SYSLOG_APP_NAME = "webhook-gateway"
+# Priority: Facility=16 (local0), Severity=6 (info) = 16*8 + 6 = 134
+SYSLOG_PRIORITY = 134
+_HOSTNAME = socket.gethostname()
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def format_syslog_message(log_data: Dict[str, Any]) -> bytes:
+    """Build an RFC 5424 syslog message for a webhook log"""
+    timestamp = datetime.now(timezone.utc).isoformat()
+    # Structured data with webhook log info
+    log_json = json.dumps(log_data, default=_json_default)
+    # RFC 5424 format: <PRI>VERSION TIMESTAMP HOSTNAME APP-NAME PROCID MSGID STRUCTURED-DATA MSG
+    return f"<{SYSLOG_PRIORITY}>1 {timestamp} {_HOSTNAME} {SYSLOG_APP_NAME} - - - {log_json}".encode('utf-8')
+
+
+def frame_syslog_message(message: bytes, protocol: str, framing: str) -> bytes:
+    """
+    Frame a message for the transport.
+
+    UDP sends one LF-terminated message per datagram. Stream transports
+    use either RFC 6587 octet counting ("<len> <msg>") or LF-terminated
+    non-transparent framing.
+    """
+    if protocol != 'udp' and framing == 'octet_counting':
+        return f"{len(message)} ".encode('ascii') + message
+    return message + b"\n"
+
+
+class _UDPProtocol(asyncio.DatagramProtocol):
+    def error_received(self, exc):
+        logger.error(f"UDP syslog error: {exc}")
+
+
+class SyslogForwarder:
+    """
+    Long-lived syslog forwarder.
+
+    Log writes only put a formatted message on a bounded in-memory queue
+    (dropping when full), so forwarding never adds latency to webhook
+    handling. A background task drains the queue in batches over one
+    persistent UDP socket or a reconnecting TCP/TLS stream.
+    """
+
+    def __init__(self, db, queue_size: int = 10000, batch_size: int = 200,
+                 config_refresh_seconds: float = 30.0, connect_timeout: float = 5.0):
+        self.db = db
+        self.batch_size = batch_size
+        self.config_refresh_seconds = config_refresh_seconds
+        self.connect_timeout = connect_timeout
+        self.config: Optional[Dict[str, Any]] = None
+        self.dropped = 0
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self._udp_transport = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._tasks = []
+
+    async def load_config(self):
+        """(Re)load the enabled syslog configuration"""
+        config = await self.db.syslog_config.find_one({"enabled": True}, {"_id": 0})
+        if self._connection_key(config) != self._connection_key(self.config):
+            await self._close_connection()
+        self.config = config
+
+    @staticmethod
+    def _connection_key(config: Optional[Dict[str, Any]]):
+        if not config:
+            return None
+        return (config['host'], config['port'], config.get('protocol', 'udp').lower(),
+                config.get('framing', 'non_transparent'), config.get('tls_verify', True))
+
+    def submit(self, log_data: Dict[str, Any]):
+        """Queue a webhook log for forwarding (never blocks)"""
+        if not self.config:
+            return
         try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            sock.sendto(message.encode('utf-8'), (self.host, self.port))
-            sock.close()
-            return True
-        except Exception as e:
-            logger.error(f"UDP syslog error: {e}")
-            return False
-    
-    def _send_tcp(self, message: str) -> bool:
-        """Send via TCP"""
+            self._queue.put_nowait(format_syslog_message(log_data))
+        except asyncio.QueueFull:
+            self.dropped += 1
+            if self.dropped % 1000 == 1:
+                logger.warning(f"Syslog queue full, {self.dropped} messages dropped so far")
+
+    def start(self):
+        if not self._tasks:
+            self._tasks = [
+                asyncio.create_task(self._drain()),
+                asyncio.create_task(self._refresh_config())
+            ]
+
+    async def stop(self):
+        """Stop the background tasks, flushing whatever is still queued"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        batch = []
+        while not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        if batch and self.config:
+            await self._send_batch(batch)
+        await self._close_connection()
+
+    async def _refresh_config(self):
+        # Picks up changes saved through other workers
+        while True:
+            await asyncio.sleep(self.config_refresh_seconds)
+            try:
+                await self.load_config()
+            except Exception as e:
+                logger.error(f"Failed to refresh syslog config: {e}")
+
+    async def _drain(self):
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            if self.config:
+                await self._send_batch(batch)
+
+    async def _send_batch(self, batch):
+        config = self.config
+        protocol = config.get('protocol', 'udp').lower()
+        framing = config.get('framing', 'non_transparent')
+        frames = [frame_syslog_message(message, protocol, framing) for message in batch]
+
+        if protocol == 'udp':
+            try:
+                if self._udp_transport is None:
+                    loop = asyncio.get_running_loop()
+                    self._udp_transport, _ = await loop.create_datagram_endpoint(
+                        _UDPProtocol, remote_addr=(config['host'], config['port'])
+                    )
+                for frame in frames:
+                    self._udp_transport.sendto(frame)
+            except Exception as e:
+                logger.error(f"UDP syslog error: {e}")
+                await self._close_connection()
+            return
+
+        # TCP / TLS: write the whole batch at once, reconnecting once on failure
+        payload = b"".join(frames)
+        for attempt in range(2):
+            try:
+                if self._writer is None:
+                    self._writer = await self._open_stream(config)
+                self._writer.write(payload)
+                await self._writer.drain()
+                return
+            except Exception as e:
+                await self._close_connection()
+                if attempt:
+                    logger.error(f"{protocol.upper()} syslog error, dropped {len(batch)} messages: {e}")
+
+    async def _open_stream(self, config: Dict[str, Any]) -> asyncio.StreamWriter:
+        ssl_context = None
+        if config.get('protocol', 'udp').lower() == 'tls':
+            ssl_context = ssl.create_default_context()
+            if not config.get('tls_verify', True):
+                ssl_context.check_hostname = False
+                ssl_context.verify_mode = ssl.CERT_NONE
+        _, writer = await asyncio.wait_for(
+            asyncio.open_connection(config['host'], config['port'], ssl=ssl_context),
+            timeout=self.connect_timeout
+        )
+        return writer
+
+    async def _close_connection(self):
+        if self._udp_transport is not None:
+            self._udp_transport.close()
+            self._udp_transport = None
+        if self._writer is not None:
+            writer, self._writer = self._writer, None
+            try:
+                writer.close()
+                await writer.wait_closed()
+            except Exception:
+                pass
+
+    async def test_connection(self, config: Dict[str, Any]) -> bool:
+        """Send a test message using the given (unsaved) configuration"""
+        protocol = config.get('protocol', 'udp').lower()
+        message = f"<{SYSLOG_PRIORITY}>1 {datetime.now(timezone.utc).isoformat()} test {SYSLOG_APP_NAME} - - - TEST".encode('utf-8')
+        frame = frame_syslog_message(message, protocol, config.get('framing', 'non_transparent'))
         try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(5)
-            sock.connect((self.host, self.port))
-            sock.send(message.encode('utf-8'))
-            sock.close()
+            if protocol == 'udp':
+                loop = asyncio.get_running_loop()
+                transport, _ = await loop.create_datagram_endpoint(
+                    _UDPProtocol, remote_addr=(config['host'], config['port'])
+                )
+                transport.sendto(frame)
+                transport.close()
+            else:
+                writer = await self._open_stream(config)
+                writer.write(frame)
+                await writer.drain()
+                writer.close()
+                await writer.wait_closed()
             return True
         except Exception as e:
-            logger.error(f"TCP syslog error: {e}")
+            logger.error(f"{protocol.upper()} syslog test error: {e}")
             return False
-    
-    def test_connection(self) -> bool:
-        """Test connection to syslog server"""
-        test_message = f"<134>1 {datetime.now(timezone.utc).isoformat()} test webhook-gateway - - - TEST\n"
-        if self.protocol == 'tcp':
-            return self._send_tcp(test_message)
-        else:
-            return self._send_udp(test_message)
 
 
 # Ntfy.sh integration
-def send_ntfy_notification(topic_url: str, title: str, message: str, auth_token: Optional[str] = None, 
+async def send_ntfy_notification(topic_url: str, title: str, message: str, auth_token: Optional[str] = None, 
                            tags: Optional[list] = None, priority: int = 3) -> Dict[str, Any]:
     """
     Send notification to Ntfy.sh topic
@@ -111,20 +254,23 @@ def send_ntfy_notification(topic_url: str, title: str, message: str, auth_token:
         if priority:
             headers['Priority'] = str(priority)
         
-        response = requests.post(topic_url, data=message, headers=headers, timeout=10)
+        response = await get_rate_limiter().request(
+            destination_key("ntfy", topic_url),
+            lambda: get_http_client().post(topic_url, content=message, headers=headers, timeout=10)
+        )
         
         if response.status_code in [200, 201]:
             return {'success': True, 'message': 'Notification sent successfully'}
         else:
-            return {'success': False, 'message': f'Ntfy error: {response.text}'}
+            return {'success': False, 'message': f'Ntfy error: {response.text}', 'retryable': is_retryable_status(response.status_code)}
             
     except Exception as e:
         logger.error(f"Ntfy notification error: {e}")
-        return {'success': False, 'message': str(e)}
+        return {'success': False, 'message': str(e), 'retryable': True}
 
 
 # Discord integration
-def send_discord_message(webhook_url: str, content: str = None, embeds: list = None, 
+async def send_discord_message(webhook_url: str, content: str = None, embeds: list = None, 
                         username: str = None) -> Dict[str, Any]:
     """
     Send message to Discord via webhook
@@ -147,20 +293,23 @@ def send_discord_message(webhook_url: str, content: str = None, embeds: list = N
         if username:
             payload['username'] = username
         
-        response = requests.post(webhook_url, json=payload, timeout=10)
+        response = await get_rate_limiter().request(
+            destination_key("discord", webhook_url),
+            lambda: get_http_client().post(webhook_url, json=payload, timeout=10)
+        )
         
         if response.status_code == 204:
             return {'success': True, 'message': 'Discord message sent'}
         else:
-            return {'success': False, 'message': f'Discord error: {response.text}'}
+            return {'success': False, 'message': f'Discord error: {response.text}', 'retryable': is_retryable_status(response.status_code)}
             
     except Exception as e:
         logger.error(f"Discord webhook error: {e}")
-        return {'success': False, 'message': str(e)}
+        return {'success': False, 'message': str(e), 'retryable': True}
 
 
 # Slack integration
-def send_slack_message(webhook_url: str, text: str = None, blocks: list = None, 
+async def send_slack_message(webhook_url: str, text: str = None, blocks: list = None, 
                       username: str = None, icon_emoji: str = None) -> Dict[str, Any]:
     """
     Send message to Slack via webhook
@@ -186,20 +335,23 @@ def send_slack_message(webhook_url: str, text: str = None, blocks: list = None,
         if icon_emoji:
             payload['icon_emoji'] = icon_emoji
         
-        response = requests.post(webhook_url, json=payload, timeout=10)
+        response = await get_rate_limiter().request(
+            destination_key("slack", webhook_url),
+            lambda: get_http_client().post(webhook_url, json=payload, timeout=10)
+        )
         
         if response.status_code == 200:
             return {'success': True, 'message': 'Slack message sent'}
         else:
-            return {'success': False, 'message': f'Slack error: {response.text}'}
+            return {'success': False, 'message': f'Slack error: {response.text}', 'retryable': is_retryable_status(response.status_code)}
             
     except Exception as e:
         logger.error(f"Slack webhook error: {e}")
-        return {'success': False, 'message': str(e)}
+        return {'success': False, 'message': str(e), 'retryable': True}
 
 
 # Telegram integration
-def send_telegram_message(bot_token: str, chat_id: str, text: str, 
+async def send_telegram_message(bot_token: str, chat_id: str, text: str, 
                          parse_mode: str = 'HTML') -> Dict[str, Any]:
     """
     Send message to Telegram via Bot API
@@ -221,14 +373,18 @@ def send_telegram_message(bot_token: str, chat_id: str, text: str,
             'parse_mode': parse_mode
         }
         
-        response = requests.post(url, json=payload, timeout=10)
+        # Telegram limits messages per chat, so each chat gets its own bucket
+        response = await get_rate_limiter().request(
+            destination_key("telegram", bot_token, chat_id),
+            lambda: get_http_client().post(url, json=payload, timeout=10)
+        )
         
         if response.status_code == 200:
             return {'success': True, 'message': 'Telegram message sent'}
         else:
             error_data = response.json()
-            return {'success': False, 'message': f"Telegram error: {error_data.get('description', response.text)}"}
+            return {'success': False, 'message': f"Telegram error: {error_data.get('description', response.text)}", 'retryable': is_retryable_status(response.status_code)}
             
     except Exception as e:
         logger.error(f"Telegram API error: {e}")
-        return {'success': False, 'message': str(e)}
+        return {'success': False, 'message': str(e), 'retryable': True}
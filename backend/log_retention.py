@@ -0,0 +1,204 @@
+"""
+Log Retention Module
+Retention policies for webhook_logs, enforced by MongoDB TTL indexes.
+Each log is stamped with the Date it may be removed, from per-endpoint,
+per-status or default retention. With archival enabled, logs are stamped
+with archive_at instead: the archiver writes them to gzip JSONL files
+partitioned by day and only then sets expire_at, so nothing is deleted
+before it has been archived.
+"""
+
+import asyncio
+import gzip
+import json
+import logging
+from collections import defaultdict
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+from pymongo import UpdateOne
+from pymongo.errors import PyMongoError
+
+from payload_store import expand_payload
+
+logger = logging.getLogger(__name__)
+
+SETTINGS_ID = "log_retention"
+
+DEFAULT_SETTINGS: Dict[str, Any] = {
+    "enabled": False,
+    "default_days": None,  # None keeps logs forever
+    "status_days": {},  # e.g. {"success": 7, "failed": 90}
+    "endpoint_days": {},  # endpoint_id -> days, overrides status_days
+    "archive": False
+}
+
+
+async def delete_in_batches(collection, query: Dict[str, Any], batch_size: int = 1000, pause: float = 0.05) -> int:
+    """Delete matching documents a batch at a time instead of one long delete_many"""
+    deleted = 0
+    while True:
+        ids = [doc['_id'] async for doc in collection.find(query, {"_id": 1}).limit(batch_size)]
+        if not ids:
+            return deleted
+        result = await collection.delete_many({"_id": {"$in": ids}})
+        deleted += result.deleted_count
+        # Let other operations on the collection through between batches
+        await asyncio.sleep(pause)
+
+
+def _as_datetime(value) -> datetime:
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value
+
+
+class LogRetention:
+    """Retention settings, log stamping and the archive-then-expire worker"""
+
+    def __init__(self, db, archive_dir: str = "/opt/webhook-gateway/archives",
+                 interval: float = 300.0, batch_size: int = 5000):
+        self.db = db
+        self.archive_dir = Path(archive_dir)
+        self.interval = interval
+        self.batch_size = batch_size
+        self.settings: Dict[str, Any] = dict(DEFAULT_SETTINGS)
+        self._task: Optional[asyncio.Task] = None
+        self._apply_task: Optional[asyncio.Task] = None
+
+    async def load_settings(self) -> Dict[str, Any]:
+        doc = await self.db.retention_settings.find_one({"_id": SETTINGS_ID}, {"_id": 0})
+        self.settings = {**DEFAULT_SETTINGS, **(doc or {})}
+        return self.settings
+
+    async def save_settings(self, settings: Dict[str, Any]) -> Dict[str, Any]:
+        settings = {key: settings.get(key, default) for key, default in DEFAULT_SETTINGS.items()}
+        await self.db.retention_settings.update_one({"_id": SETTINGS_ID}, {"$set": settings}, upsert=True)
+        self.settings = settings
+        return settings
+
+    def retention_days(self, endpoint_id: str, status: str) -> Optional[int]:
+        settings = self.settings
+        if not settings.get("enabled"):
+            return None
+        for days in (settings["endpoint_days"].get(endpoint_id), settings["status_days"].get(status)):
+            if days:
+                return int(days)
+        return settings.get("default_days") or None
+
+    def stamp(self, endpoint_id: str, status: str, timestamp: datetime) -> Dict[str, datetime]:
+        """Retention fields for a log: expire_at, archive_at or nothing (kept forever)"""
+        days = self.retention_days(endpoint_id, status)
+        if days is None:
+            return {}
+        field = "archive_at" if self.settings.get("archive") else "expire_at"
+        return {field: _as_datetime(timestamp) + timedelta(days=days)}
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        for task in (self._task, self._apply_task):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._task = self._apply_task = None
+
+    def apply_to_existing(self) -> bool:
+        """Restamp all existing logs with the current settings in the background"""
+        if self._apply_task and not self._apply_task.done():
+            return False
+        self._apply_task = asyncio.create_task(self._restamp())
+        return True
+
+    async def _restamp(self):
+        projection = {"_id": 1, "timestamp": 1, "status": 1, "endpoint_id": 1}
+        updated = 0
+        batch: List[UpdateOne] = []
+        try:
+            async for log in self.db.webhook_logs.find({}, projection).batch_size(1000):
+                if not log.get('timestamp'):
+                    continue
+                fields = self.stamp(log.get('endpoint_id'), log.get('status'), log['timestamp'])
+                unset = {name: "" for name in ("expire_at", "archive_at") if name not in fields}
+                update = {"$unset": unset}
+                if fields:
+                    update["$set"] = fields
+                batch.append(UpdateOne({"_id": log['_id']}, update))
+                if len(batch) >= 1000:
+                    await self.db.webhook_logs.bulk_write(batch, ordered=False)
+                    updated += len(batch)
+                    batch = []
+            if batch:
+                await self.db.webhook_logs.bulk_write(batch, ordered=False)
+                updated += len(batch)
+            logger.info(f"Applied log retention settings to {updated} logs")
+        except PyMongoError as e:
+            logger.error(f"Failed to apply log retention settings: {e}")
+
+    async def _run(self):
+        while True:
+            try:
+                while await self.archive_due() >= self.batch_size:
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Log archival failed: {e}", exc_info=True)
+            await asyncio.sleep(self.interval)
+
+    async def archive_due(self) -> int:
+        """Archive one batch of logs past archive_at, then hand them to the TTL index"""
+        now = datetime.now(timezone.utc)
+        logs = await self.db.webhook_logs.find(
+            {"archive_at": {"$lte": now}}
+        ).sort("archive_at", 1).limit(self.batch_size).to_list(self.batch_size)
+        if not logs:
+            return 0
+
+        ids = [log['_id'] for log in logs]
+        await asyncio.to_thread(self._write_archive, logs, now)
+        await self.db.webhook_logs.update_many(
+            {"_id": {"$in": ids}},
+            {"$set": {"expire_at": now, "archived_at": now}, "$unset": {"archive_at": ""}}
+        )
+        logger.info(f"Archived {len(logs)} webhook logs")
+        return len(logs)
+
+    def _write_archive(self, logs: List[Dict[str, Any]], now: datetime):
+        # One file per log day and run: archive_dir/YYYY/MM/DD/webhook_logs-<run>.jsonl.gz
+        partitions = defaultdict(list)
+        for log in logs:
+            log.pop('_id', None)
+            log.pop('archive_at', None)
+            expand_payload(log)
+            partitions[_as_datetime(log['timestamp']).strftime("%Y/%m/%d")].append(log)
+
+        run = now.strftime("%Y%m%dT%H%M%S%f")
+        for day, entries in partitions.items():
+            directory = self.archive_dir / day
+            directory.mkdir(parents=True, exist_ok=True)
+            path = directory / f"webhook_logs-{run}.jsonl.gz"
+            with gzip.open(path, 'wt', encoding='utf-8') as f:
+                for entry in entries:
+                    f.write(json.dumps(entry, default=str))
+                    f.write('\n')
+
+    def list_archives(self) -> List[Dict[str, Any]]:
+        if not self.archive_dir.exists():
+            return []
+        return [
+            {
+                "path": str(path.relative_to(self.archive_dir)),
+                "size": path.stat().st_size,
+                "modified": datetime.fromtimestamp(path.stat().st_mtime, timezone.utc)
+            }
+            for path in sorted(self.archive_dir.glob("*/*/*/webhook_logs-*.jsonl.gz"), reverse=True)
+        ]
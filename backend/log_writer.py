@@ -0,0 +1,141 @@
+"""
+Log Writer Module
+Buffers webhook log documents in memory and writes them to MongoDB with
+unordered insert_many, flushing on a size or time trigger. The queue is
+bounded, so a stalled database applies backpressure instead of growing
+memory without limit.
+"""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Any, List, Optional
+
+from pymongo.errors import BulkWriteError, PyMongoError
+
+logger = logging.getLogger(__name__)
+
+LogListener = Callable[[List[Dict[str, Any]]], Awaitable[None]]
+
+
+class WebhookLogWriter:
+    """Batched writer for the webhook_logs collection"""
+
+    def __init__(self, db, batch_size: int = 500, flush_interval: float = 1.0, max_queue: int = 20000):
+        self.collection = db.webhook_logs
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._flush_requested = asyncio.Event()
+        self._listeners: List[LogListener] = []
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    def add_listener(self, listener: LogListener):
+        """Register a coroutine called with every batch after it is written"""
+        self._listeners.append(listener)
+
+    async def write(self, log_doc: Dict[str, Any]):
+        """Queue a log document; waits only when the queue is full"""
+        await self._queue.put(log_doc)
+
+    async def flush(self):
+        """Wait until everything queued so far has been written"""
+        if self._task is None or self._task.done():
+            await self._write_batch(self._drain())
+            return
+        self._flush_requested.set()
+        await self._queue.join()
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the writer and flush remaining documents"""
+        if self._task:
+            # Let the loop finish its current batch and drain the queue rather
+            # than cancelling it in the middle of a write
+            self._stopping = True
+            self._flush_requested.set()
+            try:
+                await self._task
+            except Exception as e:
+                logger.error(f"Webhook log writer stopped with an error: {e}", exc_info=True)
+            self._task = None
+        await self._write_batch(self._drain())
+
+    def _drain(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        batch = []
+        while not self._queue.empty() and (limit is None or len(batch) < limit):
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _next_document(self, timeout: Optional[float]) -> Optional[Dict[str, Any]]:
+        """Wait for a queued document; returns None on timeout or a flush request"""
+        getter = asyncio.ensure_future(self._queue.get())
+        flush_waiter = asyncio.ensure_future(self._flush_requested.wait())
+        await asyncio.wait({getter, flush_waiter}, timeout=timeout,
+                           return_when=asyncio.FIRST_COMPLETED)
+        flush_waiter.cancel()
+        if not getter.done():
+            getter.cancel()
+            try:
+                await getter
+            except asyncio.CancelledError:
+                pass
+        if getter.done() and not getter.cancelled():
+            return getter.result()
+        return None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            document = await self._next_document(None)
+            if document is None:
+                # Woken by a flush request with nothing queued
+                if self._stopping:
+                    return
+                self._flush_requested.clear()
+                continue
+
+            batch = [document]
+            deadline = loop.time() + self.flush_interval
+            while True:
+                batch.extend(self._drain(self.batch_size - len(batch)))
+                remaining = deadline - loop.time()
+                if len(batch) >= self.batch_size or remaining <= 0 or self._flush_requested.is_set():
+                    break
+                # Queue is empty: wait for more documents, a flush request or the deadline
+                document = await self._next_document(remaining)
+                if document is not None:
+                    batch.append(document)
+
+            await self._write_batch(batch)
+            if self._queue.empty() and not self._stopping:
+                self._flush_requested.clear()
+
+    async def _write_batch(self, batch: List[Dict[str, Any]]):
+        if not batch:
+            return
+        written = batch
+        try:
+            await self.collection.insert_many(batch, ordered=False)
+        except BulkWriteError as e:
+            failed = {error['index'] for error in e.details.get('writeErrors', [])}
+            written = [doc for i, doc in enumerate(batch) if i not in failed]
+            logger.error(f"Webhook log batch partially failed: {len(failed)} of {len(batch)} documents not written")
+        except PyMongoError as e:
+            written = []
+            logger.error(f"Failed to write {len(batch)} webhook logs: {e}")
+        finally:
+            for _ in batch:
+                self._queue.task_done()
+
+        if not written:
+            return
+        for listener in self._listeners:
+            try:
+                await listener(written)
+            except Exception as e:
+                logger.error(f"Webhook log listener failed: {e}", exc_info=True)
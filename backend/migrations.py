@@ -0,0 +1,57 @@
+"""
+Migrations Module
+Background data migrations that run in small batches at startup, so large
+collections are converted without blocking the application.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timezone
+
+from pymongo import UpdateOne
+from pymongo.errors import PyMongoError
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_timestamp(value: str) -> datetime:
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+async def migrate_string_timestamps(collection, field: str = "timestamp", batch_size: int = 1000, pause: float = 0.1,
+                                    retry_delay: float = 5.0, max_retry_delay: float = 300.0) -> int:
+    """Convert ISO string values of field to native BSON dates, batch by batch; database errors are retried with backoff"""
+    migrated = 0
+    failures = 0
+    while True:
+        try:
+            docs = await collection.find({field: {"$type": "string"}}, {"_id": 1, field: 1}).limit(batch_size).to_list(batch_size)
+            if not docs:
+                break
+            updates = []
+            for doc in docs:
+                try:
+                    value = _parse_timestamp(doc[field])
+                except ValueError:
+                    logger.warning(f"Unparseable {collection.name}.{field} '{doc[field]}', leaving it unset")
+                    updates.append(UpdateOne({"_id": doc['_id'], field: doc[field]}, {"$unset": {field: ""}}))
+                    continue
+                # Match the old value so a concurrent rewrite is not clobbered
+                updates.append(UpdateOne({"_id": doc['_id'], field: doc[field]}, {"$set": {field: value}}))
+            await collection.bulk_write(updates, ordered=False)
+            migrated += len(updates)
+            failures = 0
+        except PyMongoError as e:
+            failures += 1
+            delay = min(max_retry_delay, retry_delay * 2 ** (failures - 1))
+            logger.error(f"Timestamp migration of {collection.name}.{field} failed, retrying in {delay:.0f}s: {e}")
+            await asyncio.sleep(delay)
+            continue
+        await asyncio.sleep(pause)
+
+    if migrated:
+        logger.info(f"Migrated {migrated} {collection.name}.{field} values to native dates")
+    return migrated
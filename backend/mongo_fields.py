@@ -0,0 +1,29 @@
+"""
+Mongo Fields Module
+Helpers for using data values (statuses, endpoint ids, integrations) as
+MongoDB field names in counter documents.
+"""
+
+from typing import Callable, Optional
+
+UNKNOWN = "unknown"
+
+# Whether an endpoint id belongs to a registered endpoint
+EndpointFilter = Callable[[str], bool]
+
+
+def field_name(value: Optional[str]) -> str:
+    """Make a value safe to use as a MongoDB field name"""
+    value = str(value) if value else UNKNOWN
+    return value.replace('.', '_').replace('$', '_')
+
+
+def endpoint_field_name(endpoint_id: Optional[str], known: Optional[EndpointFilter]) -> str:
+    """
+    Field name for an endpoint's counters. Ids that are not registered
+    endpoints (404 logs carry the requested path) share the unknown key, so
+    callers cannot add fields or buckets at will.
+    """
+    if endpoint_id and (known is None or known(endpoint_id)):
+        return field_name(endpoint_id)
+    return UNKNOWN
@@ -0,0 +1,112 @@
+"""
+Password Hasher Module
+Runs bcrypt hashing and verification on a dedicated, size-limited thread
+pool so a burst of logins cannot stall the event loop (and with it webhook
+ingestion). Tracks queue depth, rejects work beyond a bounded backlog, caps
+concurrent logins per client IP and reports hashes made with an outdated
+work factor so they can be rehashed on login.
+"""
+
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Dict, Any
+
+import bcrypt
+
+logger = logging.getLogger(__name__)
+
+
+class HasherBusy(Exception):
+    """The hashing backlog is full"""
+
+
+class TooManyLogins(Exception):
+    """The client already has the maximum number of logins in progress"""
+
+
+class PasswordHasher:
+    """bcrypt on a bounded executor, with queue metrics and a per-IP login cap"""
+
+    def __init__(self, rounds: int = 12, workers: int = 2, max_queue: int = 64, logins_per_ip: int = 2):
+        self.rounds = rounds
+        self.workers = workers
+        self.max_queue = max_queue
+        self.logins_per_ip = logins_per_ip
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._pending = 0  # submitted and not finished (queued + running)
+        self._logins: Dict[str, int] = {}
+        self._stats = {"completed": 0, "rejected": 0, "logins_rejected": 0, "max_pending": 0,
+                       "queue_wait_ms_total": 0.0, "hash_ms_total": 0.0}
+
+    async def _run(self, func, *args):
+        if self._pending >= self.max_queue:
+            self._stats["rejected"] += 1
+            raise HasherBusy("Password hashing queue is full")
+        self._pending += 1
+        self._stats["max_pending"] = max(self._stats["max_pending"], self._pending)
+        submitted = time.perf_counter()
+
+        def timed():
+            started = time.perf_counter()
+            result = func(*args)
+            return result, started, time.perf_counter()
+
+        try:
+            result, started, finished = await asyncio.get_running_loop().run_in_executor(self._executor, timed)
+        finally:
+            self._pending -= 1
+        self._stats["completed"] += 1
+        self._stats["queue_wait_ms_total"] += (started - submitted) * 1000
+        self._stats["hash_ms_total"] += (finished - started) * 1000
+        return result
+
+    async def hash(self, password: str) -> str:
+        hashed = await self._run(bcrypt.hashpw, password.encode('utf-8'), bcrypt.gensalt(rounds=self.rounds))
+        return hashed.decode('utf-8')
+
+    async def verify(self, password: str, hashed: str) -> bool:
+        return await self._run(bcrypt.checkpw, password.encode('utf-8'), hashed.encode('utf-8'))
+
+    def needs_rehash(self, hashed: str) -> bool:
+        """True when the hash was made with a different work factor ($2b$<rounds>$...)"""
+        try:
+            return int(hashed.split('$')[2]) != self.rounds
+        except (IndexError, ValueError):
+            return False
+
+    @asynccontextmanager
+    async def login_slot(self, ip: str):
+        """Hold one of the client's concurrent login slots for the duration of a login"""
+        if self._logins.get(ip, 0) >= self.logins_per_ip:
+            self._stats["logins_rejected"] += 1
+            raise TooManyLogins(f"Too many concurrent logins from {ip}")
+        self._logins[ip] = self._logins.get(ip, 0) + 1
+        try:
+            yield
+        finally:
+            self._logins[ip] -= 1
+            if not self._logins[ip]:
+                del self._logins[ip]
+
+    def metrics(self) -> Dict[str, Any]:
+        completed = self._stats["completed"]
+        return {
+            "rounds": self.rounds,
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "pending": self._pending,
+            "queued": max(0, self._pending - self.workers),
+            "logins_in_progress": sum(self._logins.values()),
+            "completed": completed,
+            "rejected": self._stats["rejected"],
+            "logins_rejected": self._stats["logins_rejected"],
+            "max_pending": self._stats["max_pending"],
+            "avg_queue_wait_ms": round(self._stats["queue_wait_ms_total"] / completed, 1) if completed else 0.0,
+            "avg_hash_ms": round(self._stats["hash_ms_total"] / completed, 1) if completed else 0.0
+        }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
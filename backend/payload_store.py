@@ -0,0 +1,119 @@
+"""
+Payload Store Module
+Encodes webhook payloads for storage in webhook_logs. Small payloads are
+stored inline; larger ones are compressed (zstd when available, else zlib)
+into a binary field, and payloads over the stored-size cap are dropped,
+keeping only the summary. Payloads are decompressed only on demand.
+Large payloads are compressed in a worker thread, and payloads too large to
+fit under the cap even when compressed are dropped without compressing.
+"""
+
+import asyncio
+import json
+import logging
+import threading
+import zlib
+from typing import Dict, Any, Optional
+
+from bson import Binary
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+PAYLOAD_SUMMARY_CHARS = 500
+
+# Payloads at least this large are compressed off the event loop
+OFFLOAD_COMPRESSION_BYTES = 64 * 1024
+
+# Best compression ratio expected for JSON; anything larger than
+# max_stored_bytes times this cannot fit under the cap
+MAX_COMPRESSION_RATIO = 20
+
+# Compressors are not thread-safe, so each thread keeps its own;
+# decompressors are created per call
+_local = threading.local()
+
+
+def _compress(data: bytes):
+    if zstandard is not None:
+        compressor = getattr(_local, 'compressor', None)
+        if compressor is None:
+            compressor = _local.compressor = zstandard.ZstdCompressor(level=3)
+        return 'zstd', compressor.compress(data)
+    return 'zlib', zlib.compress(data, 6)
+
+
+def _decompress(encoding: str, data: bytes) -> bytes:
+    if encoding == 'zstd':
+        if zstandard is None:
+            raise RuntimeError("Payload is zstd-compressed but the zstandard package is not installed")
+        return zstandard.ZstdDecompressor().decompress(data)
+    if encoding == 'zlib':
+        return zlib.decompress(data)
+    raise ValueError(f"Unknown payload encoding: {encoding}")
+
+
+async def encode_payload(payload: Optional[Dict[str, Any]], compress_threshold: int, max_stored_bytes: int,
+                         raw: Optional[bytes] = None) -> Dict[str, Any]:
+    """
+    Log fields for a payload: payload_summary plus either the inline payload,
+    a compressed copy, or payload_truncated when it exceeds max_stored_bytes.
+    raw is the JSON the payload was decoded from, stored as-is instead of
+    serializing the payload again.
+    """
+    if raw is not None:
+        data = raw
+        summary = raw[:PAYLOAD_SUMMARY_CHARS * 4].decode('utf-8', 'ignore')[:PAYLOAD_SUMMARY_CHARS]
+    else:
+        summary = json.dumps(payload if payload is not None else {}, default=str)
+        data = summary.encode('utf-8')
+    fields: Dict[str, Any] = {"payload_summary": summary[:PAYLOAD_SUMMARY_CHARS]}
+    size = len(data)
+
+    if size <= compress_threshold:
+        fields["payload"] = payload
+        return fields
+
+    fields["payload_size"] = size
+    if size > max_stored_bytes * MAX_COMPRESSION_RATIO:
+        logger.debug(f"Payload of {size} bytes cannot fit under the stored size cap, keeping summary only")
+        fields["payload_truncated"] = True
+        return fields
+
+    if size >= OFFLOAD_COMPRESSION_BYTES:
+        encoding, compressed = await asyncio.to_thread(_compress, data)
+    else:
+        encoding, compressed = _compress(data)
+    if len(compressed) > max_stored_bytes:
+        logger.debug(f"Payload of {size} bytes exceeds the stored size cap, keeping summary only")
+        fields["payload_truncated"] = True
+        return fields
+
+    fields["payload_compressed"] = Binary(compressed)
+    fields["payload_encoding"] = encoding
+    return fields
+
+
+def decode_payload(log: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """The full payload of a stored log, or None if it was not kept"""
+    if log.get('payload_compressed') is not None:
+        data = _decompress(log.get('payload_encoding', 'zlib'), bytes(log['payload_compressed']))
+        return json.loads(data)
+    payload = log.get('payload')
+    if isinstance(payload, str):
+        # Very old logs stored the payload as a JSON string
+        return json.loads(payload)
+    return payload
+
+
+def expand_payload(log: Dict[str, Any]) -> Dict[str, Any]:
+    """Replace the stored payload fields of a log with the decoded payload (in place)"""
+    payload = decode_payload(log)
+    log.pop('payload_compressed', None)
+    log.pop('payload_encoding', None)
+    log['payload'] = payload
+    return log
@@ -0,0 +1,186 @@
+"""
+Rate Limiter Module
+Token buckets keyed by delivery destination (webhook URL, chat, SendGrid
+account) with provider-default quotas. Requests wait for a token instead of
+failing, and buckets adapt to Retry-After and X-RateLimit-* response headers,
+so bursts are delivered at the highest rate the provider accepts. Waits
+run outside_guard, so they neither hold a provider concurrency slot nor
+count as provider latency.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Dict, Any, Optional, Tuple
+
+import httpx
+
+from circuit_breaker import outside_guard
+
+logger = logging.getLogger(__name__)
+
+# provider -> (tokens per second, burst capacity) per destination
+PROVIDER_QUOTAS: Dict[str, Tuple[float, float]] = {
+    "discord": (2.5, 5),  # 5 requests / 2s per webhook
+    "slack": (1.0, 1),  # 1 message / s per incoming webhook
+    "telegram": (1.0, 1),  # 1 message / s per chat
+    "ntfy": (0.2, 60),  # ntfy.sh: burst of 60, then 1 / 5s
+    "sendgrid": (10.0, 20),
+}
+DEFAULT_QUOTA = (5.0, 5)
+
+RATE_LIMIT_MAX_WAIT = float(os.getenv('RATE_LIMIT_MAX_WAIT', '60'))
+RATE_LIMIT_MAX_RETRIES = int(os.getenv('RATE_LIMIT_MAX_RETRIES', '3'))
+
+
+class RateLimitExceeded(Exception):
+    """A token would not be available within the allowed wait"""
+
+    def __init__(self, key: str, wait: float):
+        super().__init__(f"Rate limit for {key} requires waiting {wait:.1f}s")
+        self.wait = wait
+
+
+def destination_key(provider: str, *parts: str) -> str:
+    """Bucket key for a destination; secrets in URLs and tokens are hashed"""
+    digest = hashlib.sha256('|'.join(str(part) for part in parts).encode()).hexdigest()[:16]
+    return f"{provider}:{digest}"
+
+
+class TokenBucket:
+    """Token bucket with reservations, so concurrent callers queue in order"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.blocked_until = 0.0
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self) -> float:
+        now = time.monotonic()
+        self._refill(now)
+        return max(0.0, (1 - self.tokens) / self.rate, self.blocked_until - now)
+
+    def reserve(self) -> float:
+        """Take a token (possibly one not yet refilled) and return how long to wait for it"""
+        wait = self.wait_time()
+        self.tokens -= 1
+        return wait
+
+    def block(self, seconds: float):
+        """Provider asked us to back off: no tokens until then"""
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+        self.tokens = min(self.tokens, 0)
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    value = response.headers.get('Retry-After')
+    if value:
+        try:
+            return float(value)
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+    if response.headers.get('content-type', '').startswith('application/json'):
+        try:
+            body = response.json()
+            # Discord reports seconds, Telegram reports seconds under parameters
+            retry_after = body.get('retry_after') or body.get('parameters', {}).get('retry_after')
+            if retry_after is not None:
+                return float(retry_after)
+        except (ValueError, AttributeError):
+            pass
+    return None
+
+
+def _exhausted_for(response: httpx.Response) -> Optional[float]:
+    """Seconds until the quota resets when X-RateLimit-Remaining hit zero"""
+    if response.headers.get('X-RateLimit-Remaining') != '0':
+        return None
+    reset_after = response.headers.get('X-RateLimit-Reset-After')
+    if reset_after:
+        return float(reset_after)
+    reset = response.headers.get('X-RateLimit-Reset')
+    if reset:
+        reset = float(reset)
+        # Epoch seconds (SendGrid, Discord) or a relative number of seconds
+        return max(0.0, reset - time.time()) if reset > 1e9 else reset
+    return None
+
+
+class RateLimiter:
+    """Registry of destination buckets"""
+
+    def __init__(self, max_wait: float = RATE_LIMIT_MAX_WAIT, max_retries: int = RATE_LIMIT_MAX_RETRIES):
+        self.max_wait = max_wait
+        self.max_retries = max_retries
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    def bucket(self, key: str) -> TokenBucket:
+        if key not in self._buckets:
+            rate, capacity = PROVIDER_QUOTAS.get(key.split(':', 1)[0], DEFAULT_QUOTA)
+            self._buckets[key] = TokenBucket(rate, capacity)
+        return self._buckets[key]
+
+    async def request(self, key: str, send: Callable[[], Awaitable[httpx.Response]]) -> httpx.Response:
+        """
+        Send a request once a token is available, re-queueing on 429.
+        Raises RateLimitExceeded when the total wait would exceed max_wait.
+        """
+        bucket = self.bucket(key)
+        deadline = time.monotonic() + self.max_wait
+        attempt = 0
+        while True:
+            wait = bucket.wait_time()
+            if wait > deadline - time.monotonic():
+                raise RateLimitExceeded(key, wait)
+            wait = bucket.reserve()
+            if wait:
+                async with outside_guard():
+                    await asyncio.sleep(wait)
+
+            response = await send()
+            exhausted_for = _exhausted_for(response)
+            if exhausted_for:
+                bucket.block(exhausted_for)
+            if response.status_code != 429 or attempt >= self.max_retries:
+                return response
+
+            retry_after = _retry_after(response) or exhausted_for or 1 / bucket.rate
+            bucket.block(retry_after)
+            attempt += 1
+            logger.info(f"Rate limited by {key}, retrying in {retry_after:.1f}s")
+
+    def snapshot(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        snapshot = {}
+        for key, bucket in self._buckets.items():
+            bucket._refill(now)
+            snapshot[key] = {
+                "rate_per_second": bucket.rate,
+                "capacity": bucket.capacity,
+                "tokens": round(bucket.tokens, 2),
+                "blocked_for_seconds": round(max(0.0, bucket.blocked_until - now), 1)
+            }
+        return snapshot
+
+
+_rate_limiter: Optional[RateLimiter] = None
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Return the process-wide rate limiter"""
+    global _rate_limiter
+    if _rate_limiter is None:
+        _rate_limiter = RateLimiter()
+    return _rate_limiter
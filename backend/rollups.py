@@ -0,0 +1,205 @@
+"""
+Rollups Module
+Per-minute and per-hour time buckets of webhook throughput and latency,
+updated from the log writer so charts never scan webhook_logs. Each log
+increments a bucket for its endpoint and an all-endpoints bucket, so a
+dashboard range query reads one document per bucket.
+"""
+
+import logging
+from collections import Counter, defaultdict
+from datetime import datetime, timezone, timedelta
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+from pymongo import ASCENDING, UpdateOne
+
+from mongo_fields import EndpointFilter, endpoint_field_name, field_name
+
+logger = logging.getLogger(__name__)
+
+ALL_ENDPOINTS = "_all"
+
+# granularity -> (bucket size, default retention)
+GRANULARITIES: Dict[str, Tuple[timedelta, timedelta]] = {
+    "minute": (timedelta(minutes=1), timedelta(days=7)),
+    "hour": (timedelta(hours=1), timedelta(days=400)),
+}
+
+# Upper bounds (ms) of the latency histogram bins; slower requests go to "inf"
+LATENCY_BINS_MS = [10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+
+def _bucket_id(granularity: str, bucket: datetime, endpoint_id: str) -> str:
+    return f"{granularity}:{bucket.isoformat()}:{endpoint_id}"
+
+
+def _bin_name(duration_ms: float) -> str:
+    for bound in LATENCY_BINS_MS:
+        if duration_ms <= bound:
+            return f"le_{bound}"
+    return "inf"
+
+
+def truncate(timestamp: datetime, granularity: str) -> datetime:
+    """Start of the bucket containing timestamp"""
+    if granularity == "minute":
+        return timestamp.replace(second=0, microsecond=0)
+    return timestamp.replace(minute=0, second=0, microsecond=0)
+
+
+def _as_datetime(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _percentile(bins: Dict[str, int], count: int, quantile: float) -> Optional[float]:
+    """Estimate a latency percentile as the upper bound of its histogram bin"""
+    if not count:
+        return None
+    target = count * quantile
+    seen = 0
+    for bound in LATENCY_BINS_MS:
+        seen += bins.get(f"le_{bound}", 0)
+        if seen >= target:
+            return float(bound)
+    return None  # falls in the open-ended bin
+
+
+class MetricRollups:
+    """Time-bucketed webhook counters in the webhook_rollups collection"""
+
+    def __init__(self, db, retention: Optional[Dict[str, timedelta]] = None,
+                 known_endpoint: Optional[EndpointFilter] = None):
+        self.db = db
+        self.known_endpoint = known_endpoint
+        self.collection = db.webhook_rollups
+        self.retention = {name: default for name, (_, default) in GRANULARITIES.items()}
+        self.retention.update(retention or {})
+
+    def _updates(self, logs: List[Dict[str, Any]]) -> List[UpdateOne]:
+        # (granularity, bucket, endpoint_id) -> increments
+        buckets: Dict[Tuple[str, datetime, str], Counter] = defaultdict(Counter)
+        maxima: Dict[Tuple[str, datetime, str], float] = {}
+        for log in logs:
+            timestamp = _as_datetime(log['timestamp'])
+            increments = Counter({
+                'total': 1,
+                f"status.{field_name(log.get('status'))}": 1,
+                f"integration.{field_name(log.get('integration'))}": 1,
+                f"mode.{field_name(log.get('mode'))}": 1,
+            })
+            duration_ms = log.get('duration_ms')
+            if duration_ms is not None:
+                increments['latency.count'] += 1
+                increments['latency.sum_ms'] += duration_ms
+                increments[f"latency.bins.{_bin_name(duration_ms)}"] += 1
+
+            for granularity in GRANULARITIES:
+                bucket = truncate(timestamp, granularity)
+                for endpoint_id in (endpoint_field_name(log.get('endpoint_id'), self.known_endpoint), ALL_ENDPOINTS):
+                    key = (granularity, bucket, endpoint_id)
+                    buckets[key].update(increments)
+                    if duration_ms is not None and duration_ms > maxima.get(key, -1):
+                        maxima[key] = duration_ms
+
+        updates = []
+        for (granularity, bucket, endpoint_id), increments in buckets.items():
+            update = {
+                "$inc": dict(increments),
+                "$setOnInsert": {
+                    "granularity": granularity,
+                    "bucket": bucket,
+                    "endpoint_id": endpoint_id,
+                    "expire_at": bucket + self.retention[granularity]
+                }
+            }
+            if (granularity, bucket, endpoint_id) in maxima:
+                update["$max"] = {"latency.max_ms": maxima[(granularity, bucket, endpoint_id)]}
+            updates.append(UpdateOne(
+                {"_id": _bucket_id(granularity, bucket, endpoint_id)},
+                update,
+                upsert=True
+            ))
+        return updates
+
+    async def record(self, logs: List[Dict[str, Any]]):
+        """Log writer listener: fold a batch of written logs into their buckets"""
+        updates = self._updates(logs)
+        if updates:
+            await self.collection.bulk_write(updates, ordered=False)
+
+    async def move_status(self, endpoint_id: str, timestamps: Iterable[datetime], from_status: str, to_status: str):
+        """Move logs from one status to another in their buckets (e.g. queued -> success)"""
+        if from_status == to_status:
+            return
+        counts: Counter = Counter()
+        for timestamp in timestamps:
+            for granularity in GRANULARITIES:
+                bucket = truncate(_as_datetime(timestamp), granularity)
+                for bucket_endpoint in (endpoint_field_name(endpoint_id, self.known_endpoint), ALL_ENDPOINTS):
+                    counts[(granularity, bucket, bucket_endpoint)] += 1
+        # No upsert: a bucket that has already expired stays gone
+        updates = [
+            UpdateOne(
+                {"_id": _bucket_id(granularity, bucket, bucket_endpoint)},
+                {"$inc": {f"status.{field_name(from_status)}": -count, f"status.{field_name(to_status)}": count}}
+            )
+            for (granularity, bucket, bucket_endpoint), count in counts.items()
+        ]
+        if updates:
+            await self.collection.bulk_write(updates, ordered=False)
+
+    async def rebuild(self, since: Optional[datetime] = None, batch_size: int = 1000) -> int:
+        """Recompute buckets from webhook_logs (e.g. after enabling rollups on existing data)"""
+        bucket_filter = {"bucket": {"$gte": truncate(since, "hour")}} if since else {}
+        await self.collection.delete_many(bucket_filter)
+
+        log_filter = {"timestamp": {"$gte": truncate(since, "hour")}} if since else {"timestamp": {"$type": "date"}}
+        projection = {"_id": 0, "timestamp": 1, "endpoint_id": 1, "status": 1,
+                      "integration": 1, "mode": 1, "duration_ms": 1}
+        processed = 0
+        batch = []
+        async for log in self.db.webhook_logs.find(log_filter, projection).batch_size(batch_size):
+            batch.append(log)
+            if len(batch) >= batch_size:
+                await self.record(batch)
+                processed += len(batch)
+                batch = []
+        if batch:
+            await self.record(batch)
+            processed += len(batch)
+        logger.info(f"Rebuilt webhook rollups from {processed} logs")
+        return processed
+
+    async def series(self, granularity: str, start: datetime, end: datetime,
+                     endpoint_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Buckets between start and end, oldest first, with latency summaries"""
+        query = {
+            "granularity": granularity,
+            "endpoint_id": field_name(endpoint_id) if endpoint_id else ALL_ENDPOINTS,
+            "bucket": {"$gte": truncate(start, granularity), "$lte": end}
+        }
+        points = []
+        cursor = self.collection.find(query, {"_id": 0, "expire_at": 0}).sort("bucket", ASCENDING)
+        async for doc in cursor:
+            latency = doc.get('latency', {})
+            count = latency.get('count', 0)
+            bins = latency.get('bins', {})
+            points.append({
+                "timestamp": doc['bucket'],
+                "total": doc.get('total', 0),
+                "status": doc.get('status', {}),
+                "integration": doc.get('integration', {}),
+                "mode": doc.get('mode', {}),
+                "latency": {
+                    "count": count,
+                    "avg_ms": round(latency.get('sum_ms', 0) / count, 2) if count else None,
+                    "max_ms": latency.get('max_ms'),
+                    "p50_ms": _percentile(bins, count, 0.5),
+                    "p95_ms": _percentile(bins, count, 0.95),
+                    "p99_ms": _percentile(bins, count, 0.99),
+                    "bins": bins
+                }
+            })
+        return points
@@ -0,0 +1,108 @@
+"""
+SendGrid Contacts Module
+Helpers for upserting contacts through PUT /v3/marketing/contacts while
+staying under SendGrid's per-request limits.
+"""
+
+import os
+import json
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Any, List, Optional
+
+from http_client import get_http_client, is_retryable_status
+from rate_limiter import get_rate_limiter, destination_key
+
+logger = logging.getLogger(__name__)
+
+SENDGRID_CONTACTS_URL = "https://api.sendgrid.com/v3/marketing/contacts"
+
+# SendGrid accepts at most 30,000 contacts or 6 MB per upsert request
+SENDGRID_MAX_CONTACTS_PER_REQUEST = 30000
+SENDGRID_MAX_REQUEST_BYTES = 6 * 1024 * 1024
+
+# Parallel upsert requests per bulk payload
+SENDGRID_UPSERT_CONCURRENCY = int(os.getenv('SENDGRID_UPSERT_CONCURRENCY', '4'))
+
+# Room for {"list_ids": [...], "contacts": []} around the contact array
+_ENVELOPE_BYTES = 1024
+
+
+def chunk_contacts(contacts: List[Dict[str, Any]],
+                   max_contacts: int = SENDGRID_MAX_CONTACTS_PER_REQUEST,
+                   max_bytes: int = SENDGRID_MAX_REQUEST_BYTES) -> List[List[Dict[str, Any]]]:
+    """Split contacts into chunks that respect the count and payload-size ceilings"""
+    chunks = []
+    current = []
+    current_bytes = _ENVELOPE_BYTES
+    for contact in contacts:
+        # +1 for the separating comma
+        size = len(json.dumps(contact, separators=(',', ':'))) + 1
+        if current and (len(current) >= max_contacts or current_bytes + size > max_bytes):
+            chunks.append(current)
+            current = []
+            current_bytes = _ENVELOPE_BYTES
+        current.append(contact)
+        current_bytes += size
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+async def upsert_contacts(api_key: str, contacts: List[Dict[str, Any]],
+                          list_ids: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Send one upsert request to SendGrid
+
+    Returns:
+        Dict with success status, job_id and message (and retryable on failure)
+    """
+    contact_request = {"contacts": contacts}
+    if list_ids:
+        contact_request['list_ids'] = list_ids
+
+    headers = {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json"
+    }
+
+    try:
+        response = await get_rate_limiter().request(
+            destination_key("sendgrid", api_key),
+            lambda: get_http_client().put(SENDGRID_CONTACTS_URL, headers=headers, json=contact_request)
+        )
+    except Exception as e:
+        logger.error(f"SendGrid request error: {e}")
+        return {'success': False, 'job_id': None, 'message': f"SendGrid request error: {str(e) or type(e).__name__}", 'retryable': True}
+
+    logger.info(f"SendGrid response status: {response.status_code}, body: {response.text}")
+
+    if response.status_code in [200, 202]:
+        response_data = response.json() if response.text else {}
+        return {'success': True, 'job_id': response_data.get('job_id', 'N/A'), 'message': 'Contacts upserted'}
+
+    error_detail = response.text if response.text else f"HTTP {response.status_code}"
+    logger.error(f"SendGrid API error: {error_detail}")
+    return {'success': False, 'job_id': None, 'message': f"SendGrid API error: {error_detail}",
+            'retryable': is_retryable_status(response.status_code)}
+
+
+async def upsert_contact_chunks(api_key: str, chunks: List[List[Dict[str, Any]]],
+                                list_ids: Optional[List[str]] = None,
+                                concurrency: int = SENDGRID_UPSERT_CONCURRENCY,
+                                upsert: Optional[Callable[..., Awaitable[Dict[str, Any]]]] = None) -> List[Dict[str, Any]]:
+    """
+    Submit chunks concurrently with at most `concurrency` requests in flight.
+    upsert replaces upsert_contacts (same signature), e.g. to add guards.
+
+    Returns:
+        One upsert_contacts result per chunk, in chunk order
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    upsert = upsert or upsert_contacts
+
+    async def submit(chunk):
+        async with semaphore:
+            return await upsert(api_key, chunk, list_ids)
+
+    return await asyncio.gather(*(submit(chunk) for chunk in chunks))
@@ -1,8 +1,11 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, Header, Request, status, Body
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, Header, Request, Response, status, Body, Query
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi.responses import JSONResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReturnDocument
+import asyncio
 import os
 import logging
 from pathlib import Path
@@ -10,18 +13,40 @@ from pydantic import BaseModel, Field, ConfigDict, EmailStr
 from typing import List, Optional, Dict, Any
 import uuid
 from datetime import datetime, timezone, timedelta
-import bcrypt
 import jwt
 from cryptography.fernet import Fernet
 import base64
 import hashlib
-import requests
+import httpx
 import json
 import zipfile
 import io
+import time
+import ipaddress
 from backup_scheduler import BackupScheduler
+from http_client import start_http_client, close_http_client, get_http_client, is_retryable_status, is_retryable_error
+from endpoint_registry import EndpointRegistry
+from credential_store import CredentialStore
+from user_cache import UserCache
+from password_hasher import PasswordHasher, HasherBusy, TooManyLogins
+from webhook_auth import WebhookVerifier, VerificationError, AuthMode
+from ingest import read_body, iter_body, spool_body, iter_file, loads, PayloadTooLarge
+from contact_import import ContactImports, LineTooLong
+from delivery_queue import DeliveryQueue
+from contact_batcher import ContactBatcher
+from sendgrid_contacts import chunk_contacts, upsert_contact_chunks, upsert_contacts, SENDGRID_UPSERT_CONCURRENCY
+from log_writer import WebhookLogWriter
+from db_indexes import ensure_indexes, index_report
+from stats import StatsCounters
+from rollups import MetricRollups, GRANULARITIES
+from log_retention import LogRetention, delete_in_batches
+from migrations import migrate_string_timestamps
+from payload_store import encode_payload, decode_payload, expand_payload
+from bulk_retry import BulkRetryManager, parse_rate_limits
+from circuit_breaker import ProviderGuards
+from rate_limiter import get_rate_limiter, destination_key, RateLimitExceeded
 from integrations import (
-    SyslogSender, send_ntfy_notification, send_discord_message,
+    SyslogForwarder, send_ntfy_notification, send_discord_message,
     send_slack_message, send_telegram_message
 )
 
@@ -30,7 +55,7 @@ load_dotenv(ROOT_DIR / '.env')
 
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+client = AsyncIOMotorClient(mongo_url, tz_aware=True)
 db = client[os.environ['DB_NAME']]
 
 # JWT Configuration
@@ -54,6 +79,93 @@ security = HTTPBearer()
 # Initialize backup scheduler
 backup_scheduler = None
 
+# Background conversion of legacy ISO-string log timestamps to BSON dates
+timestamp_migration_task = None
+
+# Buffered webhook log writes (insert_many on size/time trigger)
+log_writer = WebhookLogWriter(
+    db,
+    batch_size=int(os.getenv('LOG_WRITER_BATCH_SIZE', '500')),
+    flush_interval=float(os.getenv('LOG_WRITER_FLUSH_INTERVAL', '1')),
+    max_queue=int(os.getenv('LOG_WRITER_QUEUE_SIZE', '20000'))
+)
+
+# Logged payloads above the threshold are compressed; above the cap only the summary is kept
+PAYLOAD_COMPRESS_THRESHOLD = int(os.getenv('PAYLOAD_COMPRESS_THRESHOLD', '2048'))
+PAYLOAD_MAX_STORED_BYTES = int(os.getenv('PAYLOAD_MAX_STORED_BYTES', str(1024 * 1024)))
+
+# Inbound bodies above this size are rejected with 413 (per-endpoint max_body_bytes overrides)
+WEBHOOK_MAX_BODY_BYTES = int(os.getenv('WEBHOOK_MAX_BODY_BYTES', str(10 * 1024 * 1024)))
+
+# Streaming NDJSON contact imports (/api/hooks/{path}/stream)
+STREAM_IMPORT_MAX_BYTES = int(os.getenv('STREAM_IMPORT_MAX_BYTES', str(2 * 1024 * 1024 * 1024)))
+# HMAC-mode imports are spooled to disk before the signature can be checked, so unauthenticated
+# bodies are capped much lower (the endpoint's max_body_bytes when set)
+STREAM_IMPORT_SPOOL_MAX_BYTES = int(os.getenv('STREAM_IMPORT_SPOOL_MAX_BYTES', str(64 * 1024 * 1024)))
+NDJSON_CONTENT_TYPES = ('application/x-ndjson', 'application/ndjson', 'application/jsonl', 'application/json-lines')
+contact_imports = ContactImports(
+    db,
+    chunk_size=int(os.getenv('STREAM_IMPORT_CHUNK_SIZE', '5000')),
+    concurrency=SENDGRID_UPSERT_CONCURRENCY
+)
+
+# Materialized dashboard counters, updated as log batches are written
+# Only registered endpoints get per-endpoint counters (404 logs carry the requested path)
+def is_registered_endpoint(endpoint_id: str) -> bool:
+    return endpoint_registry.get_by_id(endpoint_id) is not None
+
+stats_counters = StatsCounters(
+    db,
+    reconcile_interval=float(os.getenv('STATS_RECONCILE_SECONDS', '3600')),
+    known_endpoint=is_registered_endpoint
+)
+log_writer.add_listener(stats_counters.record)
+
+# Per-minute / per-hour throughput and latency buckets for dashboard charts
+metric_rollups = MetricRollups(db, retention={
+    "minute": timedelta(days=int(os.getenv('ROLLUP_MINUTE_RETENTION_DAYS', '7'))),
+    "hour": timedelta(days=int(os.getenv('ROLLUP_HOUR_RETENTION_DAYS', '400')))
+}, known_endpoint=is_registered_endpoint)
+log_writer.add_listener(metric_rollups.record)
+
+# Log retention (TTL-enforced) and archival of expiring logs
+log_retention = LogRetention(
+    db,
+    archive_dir=os.getenv('LOG_ARCHIVE_DIR', '/opt/webhook-gateway/archives'),
+    interval=float(os.getenv('LOG_ARCHIVE_INTERVAL_SECONDS', '300'))
+)
+
+# Circuit breakers and adaptive concurrency limits per downstream provider
+provider_guards = ProviderGuards(
+    breaker_options={
+        "failure_rate": float(os.getenv('CIRCUIT_FAILURE_RATE', '0.5')),
+        "slow_call_ms": float(os.getenv('CIRCUIT_SLOW_CALL_MS', '10000')),
+        "window_size": int(os.getenv('CIRCUIT_WINDOW_SIZE', '20')),
+        "min_calls": int(os.getenv('CIRCUIT_MIN_CALLS', '10')),
+        "open_seconds": float(os.getenv('CIRCUIT_OPEN_SECONDS', '30'))
+    },
+    initial_concurrency=int(os.getenv('PROVIDER_INITIAL_CONCURRENCY', '10')),
+    max_concurrency=int(os.getenv('PROVIDER_MAX_CONCURRENCY', '50')),
+    acquire_timeout=float(os.getenv('PROVIDER_ACQUIRE_TIMEOUT', '10'))
+)
+
+# Background syslog forwarding (persistent connection, batched writes)
+syslog_forwarder = SyslogForwarder(db, queue_size=int(os.getenv('SYSLOG_QUEUE_SIZE', '10000')))
+
+# bcrypt runs on its own bounded thread pool, off the event loop
+password_hasher = PasswordHasher(
+    rounds=int(os.getenv('BCRYPT_ROUNDS', '12')),
+    workers=int(os.getenv('BCRYPT_WORKERS', '2')),
+    max_queue=int(os.getenv('BCRYPT_MAX_QUEUE', '64')),
+    logins_per_ip=int(os.getenv('LOGIN_CONCURRENCY_PER_IP', '2'))
+)
+
+# In-memory routing table for /api/hooks/{path}
+endpoint_registry = EndpointRegistry(db, poll_interval=float(os.getenv('ENDPOINT_CACHE_POLL_SECONDS', '5')))
+
+# Inbound token / HMAC signature checks, keyed HMAC objects cached per endpoint
+webhook_verifier = WebhookVerifier()
+
 # Helper function to get real client IP from headers (for Cloudflare/proxy)
 def get_real_ip(request: Request) -> str:
     """Extract real client IP from request headers (Cloudflare, proxy, etc.)"""
@@ -75,6 +187,41 @@ def get_real_ip(request: Request) -> str:
     # Fallback to direct client host
     return request.client.host if request.client else "unknown"
 
+# Proxies whose forwarding headers are trusted for rate limiting (comma-separated IPs or CIDRs)
+TRUSTED_PROXIES = [
+    ipaddress.ip_network(value.strip(), strict=False)
+    for value in os.getenv('TRUSTED_PROXIES', '').split(',') if value.strip()
+]
+
+def is_trusted_proxy(host: str) -> bool:
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return any(address in network for network in TRUSTED_PROXIES)
+
+def get_client_ip(request: Request) -> str:
+    """Client IP for rate limiting: forwarding headers count only when sent by a trusted proxy"""
+    peer = request.client.host if request.client else "unknown"
+    if not is_trusted_proxy(peer):
+        return peer
+    
+    cf_connecting_ip = request.headers.get("CF-Connecting-IP")
+    if cf_connecting_ip:
+        return cf_connecting_ip.strip()
+    
+    # Proxies append to X-Forwarded-For, so the first hop that is not one of ours is the client
+    x_forwarded_for = request.headers.get("X-Forwarded-For")
+    if x_forwarded_for:
+        for hop in reversed([hop.strip() for hop in x_forwarded_for.split(",") if hop.strip()]):
+            if not is_trusted_proxy(hop):
+                return hop
+    
+    x_real_ip = request.headers.get("X-Real-IP")
+    if x_real_ip:
+        return x_real_ip.strip()
+    return peer
+
 # Models
 class User(BaseModel):
     model_config = ConfigDict(extra="ignore")
@@ -98,6 +245,12 @@ class PasswordChange(BaseModel):
     old_password: str
     new_password: str
 
+class RetryPolicy(BaseModel):
+    # Unset fields fall back to the DELIVERY_* defaults
+    max_attempts: Optional[int] = None  # Total delivery attempts; 1 disables automatic retries
+    base_delay_seconds: Optional[float] = None
+    max_delay_seconds: Optional[float] = None
+
 class WebhookEndpoint(BaseModel):
     model_config = ConfigDict(extra="ignore")
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -113,6 +266,14 @@ class WebhookEndpoint(BaseModel):
     # mailto, cc, bcc come from webhook payload
     email_from: Optional[str] = None  # Can be static or dynamic
     email_from_name: Optional[str] = None  # Can be static or dynamic
+    delivery_mode: str = "sync"  # "sync" (deliver in request) or "async" (queue and return 202)
+    contact_batching: bool = False  # add_contact only: coalesce hooks into shared SendGrid upserts
+    max_logged_payload_bytes: Optional[int] = None  # Cap on the stored (compressed) payload, default PAYLOAD_MAX_STORED_BYTES
+    max_body_bytes: Optional[int] = None  # Largest accepted request body, default WEBHOOK_MAX_BODY_BYTES
+    retry_policy: Optional[RetryPolicy] = None  # Automatic retries of failed deliveries, default DELIVERY_* settings
+    auth_mode: AuthMode = "token"  # "token", "hmac_sha256" (GitHub style) or "hmac_sha256_timestamp" (Stripe style); secret_token is the HMAC key
+    signature_header: Optional[str] = None  # HMAC modes, default X-Webhook-Signature
+    signature_tolerance_seconds: Optional[int] = Field(default=None, gt=0)  # hmac_sha256_timestamp, default 300
     created_by: str
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     enabled: bool = True
@@ -127,7 +288,14 @@ class WebhookEndpointCreate(BaseModel):
     sendgrid_template_id: Optional[str] = None
     email_from: Optional[str] = None
     email_from_name: Optional[str] = None
-    email_from_name: Optional[str] = None
+    delivery_mode: str = "sync"
+    contact_batching: bool = False
+    max_logged_payload_bytes: Optional[int] = None
+    max_body_bytes: Optional[int] = None
+    retry_policy: Optional[RetryPolicy] = None
+    auth_mode: AuthMode = "token"
+    signature_header: Optional[str] = None
+    signature_tolerance_seconds: Optional[int] = Field(default=None, gt=0)
 
 class WebhookLog(BaseModel):
     model_config = ConfigDict(extra="ignore")
@@ -137,11 +305,12 @@ class WebhookLog(BaseModel):
     integration: Optional[str] = "sendgrid"  # Integration name
     mode: Optional[str] = "add_contact"  # add_contact or send_email
     timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
-    payload_summary: str
-    payload: Optional[Dict[str, Any]] = None  # Full payload for detail view
+    payload_summary: str = ""
+    payload: Optional[Dict[str, Any]] = None  # Full payload for detail view (small payloads only, see payload_store)
     status: str  # success, failed, unauthorized
     response_message: str = ""
     source_ip: Optional[str] = None
+    duration_ms: Optional[float] = None  # Processing time of the delivery
 
 class APIKey(BaseModel):
     model_config = ConfigDict(extra="ignore")
@@ -174,7 +343,9 @@ class SyslogConfig(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     host: str
     port: int
-    protocol: str  # 'udp' or 'tcp'
+    protocol: str  # 'udp', 'tcp' or 'tls'
+    framing: str = 'non_transparent'  # 'non_transparent' (LF) or 'octet_counting' (RFC 6587), stream transports only
+    tls_verify: bool = True
     enabled: bool = True
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
@@ -182,20 +353,30 @@ class SyslogConfigCreate(BaseModel):
     host: str
     port: int
     protocol: str = 'udp'
+    framing: str = 'non_transparent'
+    tls_verify: bool = True
     enabled: bool = True
 
 # Helper Functions
-def hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+async def hash_password(password: str) -> str:
+    try:
+        return await password_hasher.hash(password)
+    except HasherBusy:
+        raise HTTPException(status_code=503, detail="Server busy, try again shortly", headers={"Retry-After": "1"})
 
-def verify_password(password: str, hashed: str) -> bool:
-    return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+async def verify_password(password: str, hashed: str) -> bool:
+    try:
+        return await password_hasher.verify(password, hashed)
+    except HasherBusy:
+        raise HTTPException(status_code=503, detail="Server busy, try again shortly", headers={"Retry-After": "1"})
 
-def create_token(user_id: str, username: str, role: str) -> str:
+def create_token(user_id: str, username: str, role: str, token_version: int = 0) -> str:
     payload = {
         'user_id': user_id,
         'username': username,
         'role': role,
+        # Bumped on password change to revoke previously issued tokens
+        'tv': token_version,
         'exp': datetime.now(timezone.utc) + timedelta(hours=JWT_EXPIRATION_HOURS)
     }
     return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
@@ -215,12 +396,21 @@ def encrypt_data(data: str) -> str:
 def decrypt_data(encrypted: str) -> str:
     return cipher.decrypt(encrypted.encode()).decode()
 
+# Decrypted integration credentials, cached per service
+credential_store = CredentialStore(db, decrypt_data, ttl=float(os.getenv('CREDENTIALS_CACHE_TTL_SECONDS', '60')))
+
+# User principals for authentication, cached per user id
+user_cache = UserCache(db, ttl=float(os.getenv('USER_CACHE_TTL_SECONDS', '30')))
+
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
     token = credentials.credentials
     payload = verify_token(token)
-    user = await db.users.find_one({"id": payload['user_id']}, {"_id": 0})
+    user = await user_cache.get(payload['user_id'])
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
+    # Tokens issued before the tv claim existed carry no version and stay valid until they expire
+    if 'tv' in payload and payload['tv'] != user.get('token_version', 0):
+        raise HTTPException(status_code=401, detail="Token revoked")
     return user
 
 async def get_admin_user(current_user: dict = Depends(get_current_user)):
@@ -231,7 +421,13 @@ async def get_admin_user(current_user: dict = Depends(get_current_user)):
 # Initialize default admin user
 @app.on_event("startup")
 async def startup_event():
-    global backup_scheduler
+    global backup_scheduler, timestamp_migration_task
+    
+    # Shared outbound HTTP client (keep-alive pools per host)
+    await start_http_client()
+    
+    # Apply the index registry (idempotent)
+    await ensure_indexes(db)
     
     # Create default admin if not exists
     admin = await db.users.find_one({"username": "admin"})
@@ -242,7 +438,7 @@ async def startup_event():
             force_password_change=True
         )
         admin_dict = admin_user.model_dump()
-        admin_dict['password_hash'] = hash_password("admin123")
+        admin_dict['password_hash'] = await hash_password("admin123")
         admin_dict['created_at'] = admin_dict['created_at'].isoformat()
         await db.users.insert_one(admin_dict)
         logging.info("Default admin user created: admin/admin123")
@@ -261,21 +457,50 @@ async def startup_event():
     
     backup_scheduler.start()
     logging.info("Backup scheduler started")
+    
+    # Load webhook routing table and follow changes from other workers
+    await endpoint_registry.load()
+    endpoint_registry.start()
+    
+    # Start the buffered log writer and the dashboard counters recount job
+    log_writer.start()
+    stats_counters.start()
+    
+    # Convert logs written with ISO-string timestamps, in batches
+    timestamp_migration_task = asyncio.create_task(migrate_string_timestamps(db.webhook_logs))
+    
+    # Load log retention settings and start the archiver
+    await log_retention.load_settings()
+    log_retention.start()
+    
+    # Start background syslog forwarding
+    await syslog_forwarder.load_config()
+    syslog_forwarder.start()
+    
+    # Start workers for async-mode deliveries
+    await delivery_queue.initialize()
+    delivery_queue.start()
+    await bulk_retry.initialize()
+    await contact_imports.initialize()
 
 # Auth Routes
 @api_router.post("/auth/login")
-async def login(user_data: UserLogin):
-    user = await db.users.find_one({"username": user_data.username}, {"_id": 0})
-    if not user or not verify_password(user_data.password, user['password_hash']):
-        raise HTTPException(status_code=401, detail="Invalid credentials")
-    
-    # Update last login
-    await db.users.update_one(
-        {"id": user['id']},
-        {"$set": {"last_login": datetime.now(timezone.utc).isoformat()}}
-    )
+async def login(user_data: UserLogin, request: Request):
+    try:
+        async with password_hasher.login_slot(get_client_ip(request)):
+            user = await db.users.find_one({"username": user_data.username}, {"_id": 0})
+            if not user or not await verify_password(user_data.password, user['password_hash']):
+                raise HTTPException(status_code=401, detail="Invalid credentials")
+            
+            # Update last login, rehashing if the configured work factor changed
+            update = {"last_login": datetime.now(timezone.utc).isoformat()}
+            if password_hasher.needs_rehash(user['password_hash']):
+                update['password_hash'] = await hash_password(user_data.password)
+            await db.users.update_one({"id": user['id']}, {"$set": update})
+    except TooManyLogins:
+        raise HTTPException(status_code=429, detail="Too many login attempts in progress", headers={"Retry-After": "1"})
     
-    token = create_token(user['id'], user['username'], user['role'])
+    token = create_token(user['id'], user['username'], user['role'], user.get('token_version', 0))
     
     return {
         "token": token,
@@ -291,16 +516,22 @@ async def login(user_data: UserLogin):
 async def change_password(pwd_data: PasswordChange, current_user: dict = Depends(get_current_user)):
     user = await db.users.find_one({"id": current_user['id']}, {"_id": 0})
     
-    if not verify_password(pwd_data.old_password, user['password_hash']):
+    if not await verify_password(pwd_data.old_password, user['password_hash']):
         raise HTTPException(status_code=400, detail="Current password is incorrect")
     
-    new_hash = hash_password(pwd_data.new_password)
-    await db.users.update_one(
+    new_hash = await hash_password(pwd_data.new_password)
+    user = await db.users.find_one_and_update(
         {"id": current_user['id']},
-        {"$set": {"password_hash": new_hash, "force_password_change": False}}
+        {"$set": {"password_hash": new_hash, "force_password_change": False}, "$inc": {"token_version": 1}},
+        projection={"_id": 0, "password_hash": 0},
+        return_document=ReturnDocument.AFTER
     )
+    user_cache.invalidate(current_user['id'])
+    
+    # Tokens issued before the change are revoked; hand the caller a fresh one
+    token = create_token(user['id'], user['username'], user['role'], user['token_version'])
     
-    return {"message": "Password changed successfully"}
+    return {"message": "Password changed successfully", "token": token}
 
 @api_router.get("/auth/me")
 async def get_me(current_user: dict = Depends(get_current_user)):
@@ -331,10 +562,11 @@ async def create_user(user_data: UserCreate, current_user: dict = Depends(get_ad
     
     user = User(username=user_data.username, role=user_data.role)
     user_dict = user.model_dump()
-    user_dict['password_hash'] = hash_password(user_data.password)
+    user_dict['password_hash'] = await hash_password(user_data.password)
     user_dict['created_at'] = user_dict['created_at'].isoformat()
     
     await db.users.insert_one(user_dict)
+    user_cache.invalidate(user.id)
     return user
 
 @api_router.delete("/users/{user_id}")
@@ -343,6 +575,7 @@ async def delete_user(user_id: str, current_user: dict = Depends(get_admin_user)
         raise HTTPException(status_code=400, detail="Cannot delete your own account")
     
     result = await db.users.delete_one({"id": user_id})
+    user_cache.invalidate(user_id)
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="User not found")
     
@@ -372,16 +605,18 @@ async def create_webhook_endpoint(endpoint_data: WebhookEndpointCreate, current_
     endpoint_dict['created_at'] = endpoint_dict['created_at'].isoformat()
     
     await db.webhook_endpoints.insert_one(endpoint_dict)
+    await endpoint_registry.refresh(endpoint.id)
     return endpoint
 
 @api_router.put("/webhooks/endpoints/{endpoint_id}")
 async def update_webhook_endpoint(endpoint_id: str, endpoint_data: WebhookEndpointCreate, current_user: dict = Depends(get_current_user)):
     result = await db.webhook_endpoints.update_one(
         {"id": endpoint_id},
-        {"$set": endpoint_data.model_dump()}
+        {"$set": endpoint_data.model_dump(exclude_unset=True)}
     )
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Endpoint not found")
+    await endpoint_registry.refresh(endpoint_id)
     return {"message": "Endpoint updated successfully"}
 
 @api_router.delete("/webhooks/endpoints/{endpoint_id}")
@@ -389,6 +624,8 @@ async def delete_webhook_endpoint(endpoint_id: str, current_user: dict = Depends
     result = await db.webhook_endpoints.delete_one({"id": endpoint_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Endpoint not found")
+    await endpoint_registry.remove(endpoint_id)
+    webhook_verifier.forget(endpoint_id)
     return {"message": "Endpoint deleted successfully"}
 
 @api_router.post("/webhooks/endpoints/{endpoint_id}/regenerate-token")
@@ -400,49 +637,84 @@ async def regenerate_token(endpoint_id: str, current_user: dict = Depends(get_cu
     )
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Endpoint not found")
+    await endpoint_registry.refresh(endpoint_id)
     return {"secret_token": new_token}
 
 # Webhook Handler (Public endpoint)
 @api_router.post("/hooks/{path}")
-async def handle_webhook(path: str, request: Request, x_webhook_token: Optional[str] = Header(None)):
+async def handle_webhook(path: str, request: Request):
+    started = time.perf_counter()
+    
     # Get real client IP
     real_ip = get_real_ip(request)
     
-    # Find endpoint
-    endpoint = await db.webhook_endpoints.find_one({"path": path, "enabled": True}, {"_id": 0})
+    # Find endpoint (in-memory routing table, no DB round trip)
+    endpoint = endpoint_registry.get(path)
     if not endpoint:
         await log_webhook(path, "Endpoint not found", "failed", real_ip, {})
         raise HTTPException(status_code=404, detail="Webhook endpoint not found")
     
-    # Verify token
-    if x_webhook_token != endpoint['secret_token']:
-        await log_webhook(endpoint['id'], endpoint['name'], "unauthorized", real_ip, {})
-        raise HTTPException(status_code=401, detail="Invalid webhook token")
+    # Verify token or signature (HMAC modes hash the raw body)
+    try:
+        verification = webhook_verifier.begin(endpoint, request.headers)
+    except VerificationError as e:
+        await log_webhook(endpoint['id'], endpoint['name'], "unauthorized", real_ip, {}, str(e))
+        raise HTTPException(status_code=401, detail=str(e))
+    
+    # Stream the body under the size cap, hashing it for the signature as it arrives
+    try:
+        body = await read_body(request, endpoint.get('max_body_bytes') or WEBHOOK_MAX_BODY_BYTES, verification.update)
+    except PayloadTooLarge as e:
+        await log_webhook(endpoint['id'], endpoint['name'], "failed", real_ip, {}, str(e))
+        raise HTTPException(status_code=413, detail=str(e))
+    if not verification.verify():
+        await log_webhook(endpoint['id'], endpoint['name'], "unauthorized", real_ip, {}, "Invalid webhook signature")
+        raise HTTPException(status_code=401, detail="Invalid webhook signature")
     
     # Parse payload
     try:
-        payload = await request.json()
+        payload = loads(body)
     except:
         await log_webhook(endpoint['id'], endpoint['name'], "failed", real_ip, {}, "Invalid JSON payload")
         raise HTTPException(status_code=400, detail="Invalid JSON payload")
     
     # Process based on mode
+    retry_id = None
     try:
-        mode = endpoint['mode']
-        if mode == 'add_contact':
-            result = await process_add_contact(endpoint, payload)
-        elif mode == 'send_email':
-            result = await process_send_email(endpoint, payload)
-        elif mode == 'ntfy':
-            result = await process_ntfy_notification(endpoint, payload)
-        elif mode == 'discord':
-            result = await process_discord_message(endpoint, payload)
-        elif mode == 'slack':
-            result = await process_slack_message(endpoint, payload)
-        elif mode == 'telegram':
-            result = await process_telegram_message(endpoint, payload)
-        else:
-            result = {"status": "failed", "message": "Invalid mode"}
+        # Batched add_contact: buffer the contacts and resolve the log entry on flush
+        if endpoint['mode'] == 'add_contact' and endpoint.get('contact_batching'):
+            contacts = map_contacts(endpoint, payload)
+            if not contacts:
+                await log_webhook(endpoint['id'], endpoint['name'], "failed", real_ip, payload, "No valid contacts found in payload", endpoint.get('integration', 'sendgrid'), 'add_contact', raw_payload=body)
+                return {"status": "failed", "message": "No valid contacts found in payload", "detail": ""}
+            log_id = await log_webhook(endpoint['id'], endpoint['name'], "queued", real_ip, payload, "Queued for batched SendGrid upsert", endpoint.get('integration', 'sendgrid'), 'add_contact', raw_payload=body)
+            contact_batcher.add((endpoint['id'], endpoint.get('sendgrid_list_id')), log_id, contacts)
+            return JSONResponse(
+                status_code=202,
+                content={
+                    "status": "accepted",
+                    "message": f"{len(contacts)} {'contact' if len(contacts) == 1 else 'contacts'} queued for batched upsert",
+                    "log_id": log_id
+                }
+            )
+        
+        # Async mode: persist the job and acknowledge right away
+        if endpoint.get('delivery_mode') == 'async':
+            delivery_id = await delivery_queue.enqueue(endpoint, payload, real_ip)
+            return JSONResponse(
+                status_code=202,
+                content={
+                    "status": "accepted",
+                    "message": "Webhook queued for delivery",
+                    "delivery_id": delivery_id
+                }
+            )
+        
+        result = await dispatch_webhook(endpoint, payload)
+        
+        # Schedule automatic retries of failed deliveries per the endpoint's retry policy
+        if result.get('status') == 'failed' and result.get('retryable'):
+            retry_id = await schedule_retry(endpoint, payload, real_ip, result)
         
         await log_webhook(
             endpoint['id'],
@@ -452,18 +724,27 @@ async def handle_webhook(path: str, request: Request, x_webhook_token: Optional[
             payload,
             result.get('message', ''),
             endpoint.get('integration', 'sendgrid'),
-            endpoint.get('mode', 'add_contact')
+            endpoint.get('mode', 'add_contact'),
+            (time.perf_counter() - started) * 1000,
+            raw_payload=body,
+            retry_id=retry_id
         )
         
         # Ensure result is JSON serializable
-        return {
+        response = {
             "status": result.get('status', 'unknown'),
             "message": result.get('message', 'No message'),
             "detail": result.get('detail', '')
         }
+        if retry_id:
+            response["retry_id"] = retry_id
+        return response
     except Exception as e:
         error_message = str(e) if str(e) else "Unknown error occurred"
         logger.error(f"Webhook processing error: {error_message}", exc_info=True)
+        # Only transport errors are worth retrying; anything else fails the same way again
+        if retry_id is None:
+            retry_id = await schedule_retry(endpoint, payload, real_ip, {"message": error_message, "retryable": is_retryable_error(e)})
         await log_webhook(
             endpoint['id'], 
             endpoint['name'], 
@@ -472,25 +753,205 @@ async def handle_webhook(path: str, request: Request, x_webhook_token: Optional[
             payload, 
             error_message,
             endpoint.get('integration', 'sendgrid'),
-            endpoint.get('mode', 'add_contact')
+            endpoint.get('mode', 'add_contact'),
+            (time.perf_counter() - started) * 1000,
+            raw_payload=body,
+            retry_id=retry_id
         )
         raise HTTPException(status_code=500, detail=error_message)
 
-async def process_add_contact(endpoint: dict, payload: dict) -> dict:
-    # Get SendGrid API key
-    api_key_doc = await db.api_keys.find_one({"service_name": "sendgrid"}, {"_id": 0})
-    if not api_key_doc:
-        return {"status": "failed", "message": "SendGrid API key not configured"}
+async def guarded_upsert_contacts(api_key: str, contacts: list, list_ids: Optional[list]) -> dict:
+    """upsert_contacts behind the SendGrid circuit breaker and concurrency limit"""
+    async def deliver():
+        result = await upsert_contacts(api_key, contacts, list_ids)
+        return {**result, "status": "success" if result['success'] else "failed"}
+    
+    result = await provider_guards.call("sendgrid", deliver)
+    if 'success' not in result:
+        # Rejected by the breaker or the concurrency limit without calling SendGrid
+        return {'success': False, 'job_id': None, 'message': result['message'], 'retryable': True}
+    return result
+
+# Streaming contact import (Public endpoint)
+@api_router.post("/hooks/{path}/stream")
+async def handle_webhook_stream(path: str, request: Request):
+    """Import NDJSON contacts (one JSON object per line) into an add_contact endpoint"""
+    started = time.perf_counter()
+    real_ip = get_real_ip(request)
     
-    api_key = decrypt_data(api_key_doc['credentials']['api_key'])
-    # Clean the API key
-    api_key = api_key.encode('ascii', 'ignore').decode('ascii').strip()
+    endpoint = endpoint_registry.get(path)
+    if not endpoint:
+        await log_webhook(path, "Endpoint not found", "failed", real_ip, {})
+        raise HTTPException(status_code=404, detail="Webhook endpoint not found")
     
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json"
-    }
+    try:
+        verification = webhook_verifier.begin(endpoint, request.headers)
+    except VerificationError as e:
+        await log_webhook(endpoint['id'], endpoint['name'], "unauthorized", real_ip, {}, str(e))
+        raise HTTPException(status_code=401, detail=str(e))
     
+    spool = None
+    try:
+        if endpoint.get('auth_mode', 'token') != 'token':
+            # A signature can only be checked once the whole body is read, so spool it first
+            spool_max_bytes = endpoint.get('max_body_bytes') or STREAM_IMPORT_SPOOL_MAX_BYTES
+            spool = await spool_body(request, spool_max_bytes, verification.update)
+            if not verification.verify():
+                await log_webhook(endpoint['id'], endpoint['name'], "unauthorized", real_ip, {}, "Invalid webhook signature")
+                raise HTTPException(status_code=401, detail="Invalid webhook signature")
+        
+        # Only authenticated callers learn how the endpoint is configured
+        if endpoint['mode'] != 'add_contact':
+            raise HTTPException(status_code=400, detail="Streaming import is only available for add_contact endpoints")
+        content_type = request.headers.get('content-type', '').split(';')[0].strip().lower()
+        if content_type not in NDJSON_CONTENT_TYPES:
+            raise HTTPException(status_code=415, detail="Expected an application/x-ndjson body")
+        
+        sendgrid_credentials = await credential_store.get("sendgrid")
+        if not sendgrid_credentials:
+            raise HTTPException(status_code=503, detail="SendGrid API key not configured")
+        api_key = sendgrid_credentials['api_key']
+        list_ids = [endpoint['sendgrid_list_id']] if endpoint.get('sendgrid_list_id') else None
+        
+        # Token mode imports records as the body arrives
+        chunks = iter_file(spool) if spool is not None else iter_body(request, STREAM_IMPORT_MAX_BYTES)
+        job = await contact_imports.run(
+            endpoint,
+            chunks,
+            endpoint_registry.compiled_mapping(endpoint),
+            lambda contacts: guarded_upsert_contacts(api_key, contacts, list_ids),
+            real_ip
+        )
+    except PayloadTooLarge as e:
+        await log_webhook(endpoint['id'], endpoint['name'], "failed", real_ip, {}, str(e), 'sendgrid', 'add_contact')
+        raise HTTPException(status_code=413, detail=str(e))
+    except LineTooLong as e:
+        await log_webhook(endpoint['id'], endpoint['name'], "failed", real_ip, {}, str(e), 'sendgrid', 'add_contact')
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        if spool is not None:
+            spool.close()
+    
+    list_msg = f" to list {endpoint.get('sendgrid_list_id')}" if endpoint.get('sendgrid_list_id') else ""
+    message = (f"Streaming import {job['id']}: {job['upserted']} of {job['records']} records added{list_msg} "
+               f"in {job['requests']} request(s); {job['failed']} failed, {job['skipped']} without email, {job['invalid']} invalid")
+    status = "success" if job['status'] == 'completed' else "failed"
+    await log_webhook(
+        endpoint['id'],
+        endpoint['name'],
+        status,
+        real_ip,
+        {"import_id": job['id'], "records": job['records']},
+        message,
+        'sendgrid',
+        'add_contact',
+        (time.perf_counter() - started) * 1000
+    )
+    return {"status": status, "message": message, "import": job}
+
+@api_router.get("/imports")
+async def list_contact_imports(endpoint_id: Optional[str] = None, limit: int = 20, current_user: dict = Depends(get_current_user)):
+    """Recent streaming contact imports, newest first"""
+    return await contact_imports.list(endpoint_id, min(max(limit, 1), 100))
+
+@api_router.get("/imports/{import_id}")
+async def get_contact_import(import_id: str, current_user: dict = Depends(get_current_user)):
+    """Progress of a streaming contact import (updated while it runs)"""
+    job = await contact_imports.get(import_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Import not found")
+    return job
+
+# Downstream provider called by each mode
+DELIVERY_PROVIDERS = {
+    'add_contact': 'sendgrid',
+    'send_email': 'sendgrid',
+    'ntfy': 'ntfy',
+    'discord': 'discord',
+    'slack': 'slack',
+    'telegram': 'telegram'
+}
+
+async def dispatch_webhook(endpoint: dict, payload: dict) -> dict:
+    """Run the processor for the endpoint's mode behind its provider's circuit breaker"""
+    provider = DELIVERY_PROVIDERS.get(endpoint['mode'])
+    if not provider:
+        return {"status": "failed", "message": "Invalid mode", "retryable": False}
+    return await provider_guards.call(provider, lambda: run_processor(endpoint, payload))
+
+async def run_processor(endpoint: dict, payload: dict) -> dict:
+    mode = endpoint['mode']
+    if mode == 'add_contact':
+        return await process_add_contact(endpoint, payload)
+    elif mode == 'send_email':
+        return await process_send_email(endpoint, payload)
+    elif mode == 'ntfy':
+        return await process_ntfy_notification(endpoint, payload)
+    elif mode == 'discord':
+        return await process_discord_message(endpoint, payload)
+    elif mode == 'slack':
+        return await process_slack_message(endpoint, payload)
+    elif mode == 'telegram':
+        return await process_telegram_message(endpoint, payload)
+    return {"status": "failed", "message": "Invalid mode", "retryable": False}
+
+async def deliver_queued_job(job: dict) -> dict:
+    """Delivery queue handler: process an async-mode webhook and log the result"""
+    endpoint = endpoint_registry.get_by_id(job['endpoint_id'])
+    if not endpoint:
+        await log_webhook(job['endpoint_id'], job['endpoint_name'], "failed", job['source_ip'], job['payload'], "Endpoint not found or deleted")
+        return {"status": "failed", "message": "Endpoint not found or deleted", "retryable": False}
+    
+    started = time.perf_counter()
+    try:
+        result = await dispatch_webhook(endpoint, job['payload'])
+    except Exception as e:
+        logger.error(f"Queued webhook processing error: {e}", exc_info=True)
+        result = {"status": "failed", "message": str(e) or "Unknown error occurred", "retryable": is_retryable_error(e)}
+    
+    message = result.get('message', '')
+    max_attempts = (job.get('retry_policy') or {}).get('max_attempts', 1)
+    if max_attempts > 1:
+        message = f"Attempt {job['attempts']}/{max_attempts}: {message}"
+    
+    # Attempts the queue will retry itself are marked so they are not replayed as well
+    retry_id = job['id'] if result.get('status') == 'failed' and delivery_queue.will_retry(job, result) else None
+    await log_webhook(
+        endpoint['id'],
+        endpoint['name'],
+        result['status'],
+        job['source_ip'],
+        job['payload'],
+        message,
+        endpoint.get('integration', 'sendgrid'),
+        endpoint.get('mode', 'add_contact'),
+        (time.perf_counter() - started) * 1000,
+        retry_id=retry_id
+    )
+    return result
+
+# Durable queue for async-mode endpoints and retries of failed deliveries
+delivery_queue = DeliveryQueue(
+    db,
+    deliver_queued_job,
+    workers=int(os.getenv('DELIVERY_WORKERS', '4')),
+    default_policy={
+        "max_attempts": int(os.getenv('DELIVERY_MAX_ATTEMPTS', '5')),
+        "base_delay_seconds": float(os.getenv('DELIVERY_RETRY_BASE_SECONDS', '30')),
+        "max_delay_seconds": float(os.getenv('DELIVERY_RETRY_MAX_SECONDS', '3600'))
+    }
+)
+
+async def schedule_retry(endpoint: dict, payload: dict, source_ip: str, result: dict) -> Optional[str]:
+    """Queue an automatic retry of a failed delivery; returns the job id, None if none was scheduled"""
+    try:
+        return await delivery_queue.enqueue_retry(endpoint, payload, source_ip, result)
+    except Exception as e:
+        logger.error(f"Failed to schedule webhook retry: {e}")
+        return None
+
+def map_contacts(endpoint: dict, payload: dict) -> list:
+    """Map an add_contact payload (single contact or "contacts" array) to SendGrid contacts"""
     # Check if payload contains bulk contacts or single contact
     if 'contacts' in payload and isinstance(payload['contacts'], list):
         # Bulk mode: payload has "contacts" array
@@ -501,99 +962,144 @@ async def process_add_contact(endpoint: dict, payload: dict) -> dict:
         raw_contacts = [payload]
         logger.info(f"Processing single contact")
     
-    # Build SendGrid contacts array
-    sendgrid_contacts = []
+    # Field mapping is compiled once per endpoint version
+    return endpoint_registry.compiled_mapping(endpoint).map_contacts(raw_contacts)
+
+async def process_add_contact(endpoint: dict, payload: dict) -> dict:
+    # Get SendGrid API key (decrypted and cleaned by the credential store)
+    sendgrid_credentials = await credential_store.get("sendgrid")
+    if not sendgrid_credentials:
+        return {"status": "failed", "message": "SendGrid API key not configured", "retryable": False}
     
-    for contact_data in raw_contacts:
-        # Map fields for this contact
-        email_config = endpoint['field_mapping'].get('email', 'email')
-        email_field = email_config if isinstance(email_config, str) else email_config.get('payload_field', 'email')
-        email = contact_data.get(email_field)
-        
-        if not email:
-            logger.warning(f"Skipping contact - Email field '{email_field}' not found in contact data")
-            continue  # Skip this contact but continue processing others
-        
-        sendgrid_contact = {"email": email}
-        
-        # Dynamically map all fields from field_mapping
-        logger.info(f"Field mapping: {endpoint.get('field_mapping', {})}")
-        logger.info(f"Contact data: {contact_data}")
-        
-        for sendgrid_field, config in endpoint.get('field_mapping', {}).items():
-            if sendgrid_field == 'email':
-                continue  # Already handled
-            
-            # Handle both old and new format
-            if isinstance(config, str):
-                # Old format: {"first_name": "firstname"}
-                payload_field = config
-                is_custom = False
-            else:
-                # New format: {"first_name": {"payload_field": "firstname", "is_custom": false}}
-                payload_field = config.get('payload_field', '')
-                is_custom = config.get('is_custom', False)
-            
-            # Get value from contact data using the mapped field name
-            field_value = contact_data.get(payload_field)
-            logger.info(f"Checking field: {sendgrid_field} -> {payload_field}, is_custom: {is_custom}, value: {field_value}")
-            
-            if field_value:
-                if is_custom:
-                    # Custom SendGrid field - add to custom_fields object
-                    if 'custom_fields' not in sendgrid_contact:
-                        sendgrid_contact['custom_fields'] = {}
-                    sendgrid_contact['custom_fields'][sendgrid_field] = field_value
-                    logger.info(f"Added custom field: {sendgrid_field} = {field_value}")
-                else:
-                    # Standard SendGrid field
-                    sendgrid_contact[sendgrid_field] = field_value
-                    logger.info(f"Added standard field: {sendgrid_field} = {field_value}")
-        
-        sendgrid_contacts.append(sendgrid_contact)
+    api_key = sendgrid_credentials['api_key']
+    
+    sendgrid_contacts = map_contacts(endpoint, payload)
     
     # Check if we have any valid contacts
     if not sendgrid_contacts:
-        return {"status": "failed", "message": "No valid contacts found in payload"}
-    
-    # Build final request data
-    contact_request = {"contacts": sendgrid_contacts}
+        return {"status": "failed", "message": "No valid contacts found in payload", "retryable": False}
     
     # Add list_ids if specified
-    if endpoint.get('sendgrid_list_id'):
-        contact_request['list_ids'] = [endpoint['sendgrid_list_id']]
-    
-    # Log the data being sent to SendGrid for debugging
-    logger.info(f"SendGrid contact data: {json.dumps(contact_request)}")
-    
-    response = requests.put(
-        "https://api.sendgrid.com/v3/marketing/contacts",
-        headers=headers,
-        json=contact_request
-    )
+    list_ids = [endpoint['sendgrid_list_id']] if endpoint.get('sendgrid_list_id') else None
+    
+    # Split into chunks within SendGrid's per-request limits and submit them concurrently
+    chunks = chunk_contacts(sendgrid_contacts)
+    logger.info(f"Submitting {len(sendgrid_contacts)} contacts to SendGrid in {len(chunks)} request(s)")
+    
+    results = await upsert_contact_chunks(api_key, chunks, list_ids)
+    
+    contact_count = len(sendgrid_contacts)
+    list_msg = f" to list {endpoint.get('sendgrid_list_id')}" if endpoint.get('sendgrid_list_id') else ""
+    contact_word = "contact" if contact_count == 1 else "contacts"
+    job_ids = [result['job_id'] for result in results if result['success']]
+    failures = [result for result in results if not result['success']]
+    
+    if not failures:
+        job_label = "Job ID" if len(job_ids) == 1 else "Job IDs"
+        return {"status": "success", "message": f"{contact_count} {contact_word} added successfully{list_msg} ({job_label}: {', '.join(job_ids)})"}
+    # Upserts are idempotent, so a partial failure is retried as a whole
+    retryable = any(failure.get('retryable') for failure in failures)
+    if len(failures) == len(results):
+        return {"status": "failed", "message": failures[0]['message'], "retryable": retryable}
+    else:
+        added = sum(len(chunk) for chunk, result in zip(chunks, results) if result['success'])
+        return {
+            "status": "failed",
+            "message": f"{added} of {contact_count} {contact_word} added{list_msg} (Job IDs: {', '.join(job_ids)}); "
+                       f"{len(failures)} of {len(chunks)} requests failed: {failures[0]['message']}",
+            "retryable": retryable
+        }
+
+async def flush_contact_batch(key: tuple, entries: list):
+    """Contact batcher flush: upsert buffered contacts and resolve their log entries"""
+    endpoint_id, list_id = key
+    log_ids = list(dict.fromkeys(log_id for log_id, _ in entries))
+    
+    # Make sure the queued log entries have been written before resolving them
+    await log_writer.flush()
+    # Rollup buckets are keyed by the time each log was written
+    log_timestamps = {
+        log['id']: log['timestamp']
+        async for log in db.webhook_logs.find({"id": {"$in": log_ids}}, {"_id": 0, "id": 1, "timestamp": 1})
+    }
     
-    # Log the response
-    logger.info(f"SendGrid response status: {response.status_code}, body: {response.text}")
+    sendgrid_credentials = await credential_store.get("sendgrid")
+    if not sendgrid_credentials:
+        await db.webhook_logs.update_many(
+            {"id": {"$in": log_ids}},
+            {"$set": {
+                "status": "failed",
+                "response_message": "SendGrid API key not configured",
+                **log_retention.stamp(endpoint_id, "failed", datetime.now(timezone.utc))
+            }}
+        )
+        endpoint = endpoint_registry.get_by_id(endpoint_id) or {}
+        await stats_counters.move_status(endpoint_id, endpoint.get('integration', 'sendgrid'), "queued", "failed", len(log_ids))
+        await metric_rollups.move_status(endpoint_id, log_timestamps.values(), "queued", "failed")
+        return
+    
+    list_ids = [list_id] if list_id else None
+    list_msg = f" to list {list_id}" if list_id else ""
+    
+    # Per log entry: contact count, job ids and first error
+    outcomes = {log_id: {"count": 0, "job_ids": [], "error": None} for log_id in log_ids}
+    
+    chunks = chunk_contacts([contact for _, contact in entries])
+    # Each chunk goes through the SendGrid breaker; a rejected chunk fails like any other
+    results = await upsert_contact_chunks(sendgrid_credentials['api_key'], chunks, list_ids, upsert=guarded_upsert_contacts)
+    
+    offset = 0
+    for chunk, result in zip(chunks, results):
+        chunk_entries = entries[offset:offset + len(chunk)]
+        offset += len(chunk)
+        for log_id, _ in chunk_entries:
+            outcome = outcomes[log_id]
+            outcome['count'] += 1
+            if result['success']:
+                if result['job_id'] not in outcome['job_ids']:
+                    outcome['job_ids'].append(result['job_id'])
+            elif not outcome['error']:
+                outcome['error'] = result['message']
+    
+    # Group log entries with identical results into one update_many each
+    resolutions = {}
+    for log_id, outcome in outcomes.items():
+        contact_word = "contact" if outcome['count'] == 1 else "contacts"
+        if outcome['error']:
+            resolution = ("failed", outcome['error'])
+        else:
+            resolution = ("success", f"{outcome['count']} {contact_word} added successfully{list_msg} via batch (Job ID: {', '.join(outcome['job_ids'])})")
+        resolutions.setdefault(resolution, []).append(log_id)
+    
+    endpoint = endpoint_registry.get_by_id(endpoint_id) or {}
+    for (status, message), ids in resolutions.items():
+        await db.webhook_logs.update_many(
+            {"id": {"$in": ids}},
+            {"$set": {
+                "status": status,
+                "response_message": message,
+                **log_retention.stamp(endpoint_id, status, datetime.now(timezone.utc))
+            }}
+        )
+        await stats_counters.move_status(endpoint_id, endpoint.get('integration', 'sendgrid'), "queued", status, len(ids))
+        await metric_rollups.move_status(endpoint_id, [log_timestamps[log_id] for log_id in ids if log_id in log_timestamps], "queued", status)
     
-    if response.status_code in [200, 202]:
-        contact_count = len(sendgrid_contacts)
-        list_msg = f" to list {endpoint.get('sendgrid_list_id')}" if endpoint.get('sendgrid_list_id') else ""
-        response_data = response.json() if response.text else {}
-        job_id = response_data.get('job_id', 'N/A')
-        contact_word = "contact" if contact_count == 1 else "contacts"
-        return {"status": "success", "message": f"{contact_count} {contact_word} added successfully{list_msg} (Job ID: {job_id})"}
-    else:
-        error_detail = response.text if response.text else f"HTTP {response.status_code}"
-        logger.error(f"SendGrid API error: {error_detail}")
-        return {"status": "failed", "message": f"SendGrid API error: {error_detail}"}
+    logger.info(f"Flushed contact batch for endpoint {endpoint_id}: {sum(o['count'] for o in outcomes.values())} contacts")
+
+# Coalesces single-contact add_contact hooks into shared SendGrid upserts
+contact_batcher = ContactBatcher(
+    flush_contact_batch,
+    window_seconds=float(os.getenv('CONTACT_BATCH_WINDOW_SECONDS', '2')),
+    max_contacts=int(os.getenv('CONTACT_BATCH_MAX_CONTACTS', '1000'))
+)
 
 async def process_send_email(endpoint: dict, payload: dict) -> dict:
-    api_key_doc = await db.api_keys.find_one({"service_name": "sendgrid"}, {"_id": 0})
-    if not api_key_doc:
-        return {"status": "failed", "message": "SendGrid API key not configured"}
+    sendgrid_credentials = await credential_store.get("sendgrid")
+    if not sendgrid_credentials:
+        return {"status": "failed", "message": "SendGrid API key not configured", "retryable": False}
     
-    api_key = decrypt_data(api_key_doc['credentials']['api_key'])
-    sender_email = api_key_doc['credentials'].get('sender_email', 'noreply@example.com')
+    api_key = sendgrid_credentials['api_key']
+    sender_email = sendgrid_credentials.get('sender_email', 'noreply@example.com')
     
     # Helper function to extract value from payload or use static value
     def get_field_value(field_config, default=''):
@@ -637,7 +1143,7 @@ async def process_send_email(endpoint: dict, payload: dict) -> dict:
     
     # Validate that at least one recipient exists
     if not to_recipients:
-        return {"status": "failed", "message": "No mailto recipients found in payload"}
+        return {"status": "failed", "message": "No mailto recipients found in payload", "retryable": False}
     
     # Get from address and name (with dynamic support)
     from_email = get_field_value(endpoint.get('email_from'), sender_email)
@@ -671,27 +1177,33 @@ async def process_send_email(endpoint: dict, payload: dict) -> dict:
         "template_id": endpoint.get('sendgrid_template_id', '')
     }
     
-    response = requests.post(
-        "https://api.sendgrid.com/v3/mail/send",
-        headers=headers,
-        json=email_data
-    )
+    try:
+        response = await get_rate_limiter().request(
+            destination_key("sendgrid", api_key),
+            lambda: get_http_client().post(
+                "https://api.sendgrid.com/v3/mail/send",
+                headers=headers,
+                json=email_data
+            )
+        )
+    except RateLimitExceeded as e:
+        return {"status": "failed", "message": f"SendGrid rate limit: {e}, delivery deferred", "retryable": True}
     
     if response.status_code == 202:
         return {"status": "success", "message": "Email sent successfully"}
     else:
-        return {"status": "failed", "message": f"SendGrid API error: {response.text}"}
+        return {"status": "failed", "message": f"SendGrid API error: {response.text}", "retryable": is_retryable_status(response.status_code)}
 
 async def process_ntfy_notification(endpoint: dict, payload: dict) -> dict:
     """Process Ntfy.sh notification"""
     try:
         # Get Ntfy config from API keys
-        key_doc = await db.api_keys.find_one({"service_name": "ntfy"}, {"_id": 0})
-        if not key_doc:
-            return {"status": "failed", "message": "Ntfy not configured"}
+        credentials = await credential_store.get("ntfy")
+        if not credentials:
+            return {"status": "failed", "message": "Ntfy not configured", "retryable": False}
         
-        topic_url = key_doc['credentials'].get('topic_url')
-        auth_token = key_doc['credentials'].get('auth_token')
+        topic_url = credentials.get('topic_url')
+        auth_token = credentials.get('auth_token')
         
         # Extract title and message from payload
         title = payload.get('title', 'Webhook Notification')
@@ -699,26 +1211,26 @@ async def process_ntfy_notification(endpoint: dict, payload: dict) -> dict:
         tags = payload.get('tags', [])
         priority = payload.get('priority', 3)
         
-        result = send_ntfy_notification(topic_url, title, message, auth_token, tags, priority)
+        result = await send_ntfy_notification(topic_url, title, message, auth_token, tags, priority)
         
         if result['success']:
             return {"status": "success", "message": result['message']}
         else:
-            return {"status": "failed", "message": result['message']}
+            return {"status": "failed", "message": result['message'], "retryable": result.get('retryable', False)}
             
     except Exception as e:
         logger.error(f"Ntfy notification error: {e}")
-        return {"status": "failed", "message": str(e)}
+        return {"status": "failed", "message": str(e), "retryable": False}
 
 async def process_discord_message(endpoint: dict, payload: dict) -> dict:
     """Process Discord webhook message"""
     try:
         # Get Discord config from API keys
-        key_doc = await db.api_keys.find_one({"service_name": "discord"}, {"_id": 0})
-        if not key_doc:
-            return {"status": "failed", "message": "Discord not configured"}
+        credentials = await credential_store.get("discord")
+        if not credentials:
+            return {"status": "failed", "message": "Discord not configured", "retryable": False}
         
-        webhook_url = key_doc['credentials'].get('webhook_url')
+        webhook_url = credentials.get('webhook_url')
         
         # Extract message content from payload
         content = payload.get('content') or payload.get('message')
@@ -727,26 +1239,26 @@ async def process_discord_message(endpoint: dict, payload: dict) -> dict:
         # Support Discord embeds if provided
         embeds = payload.get('embeds')
         
-        result = send_discord_message(webhook_url, content, embeds, username)
+        result = await send_discord_message(webhook_url, content, embeds, username)
         
         if result['success']:
             return {"status": "success", "message": result['message']}
         else:
-            return {"status": "failed", "message": result['message']}
+            return {"status": "failed", "message": result['message'], "retryable": result.get('retryable', False)}
             
     except Exception as e:
         logger.error(f"Discord message error: {e}")
-        return {"status": "failed", "message": str(e)}
+        return {"status": "failed", "message": str(e), "retryable": False}
 
 async def process_slack_message(endpoint: dict, payload: dict) -> dict:
     """Process Slack webhook message"""
     try:
         # Get Slack config from API keys
-        key_doc = await db.api_keys.find_one({"service_name": "slack"}, {"_id": 0})
-        if not key_doc:
-            return {"status": "failed", "message": "Slack not configured"}
+        credentials = await credential_store.get("slack")
+        if not credentials:
+            return {"status": "failed", "message": "Slack not configured", "retryable": False}
         
-        webhook_url = key_doc['credentials'].get('webhook_url')
+        webhook_url = credentials.get('webhook_url')
         
         # Extract message content from payload
         text = payload.get('text') or payload.get('message')
@@ -754,44 +1266,44 @@ async def process_slack_message(endpoint: dict, payload: dict) -> dict:
         username = payload.get('username')
         icon_emoji = payload.get('icon_emoji')
         
-        result = send_slack_message(webhook_url, text, blocks, username, icon_emoji)
+        result = await send_slack_message(webhook_url, text, blocks, username, icon_emoji)
         
         if result['success']:
             return {"status": "success", "message": result['message']}
         else:
-            return {"status": "failed", "message": result['message']}
+            return {"status": "failed", "message": result['message'], "retryable": result.get('retryable', False)}
             
     except Exception as e:
         logger.error(f"Slack message error: {e}")
-        return {"status": "failed", "message": str(e)}
+        return {"status": "failed", "message": str(e), "retryable": False}
 
 async def process_telegram_message(endpoint: dict, payload: dict) -> dict:
     """Process Telegram bot message"""
     try:
         # Get Telegram config from API keys
-        key_doc = await db.api_keys.find_one({"service_name": "telegram"}, {"_id": 0})
-        if not key_doc:
-            return {"status": "failed", "message": "Telegram not configured"}
+        credentials = await credential_store.get("telegram")
+        if not credentials:
+            return {"status": "failed", "message": "Telegram not configured", "retryable": False}
         
-        bot_token = key_doc['credentials'].get('bot_token')
-        chat_id = key_doc['credentials'].get('chat_id')
+        bot_token = credentials.get('bot_token')
+        chat_id = credentials.get('chat_id')
         
         # Extract message text from payload
         text = payload.get('text') or payload.get('message') or json.dumps(payload, indent=2)
         parse_mode = payload.get('parse_mode', 'HTML')
         
-        result = send_telegram_message(bot_token, chat_id, text, parse_mode)
+        result = await send_telegram_message(bot_token, chat_id, text, parse_mode)
         
         if result['success']:
             return {"status": "success", "message": result['message']}
         else:
-            return {"status": "failed", "message": result['message']}
+            return {"status": "failed", "message": result['message'], "retryable": result.get('retryable', False)}
             
     except Exception as e:
         logger.error(f"Telegram message error: {e}")
-        return {"status": "failed", "message": str(e)}
+        return {"status": "failed", "message": str(e), "retryable": False}
 
-async def log_webhook(endpoint_id: str, endpoint_name: str, status: str, source_ip: str, payload: dict, response_msg: str = "", integration: str = "sendgrid", mode: str = "add_contact"):
+async def log_webhook(endpoint_id: str, endpoint_name: str, status: str, source_ip: str, payload: dict, response_msg: str = "", integration: str = "sendgrid", mode: str = "add_contact", duration_ms: Optional[float] = None, raw_payload: Optional[bytes] = None, retry_id: Optional[str] = None):
     log = WebhookLog(
         endpoint_id=endpoint_id,
         endpoint_name=endpoint_name,
@@ -799,47 +1311,147 @@ async def log_webhook(endpoint_id: str, endpoint_name: str, status: str, source_
         mode=mode,
         status=status,
         source_ip=source_ip,
-        payload_summary=json.dumps(payload)[:500],
-        payload=payload,  # Store full payload for detail view
-        response_message=response_msg
+        response_message=response_msg,
+        duration_ms=round(duration_ms, 2) if duration_ms is not None else None
     )
-    log_dict = log.model_dump()
-    log_dict['timestamp'] = log_dict['timestamp'].isoformat()
-    await db.webhook_logs.insert_one(log_dict)
+    log_dict = log.model_dump(exclude={'payload'})
+    
+    # A delivery already queued for automatic retry is marked as retried so
+    # bulk and manual retries do not send it a second time
+    if retry_id:
+        log_dict.update({"retried_at": log.timestamp, "retry_id": retry_id})
+    
+    # Summary plus inline, compressed or (over the cap) no payload; raw_payload is the
+    # request body the payload was decoded from, stored without re-serializing
+    endpoint = endpoint_registry.get_by_id(endpoint_id) or {}
+    max_stored_bytes = endpoint.get('max_logged_payload_bytes') or PAYLOAD_MAX_STORED_BYTES
+    log_dict.update(await encode_payload(payload, PAYLOAD_COMPRESS_THRESHOLD, max_stored_bytes, raw_payload))
     
-    # Forward to syslog if configured
+    # expire_at / archive_at Dates drive the TTL index and the archiver
+    log_dict.update(log_retention.stamp(endpoint_id, status, log.timestamp))
+    await log_writer.write(log_dict)
+    
+    # Forward to syslog if configured (queued, sent in the background)
     try:
-        syslog_config = await db.syslog_config.find_one({"enabled": True}, {"_id": 0})
-        if syslog_config:
-            syslog_sender = SyslogSender(
-                syslog_config['host'],
-                syslog_config['port'],
-                syslog_config['protocol']
-            )
-            syslog_sender.send_log(log_dict)
+        syslog_forwarder.submit({key: value for key, value in log_dict.items() if key != 'payload_compressed'})
     except Exception as e:
         logger.error(f"Syslog forwarding error: {e}")
+    
+    return log_dict['id']
 
 # Webhook Logs
+LOGS_MAX_PAGE_SIZE = 1000
+
+def as_utc(value: datetime) -> datetime:
+    """Treat naive datetimes (e.g. from query strings) as UTC"""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+# Until migrate_string_timestamps has converted every row, timestamp holds dates,
+# legacy ISO strings or nothing (unparseable values). Sorted descending, MongoDB
+# puts all dates before all strings and missing values last, so the cursor
+# records which of the three the last row had ("k": d, s or n).
+def encode_logs_cursor(log: dict) -> str:
+    timestamp = log.get('timestamp')
+    if isinstance(timestamp, datetime):
+        position = {"k": "d", "t": as_utc(timestamp).isoformat()}
+    elif isinstance(timestamp, str):
+        position = {"k": "s", "t": timestamp}
+    else:
+        position = {"k": "n"}
+    raw = json.dumps({**position, "id": log['id']}).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def decode_logs_cursor(cursor: str) -> dict:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        data = json.loads(raw)
+        kind = data.get('k', 'd')
+        if kind == 'd':
+            timestamp = datetime.fromisoformat(data['t'])
+        elif kind == 's':
+            timestamp = str(data['t'])
+        elif kind == 'n':
+            timestamp = None
+        else:
+            raise ValueError(kind)
+        return {"kind": kind, "timestamp": timestamp, "id": data['id']}
+    except (ValueError, KeyError, TypeError, AttributeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def logs_after_cursor(position: dict) -> List[dict]:
+    """$or clauses for the rows that sort after the cursor position (newest first)"""
+    if position['kind'] == 'n':
+        return [{"timestamp": None, "id": {"$lt": position['id']}}]
+    clauses = [
+        {"timestamp": {"$lt": position['timestamp']}},
+        {"timestamp": position['timestamp'], "id": {"$lt": position['id']}},
+        {"timestamp": None}
+    ]
+    if position['kind'] == 'd':
+        # Legacy string rows sort after every date
+        clauses.append({"timestamp": {"$type": "string"}})
+    return clauses
+
 @api_router.get("/webhooks/logs")
 async def get_webhook_logs(
+    response: Response,
     limit: int = 100, 
     endpoint_id: Optional[str] = None, 
     integration: Optional[str] = None,
+    status: Optional[str] = None,
+    mode: Optional[str] = None,
+    source_ip: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    search: Optional[str] = None,
+    cursor: Optional[str] = None,
     current_user: dict = Depends(get_current_user)
 ):
+    """
+    List logs newest first, without payloads (see GET /webhooks/logs/{log_id}).
+    Keyset-paginated on (timestamp, id): pass the X-Next-Cursor response header
+    back as cursor to fetch the next page.
+    """
+    limit = max(1, min(limit, LOGS_MAX_PAGE_SIZE))
     query = {}
     if endpoint_id:
         query['endpoint_id'] = endpoint_id
     if integration:
         query['integration'] = integration
-    
-    logs = await db.webhook_logs.find(query, {"_id": 0}).sort("timestamp", -1).limit(limit).to_list(limit)
-    for log in logs:
-        if isinstance(log.get('timestamp'), str):
-            log['timestamp'] = datetime.fromisoformat(log['timestamp'])
+    if status:
+        query['status'] = status
+    if mode:
+        query['mode'] = mode
+    if source_ip:
+        query['source_ip'] = source_ip
+    if since or until:
+        query['timestamp'] = {}
+        if since:
+            query['timestamp']['$gte'] = as_utc(since)
+        if until:
+            query['timestamp']['$lt'] = as_utc(until)
+    if search:
+        query['$text'] = {"$search": search}
+    if cursor:
+        query['$or'] = logs_after_cursor(decode_logs_cursor(cursor))
+    
+    # Fetch one extra row to know whether another page exists
+    logs = await db.webhook_logs.find(query, {"_id": 0, "payload": 0, "payload_compressed": 0}).sort([("timestamp", -1), ("id", -1)]).limit(limit + 1).to_list(limit + 1)
+    if len(logs) > limit:
+        logs = logs[:limit]
+        response.headers["X-Next-Cursor"] = encode_logs_cursor(logs[-1])
     return logs
 
+@api_router.get("/webhooks/logs/{log_id}")
+async def get_webhook_log(log_id: str, current_user: dict = Depends(get_current_user)):
+    """Get a single log entry including its full payload"""
+    log = await db.webhook_logs.find_one({"id": log_id}, {"_id": 0})
+    if not log:
+        raise HTTPException(status_code=404, detail="Log entry not found")
+    return expand_payload(log)
+
 @api_router.delete("/webhooks/logs")
 async def clear_webhook_logs(current_user: dict = Depends(get_current_user)):
     """Clear all webhook logs"""
@@ -847,10 +1459,11 @@ async def clear_webhook_logs(current_user: dict = Depends(get_current_user)):
         raise HTTPException(status_code=403, detail="Admin access required")
     
     try:
-        result = await db.webhook_logs.delete_many({})
+        deleted_count = await delete_in_batches(db.webhook_logs, {})
+        await stats_counters.reset()
         return {
-            "message": f"Successfully deleted {result.deleted_count} log entries",
-            "deleted_count": result.deleted_count
+            "message": f"Successfully deleted {deleted_count} log entries",
+            "deleted_count": deleted_count
         }
     except Exception as e:
         logger.error(f"Failed to clear logs: {str(e)}")
@@ -860,9 +1473,10 @@ async def clear_webhook_logs(current_user: dict = Depends(get_current_user)):
 async def delete_webhook_log(log_id: str, current_user: dict = Depends(get_current_user)):
     """Delete a single webhook log entry"""
     try:
-        result = await db.webhook_logs.delete_one({"id": log_id})
-        if result.deleted_count == 0:
+        deleted = await db.webhook_logs.find_one_and_delete({"id": log_id}, {"_id": 0, "payload": 0, "payload_compressed": 0})
+        if not deleted:
             raise HTTPException(status_code=404, detail="Log entry not found")
+        await stats_counters.forget([deleted])
         return {"message": "Log entry deleted successfully"}
     except HTTPException:
         raise
@@ -877,15 +1491,63 @@ async def delete_all_failed_logs(current_user: dict = Depends(get_current_user))
         raise HTTPException(status_code=403, detail="Admin access required")
     
     try:
-        result = await db.webhook_logs.delete_many({"status": "failed"})
+        await stats_counters.forget_matching({"status": "failed"})
+        deleted_count = await delete_in_batches(db.webhook_logs, {"status": "failed"})
         return {
-            "message": f"Successfully deleted {result.deleted_count} failed log entries",
-            "deleted_count": result.deleted_count
+            "message": f"Successfully deleted {deleted_count} failed log entries",
+            "deleted_count": deleted_count
         }
     except Exception as e:
         logger.error(f"Failed to delete failed logs: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+def retry_payload(log: dict) -> Optional[dict]:
+    """The payload to replay for a log, or None if it was not stored"""
+    payload = decode_payload(log)
+    if payload is None:
+        return None if log.get("payload_truncated") else {}
+    return payload
+
+async def replay_log(log: dict) -> dict:
+    """Re-dispatch a logged webhook through its endpoint and log the outcome"""
+    endpoint = endpoint_registry.get_by_id(log["endpoint_id"])
+    if not endpoint:
+        return {"status": "skipped", "message": "Endpoint not found or deleted"}
+    payload = retry_payload(log)
+    if payload is None:
+        return {"status": "skipped", "message": "Original payload was not stored"}
+    
+    started = time.perf_counter()
+    result = await dispatch_webhook(endpoint, payload)
+    
+    # Log the retry
+    await log_webhook(
+        endpoint['id'],
+        endpoint['name'],
+        result['status'],
+        "retry",  # Mark as retry
+        payload,
+        f"Retry of {log['id']}: {result.get('message', '')}",
+        endpoint.get('integration', 'sendgrid'),
+        endpoint.get('mode', 'add_contact'),
+        (time.perf_counter() - started) * 1000
+    )
+    
+    # Mark the original so bulk retries skip it next time
+    await db.webhook_logs.update_one(
+        {"id": log['id']},
+        {"$set": {"retried_at": datetime.now(timezone.utc), "retry_status": result['status']}}
+    )
+    return result
+
+# Background replay of failed logs (bounded concurrency, per-integration rate limits)
+bulk_retry = BulkRetryManager(
+    db,
+    replay_log,
+    concurrency=int(os.getenv('BULK_RETRY_CONCURRENCY', '5')),
+    rate_limits=parse_rate_limits(os.getenv('BULK_RETRY_RATE_LIMITS', ''))
+)
+
 @api_router.post("/webhooks/logs/{log_id}/retry")
 async def retry_webhook(log_id: str, current_user: dict = Depends(get_current_user)):
     """Retry a failed webhook request"""
@@ -895,55 +1557,122 @@ async def retry_webhook(log_id: str, current_user: dict = Depends(get_current_us
         if not log:
             raise HTTPException(status_code=404, detail="Log not found")
         
-        # Get the endpoint
-        endpoint = await db.webhook_endpoints.find_one({"id": log["endpoint_id"]}, {"_id": 0})
-        if not endpoint:
+        if not endpoint_registry.get_by_id(log["endpoint_id"]):
             raise HTTPException(status_code=404, detail="Endpoint not found or deleted")
+        if retry_payload(log) is None:
+            raise HTTPException(status_code=400, detail="Original payload exceeded the stored size limit and cannot be retried")
+        if log.get('retry_id'):
+            if await delivery_queue.is_scheduled(log['retry_id']):
+                raise HTTPException(status_code=409, detail=f"Delivery is already scheduled for automatic retry ({log['retry_id']})")
         
-        # Get the original payload
-        payload = log.get("payload", {})
-        if isinstance(payload, str):
-            import json
-            payload = json.loads(payload)
-        
-        # Process based on mode
-        mode = endpoint['mode']
-        if mode == 'add_contact':
-            result = await process_add_contact(endpoint, payload)
-        elif mode == 'send_email':
-            result = await process_send_email(endpoint, payload)
-        elif mode == 'ntfy':
-            result = await process_ntfy_notification(endpoint, payload)
-        elif mode == 'discord':
-            result = await process_discord_message(endpoint, payload)
-        elif mode == 'slack':
-            result = await process_slack_message(endpoint, payload)
-        elif mode == 'telegram':
-            result = await process_telegram_message(endpoint, payload)
-        else:
-            result = {"status": "failed", "message": "Invalid mode"}
-        
-        # Log the retry
-        await log_webhook(
-            endpoint['id'],
-            endpoint['name'],
-            result['status'],
-            "retry",  # Mark as retry
-            payload,
-            f"Retry of {log_id}: {result.get('message', '')}",
-            endpoint.get('integration', 'sendgrid'),
-            endpoint.get('mode', 'add_contact')
-        )
+        result = await replay_log(log)
         
         return {
             "success": True,
             "message": f"Webhook retried successfully. Status: {result['status']}",
             "result": result
         }
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Failed to retry webhook: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+class BulkRetryRequest(BaseModel):
+    endpoint_id: Optional[str] = None
+    integration: Optional[str] = None
+    mode: Optional[str] = None
+    since: Optional[datetime] = None
+    until: Optional[datetime] = None
+    log_ids: Optional[List[str]] = None
+    include_retried: bool = False  # Also replay logs that were already retried
+    limit: Optional[int] = None
+
+@api_router.post("/webhooks/logs/retry-bulk")
+async def retry_webhooks_bulk(request: BulkRetryRequest, current_user: dict = Depends(get_current_user)):
+    """Replay matching failed logs as a background job"""
+    started_at = datetime.now(timezone.utc)
+    # Never replay retry-origin logs: a failed replay logs a new failure that
+    # the job would otherwise pick up and retry again
+    query = {"status": "failed", "source_ip": {"$ne": "retry"}}
+    if request.endpoint_id:
+        query['endpoint_id'] = request.endpoint_id
+    if request.integration:
+        query['integration'] = request.integration
+    if request.mode:
+        query['mode'] = request.mode
+    if request.log_ids:
+        query['id'] = {"$in": request.log_ids}
+    # Bound the job to logs written before it started
+    query['timestamp'] = {"$lt": as_utc(request.until)} if request.until else {"$lte": started_at}
+    if request.since:
+        query['timestamp']['$gte'] = as_utc(request.since)
+    if not request.include_retried:
+        query['retried_at'] = {"$exists": False}
+    
+    job = await bulk_retry.start_job(query, current_user['username'], request.limit)
+    return JSONResponse(
+        status_code=202,
+        content={
+            "status": "accepted",
+            "message": f"Retrying {job['total']} failed webhook{'s' if job['total'] != 1 else ''} in the background",
+            "job_id": job['id'],
+            "total": job['total']
+        }
+    )
+
+@api_router.get("/webhooks/logs/retry-bulk/{job_id}")
+async def get_bulk_retry_job(job_id: str, current_user: dict = Depends(get_current_user)):
+    """Progress of a bulk retry job"""
+    job = await bulk_retry.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Retry job not found")
+    return job
+
+@api_router.post("/webhooks/logs/retry-bulk/{job_id}/cancel")
+async def cancel_bulk_retry_job(job_id: str, current_user: dict = Depends(get_current_user)):
+    if not bulk_retry.cancel(job_id):
+        raise HTTPException(status_code=409, detail="Retry job is not running")
+    return {"message": "Retry job cancelled"}
+
+@api_router.get("/webhooks/deliveries/{delivery_id}")
+async def get_delivery_status(delivery_id: str, current_user: dict = Depends(get_current_user)):
+    """Get the status of an async-mode delivery"""
+    job = await delivery_queue.get(delivery_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Delivery not found")
+    return job
+
+# Dead letters: deliveries that exhausted their retry policy
+@api_router.get("/webhooks/dead-letters")
+async def list_dead_letters(endpoint_id: Optional[str] = None, limit: int = 100, current_user: dict = Depends(get_current_user)):
+    return await delivery_queue.list_dead_letters(endpoint_id, min(limit, 1000))
+
+@api_router.get("/webhooks/dead-letters/{dead_letter_id}")
+async def get_dead_letter(dead_letter_id: str, current_user: dict = Depends(get_current_user)):
+    dead_letter = await delivery_queue.get_dead_letter(dead_letter_id)
+    if not dead_letter:
+        raise HTTPException(status_code=404, detail="Dead letter not found")
+    return dead_letter
+
+@api_router.post("/webhooks/dead-letters/{dead_letter_id}/replay")
+async def replay_dead_letter(dead_letter_id: str, current_user: dict = Depends(get_current_user)):
+    """Queue a dead letter for delivery again with a fresh retry budget"""
+    dead_letter = await delivery_queue.get_dead_letter(dead_letter_id)
+    if not dead_letter:
+        raise HTTPException(status_code=404, detail="Dead letter not found")
+    endpoint = endpoint_registry.get_by_id(dead_letter['endpoint_id'])
+    if not endpoint:
+        raise HTTPException(status_code=404, detail="Endpoint not found or deleted")
+    delivery_id = await delivery_queue.replay_dead_letter(dead_letter, endpoint)
+    return {"message": "Dead letter queued for delivery", "delivery_id": delivery_id}
+
+@api_router.delete("/webhooks/dead-letters/{dead_letter_id}")
+async def delete_dead_letter(dead_letter_id: str, current_user: dict = Depends(get_current_user)):
+    if not await delivery_queue.delete_dead_letter(dead_letter_id):
+        raise HTTPException(status_code=404, detail="Dead letter not found")
+    return {"message": "Dead letter deleted successfully"}
+
 # Migrate old logs
 @api_router.post("/webhooks/logs/migrate")
 async def migrate_logs(current_user: dict = Depends(get_current_user)):
@@ -989,25 +1718,89 @@ async def migrate_logs(current_user: dict = Depends(get_current_user)):
 # Dashboard Stats
 @api_router.get("/dashboard/stats")
 async def get_dashboard_stats(current_user: dict = Depends(get_current_user)):
-    total_endpoints = await db.webhook_endpoints.count_documents({})
-    total_logs = await db.webhook_logs.count_documents({})
-    success_logs = await db.webhook_logs.count_documents({"status": "success"})
-    failed_logs = await db.webhook_logs.count_documents({"status": "failed"})
+    # Materialized counters: O(1) regardless of log volume
+    counters = await stats_counters.get()
+    total_endpoints = endpoint_registry.count()
+    total_logs = counters.get('total', 0)
+    success_logs = counters.get('status', {}).get('success', 0)
+    failed_logs = counters.get('status', {}).get('failed', 0)
     
     # Recent activity
-    recent_logs = await db.webhook_logs.find({}, {"_id": 0}).sort("timestamp", -1).limit(10).to_list(10)
-    for log in recent_logs:
-        if isinstance(log.get('timestamp'), str):
-            log['timestamp'] = datetime.fromisoformat(log['timestamp'])
+    recent_logs = await db.webhook_logs.find({}, {"_id": 0, "payload": 0, "payload_compressed": 0}).sort([("timestamp", -1), ("id", -1)]).limit(10).to_list(10)
     
     return {
         "total_endpoints": total_endpoints,
         "total_requests": total_logs,
         "success_rate": round((success_logs / total_logs * 100) if total_logs > 0 else 0, 2),
         "failed_requests": failed_logs,
+        "requests_by_status": counters.get('status', {}),
+        "requests_by_integration": {name: entry.get('total', 0) for name, entry in counters.get('integrations', {}).items()},
         "recent_activity": recent_logs
     }
 
+@api_router.post("/dashboard/stats/reconcile")
+async def reconcile_dashboard_stats(current_user: dict = Depends(get_admin_user)):
+    """Recount the dashboard counters from webhook_logs"""
+    counters = await stats_counters.reconcile()
+    return {"message": "Dashboard stats reconciled", "total_requests": counters['total']}
+
+TIMESERIES_RANGES = {
+    "1h": timedelta(hours=1),
+    "6h": timedelta(hours=6),
+    "24h": timedelta(hours=24),
+    "7d": timedelta(days=7),
+    "30d": timedelta(days=30),
+    "90d": timedelta(days=90),
+}
+TIMESERIES_MAX_POINTS = 2000
+
+@api_router.get("/dashboard/timeseries")
+async def get_dashboard_timeseries(
+    range_: str = Query("24h", alias="range"),
+    granularity: Optional[str] = None,
+    endpoint_id: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Requests and latency per minute/hour from the rollup buckets"""
+    end = end or datetime.now(timezone.utc)
+    if end.tzinfo is None:
+        end = end.replace(tzinfo=timezone.utc)
+    if start is None:
+        if range_ not in TIMESERIES_RANGES:
+            raise HTTPException(status_code=400, detail=f"Invalid range. Use one of: {', '.join(TIMESERIES_RANGES)}")
+        start = end - TIMESERIES_RANGES[range_]
+    elif start.tzinfo is None:
+        start = start.replace(tzinfo=timezone.utc)
+    if start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    
+    # Minute buckets for short ranges, hour buckets otherwise
+    if granularity is None:
+        granularity = "minute" if end - start <= timedelta(hours=6) else "hour"
+    if granularity not in GRANULARITIES:
+        raise HTTPException(status_code=400, detail=f"Invalid granularity. Use one of: {', '.join(GRANULARITIES)}")
+    bucket_size = GRANULARITIES[granularity][0]
+    if (end - start) / bucket_size > TIMESERIES_MAX_POINTS:
+        raise HTTPException(status_code=400, detail=f"Range too large for {granularity} granularity (max {TIMESERIES_MAX_POINTS} buckets)")
+    
+    points = await metric_rollups.series(granularity, start, end, endpoint_id)
+    return {
+        "granularity": granularity,
+        "start": start,
+        "end": end,
+        "endpoint_id": endpoint_id,
+        "points": points
+    }
+
+@api_router.post("/dashboard/timeseries/rebuild")
+async def rebuild_dashboard_timeseries(days: Optional[int] = None, current_user: dict = Depends(get_admin_user)):
+    """Recompute rollup buckets from webhook_logs (all history, or the last N days)"""
+    since = datetime.now(timezone.utc) - timedelta(days=days) if days else None
+    processed = await metric_rollups.rebuild(since)
+    return {"message": f"Rebuilt rollups from {processed} log entries", "processed": processed}
+
 # API Keys Management
 @api_router.get("/settings/api-keys")
 async def get_api_keys(current_user: dict = Depends(get_admin_user)):
@@ -1053,6 +1846,7 @@ async def create_api_key(key_data: APIKeyCreate, current_user: dict = Depends(ge
             {"service_name": key_data.service_name},
             {"$set": {"credentials": encrypted_creds, "updated_at": datetime.now(timezone.utc).isoformat()}}
         )
+        credential_store.invalidate(key_data.service_name)
         return {"message": "API key updated successfully"}
     else:
         # Create new
@@ -1061,11 +1855,13 @@ async def create_api_key(key_data: APIKeyCreate, current_user: dict = Depends(ge
         api_key_dict['created_at'] = api_key_dict['created_at'].isoformat()
         api_key_dict['updated_at'] = api_key_dict['updated_at'].isoformat()
         await db.api_keys.insert_one(api_key_dict)
+        credential_store.invalidate(key_data.service_name)
         return {"message": "API key created successfully"}
 
 @api_router.delete("/settings/api-keys/{service_name}")
 async def delete_api_key(service_name: str, current_user: dict = Depends(get_admin_user)):
     result = await db.api_keys.delete_one({"service_name": service_name})
+    credential_store.invalidate(service_name)
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="API key not found")
     return {"message": "API key deleted successfully"}
@@ -1078,6 +1874,7 @@ async def toggle_integration(service_name: str, request: dict, current_user: dic
         {"service_name": service_name},
         {"$set": {"is_active": is_active}}
     )
+    credential_store.invalidate(service_name)
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Integration not found")
     return {"message": f"Integration {service_name} {'activated' if is_active else 'deactivated'}", "is_active": is_active}
@@ -1095,7 +1892,7 @@ async def verify_api_key(service_name: str, current_user: dict = Depends(get_adm
             api_key = api_key.encode('ascii', 'ignore').decode('ascii').strip()
             
             headers = {"Authorization": f"Bearer {api_key}"}
-            response = requests.get("https://api.sendgrid.com/v3/scopes", headers=headers, timeout=10)
+            response = await get_http_client().get("https://api.sendgrid.com/v3/scopes", headers=headers, timeout=10)
             
             if response.status_code == 200:
                 return {"status": "success", "message": "SendGrid API key is valid"}
@@ -1136,6 +1933,7 @@ async def save_syslog_config(config: SyslogConfigCreate, current_user: dict = De
             new_config = SyslogConfig(**config_dict)
             await db.syslog_config.insert_one(new_config.model_dump())
         
+        await syslog_forwarder.load_config()
         return {"message": "Syslog configuration saved successfully"}
     except Exception as e:
         logger.error(f"Failed to save syslog config: {e}")
@@ -1145,8 +1943,7 @@ async def save_syslog_config(config: SyslogConfigCreate, current_user: dict = De
 async def test_syslog_connection(config: SyslogConfigCreate, current_user: dict = Depends(get_admin_user)):
     """Test connection to syslog server"""
     try:
-        syslog_sender = SyslogSender(config.host, config.port, config.protocol)
-        success = syslog_sender.test_connection()
+        success = await syslog_forwarder.test_connection(config.model_dump())
         
         if success:
             return {"status": "success", "message": f"Successfully connected to {config.host}:{config.port} via {config.protocol.upper()}"}
@@ -1160,6 +1957,7 @@ async def test_syslog_connection(config: SyslogConfigCreate, current_user: dict
 async def delete_syslog_config(current_user: dict = Depends(get_admin_user)):
     """Delete syslog configuration"""
     await db.syslog_config.delete_many({})
+    await syslog_forwarder.load_config()
     return {"message": "Syslog configuration deleted"}
 
 # SendGrid Integration
@@ -1171,7 +1969,7 @@ async def get_sendgrid_lists(current_user: dict = Depends(get_current_user)):
     
     api_key = decrypt_data(key_doc['credentials']['api_key'])
     headers = {"Authorization": f"Bearer {api_key}"}
-    response = requests.get("https://api.sendgrid.com/v3/marketing/lists", headers=headers)
+    response = await get_http_client().get("https://api.sendgrid.com/v3/marketing/lists", headers=headers)
     
     if response.status_code == 200:
         return {"lists": response.json().get('result', [])}
@@ -1189,7 +1987,7 @@ async def create_sendgrid_list(list_data: dict, current_user: dict = Depends(get
         "Content-Type": "application/json"
     }
     
-    response = requests.post(
+    response = await get_http_client().post(
         "https://api.sendgrid.com/v3/marketing/lists",
         headers=headers,
         json={"name": list_data.get("name")}
@@ -1217,7 +2015,7 @@ async def get_sendgrid_templates(current_user: dict = Depends(get_current_user))
     
     # Get dynamic templates (newer)
     try:
-        response = requests.get("https://api.sendgrid.com/v3/templates?generations=dynamic", headers=headers, timeout=10)
+        response = await get_http_client().get("https://api.sendgrid.com/v3/templates?generations=dynamic", headers=headers, timeout=10)
         if response.status_code == 200:
             dynamic_templates = response.json().get('templates', [])
             templates.extend(dynamic_templates)
@@ -1226,7 +2024,7 @@ async def get_sendgrid_templates(current_user: dict = Depends(get_current_user))
     
     # Get legacy templates
     try:
-        response = requests.get("https://api.sendgrid.com/v3/templates?generations=legacy", headers=headers, timeout=10)
+        response = await get_http_client().get("https://api.sendgrid.com/v3/templates?generations=legacy", headers=headers, timeout=10)
         if response.status_code == 200:
             legacy_templates = response.json().get('templates', [])
             templates.extend(legacy_templates)
@@ -1249,7 +2047,7 @@ async def get_sendgrid_template_details(template_id: str, current_user: dict = D
     
     try:
         # Fetch template details
-        response = requests.get(f"https://api.sendgrid.com/v3/templates/{template_id}", headers=headers, timeout=10)
+        response = await get_http_client().get(f"https://api.sendgrid.com/v3/templates/{template_id}", headers=headers, timeout=10)
         
         if response.status_code != 200:
             raise HTTPException(status_code=response.status_code, detail=f"SendGrid API error: {response.text}")
@@ -1297,7 +2095,7 @@ async def get_sendgrid_template_details(template_id: str, current_user: dict = D
             "versions_count": len(versions)
         }
         
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         logging.error(f"Error fetching template details: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to fetch template: {str(e)}")
 
@@ -1335,7 +2133,7 @@ async def sync_sendgrid_fields(current_user: dict = Depends(get_current_user)):
     # Fetch custom fields from SendGrid API
     custom_fields = []
     try:
-        response = requests.get(
+        response = await get_http_client().get(
             "https://api.sendgrid.com/v3/marketing/field_definitions",
             headers=headers,
             timeout=10
@@ -1435,7 +2233,7 @@ async def get_list_contacts(list_id: str, filters: Optional[str] = None, current
             if filter_conditions:
                 search_query["query"] += " AND " + " AND ".join(filter_conditions)
         
-        response = requests.post(
+        response = await get_http_client().post(
             "https://api.sendgrid.com/v3/marketing/contacts/search",
             headers=headers,
             json=search_query,
@@ -1449,7 +2247,7 @@ async def get_list_contacts(list_id: str, filters: Optional[str] = None, current
         else:
             raise HTTPException(status_code=response.status_code, detail=f"SendGrid API error: {response.text}")
             
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         logger.error(f"Error fetching contacts: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to fetch contacts: {str(e)}")
 
@@ -1497,7 +2295,7 @@ async def bulk_update_contacts(
         
         logger.info(f"Searching for contacts with query: {search_query}")
         
-        search_response = requests.post(
+        search_response = await get_http_client().post(
             "https://api.sendgrid.com/v3/marketing/contacts/search",
             headers=headers,
             json=search_query,
@@ -1591,7 +2389,7 @@ async def bulk_update_contacts(
         # Send update request to SendGrid
         update_payload = {"contacts": updated_contacts}
         
-        update_response = requests.put(
+        update_response = await get_http_client().put(
             "https://api.sendgrid.com/v3/marketing/contacts",
             headers=headers,
             json=update_payload,
@@ -1647,7 +2445,7 @@ async def bulk_update_contacts(
             
     except HTTPException:
         raise
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         error_msg = f"Request error: {str(e)}"
         logger.error(f"Request error updating contacts: {e}")
         
@@ -1689,7 +2487,7 @@ async def create_backup(current_user: dict = Depends(get_admin_user)):
         "created_at": datetime.now(timezone.utc).isoformat(),
         "users": await db.users.find({}, {"_id": 0, "password_hash": 0}).to_list(1000),
         "webhook_endpoints": await db.webhook_endpoints.find({}, {"_id": 0}).to_list(1000),
-        "webhook_logs": await db.webhook_logs.find({}, {"_id": 0}).sort("timestamp", -1).limit(1000).to_list(1000),
+        "webhook_logs": [expand_payload(log) for log in await db.webhook_logs.find({}, {"_id": 0}).sort("timestamp", -1).limit(1000).to_list(1000)],
     }
     
     # Create ZIP file in memory
@@ -1719,6 +2517,44 @@ async def list_backups(current_user: dict = Depends(get_admin_user)):
     backups = await db.backups.find({}, {" _id": 0}).sort("created_at", -1).to_list(100)
     return backups
 
+# Log Retention Management
+@api_router.get("/settings/log-retention")
+async def get_log_retention_settings(current_user: dict = Depends(get_admin_user)):
+    return await log_retention.load_settings()
+
+@api_router.post("/settings/log-retention")
+async def update_log_retention_settings(
+    settings: dict,
+    current_user: dict = Depends(get_admin_user)
+):
+    def valid_days(days):
+        return days is None or (isinstance(days, int) and 1 <= days <= 3650)
+    
+    if not valid_days(settings.get("default_days")):
+        raise HTTPException(status_code=400, detail="default_days must be empty or between 1 and 3650")
+    for section in ("status_days", "endpoint_days"):
+        values = settings.get(section) or {}
+        if not isinstance(values, dict) or not all(valid_days(days) for days in values.values()):
+            raise HTTPException(status_code=400, detail=f"{section} must map names to days between 1 and 3650")
+        settings[section] = {name: days for name, days in values.items() if days}
+    
+    saved = await log_retention.save_settings(settings)
+    if settings.get("apply_to_existing"):
+        log_retention.apply_to_existing()
+    return {"message": "Log retention settings updated successfully", "settings": saved}
+
+@api_router.post("/settings/log-retention/apply")
+async def apply_log_retention(current_user: dict = Depends(get_admin_user)):
+    """Restamp existing logs with the current retention settings (background)"""
+    if not log_retention.apply_to_existing():
+        raise HTTPException(status_code=409, detail="Retention settings are already being applied")
+    return {"message": "Applying retention settings to existing logs"}
+
+@api_router.get("/settings/log-retention/archives")
+async def list_log_archives(current_user: dict = Depends(get_admin_user)):
+    archives = await asyncio.to_thread(log_retention.list_archives)
+    return {"archive_dir": str(log_retention.archive_dir), "archives": archives}
+
 # Backup Scheduler Management
 @api_router.get("/backups/settings")
 async def get_backup_settings(current_user: dict = Depends(get_admin_user)):
@@ -1898,6 +2734,7 @@ async def configure_github(
                 "updated_at": datetime.now(timezone.utc).isoformat()
             })
         
+        credential_store.invalidate("github")
         return {"message": "GitHub repository configured successfully"}
         
     except HTTPException:
@@ -1975,12 +2812,11 @@ async def get_github_info(current_user: dict = Depends(get_current_user)):
         # Get latest release from GitHub (works without token for public repos)
         latest_release = None
         try:
-            import requests
             headers = {}
             if token:
                 headers["Authorization"] = f"token {token}"
             
-            response = requests.get(
+            response = await get_http_client().get(
                 f"https://api.github.com/repos/{owner}/{repo}/releases/latest",
                 headers=headers,
                 timeout=10
@@ -2338,6 +3174,31 @@ async def get_deployment_log_content(log_file: str, current_user: dict = Depends
         logger.error(f"Failed to read log file: {str(e)}")
         return {"content": f"Error reading log: {str(e)}", "file": log_file}
 
+# Database index report
+@api_router.get("/admin/indexes")
+async def get_index_report(current_user: dict = Depends(get_admin_user)):
+    """Index usage ($indexStats) and query plans for hot queries"""
+    try:
+        return await index_report(db)
+    except Exception as e:
+        logger.error(f"Failed to build index report: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@api_router.get("/admin/circuits")
+async def get_circuit_states(current_user: dict = Depends(get_admin_user)):
+    """Circuit breaker state and concurrency limit per downstream provider"""
+    return provider_guards.snapshot()
+
+@api_router.get("/admin/rate-limits")
+async def get_rate_limit_states(current_user: dict = Depends(get_admin_user)):
+    """Token bucket state per delivery destination (keys are hashed)"""
+    return get_rate_limiter().snapshot()
+
+@api_router.get("/admin/password-hasher")
+async def get_password_hasher_metrics(current_user: dict = Depends(get_admin_user)):
+    """bcrypt executor queue depth, timings and rejected work"""
+    return password_hasher.metrics()
+
 # Health check and version
 @api_router.get("/health")
 async def health_check():
@@ -2366,6 +3227,7 @@ app.add_middleware(
     allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 logging.basicConfig(
@@ -2376,4 +3238,16 @@ logger = logging.getLogger(__name__)
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    if timestamp_migration_task:
+        timestamp_migration_task.cancel()
+    await contact_batcher.flush_all()
+    await bulk_retry.stop()
+    await delivery_queue.stop()
+    await endpoint_registry.stop()
+    await log_writer.stop()
+    await stats_counters.stop()
+    await log_retention.stop()
+    await syslog_forwarder.stop()
+    await close_http_client()
+    password_hasher.shutdown()
     client.close()
\ No newline at end of file
@@ -0,0 +1,186 @@
+"""
+Dashboard Stats Module
+Materialized webhook counters (total, per status, per endpoint, per
+integration) kept in a single webhook_stats document. Counters are
+incremented as log batches are written and periodically reconciled with
+a full recount, so the dashboard never has to count webhook_logs.
+"""
+
+import asyncio
+import logging
+from collections import Counter
+from datetime import datetime, timezone, timedelta
+from typing import Dict, Any, Iterable, List, Optional
+
+from pymongo import ReturnDocument
+from pymongo.errors import PyMongoError
+
+from mongo_fields import EndpointFilter, UNKNOWN, endpoint_field_name, field_name
+
+logger = logging.getLogger(__name__)
+
+STATS_DOC_ID = "totals"
+
+
+class StatsCounters:
+    """Running webhook counters persisted in webhook_stats"""
+
+    def __init__(self, db, reconcile_interval: float = 3600.0, settle_seconds: float = 300.0,
+                 known_endpoint: Optional[EndpointFilter] = None):
+        self.db = db
+        self.collection = db.webhook_stats
+        self.reconcile_interval = reconcile_interval
+        # Logs older than this have been written and counted by the listener
+        self.settle_seconds = settle_seconds
+        self.known_endpoint = known_endpoint
+        self._task: Optional[asyncio.Task] = None
+
+    def _increments(self, logs: Iterable[Dict[str, Any]], sign: int = 1) -> Dict[str, int]:
+        counts = Counter()
+        for log in logs:
+            status = field_name(log.get('status'))
+            endpoint = endpoint_field_name(log.get('endpoint_id'), self.known_endpoint)
+            integration = field_name(log.get('integration'))
+            counts['total'] += 1
+            counts[f'status.{status}'] += 1
+            counts[f'endpoints.{endpoint}.total'] += 1
+            counts[f'endpoints.{endpoint}.status.{status}'] += 1
+            counts[f'integrations.{integration}.total'] += 1
+            counts[f'integrations.{integration}.status.{status}'] += 1
+        return {field: count * sign for field, count in counts.items()}
+
+    async def _apply(self, increments: Dict[str, int]):
+        if not increments:
+            return
+        await self.collection.update_one(
+            {"_id": STATS_DOC_ID},
+            {"$inc": increments, "$set": {"updated_at": datetime.now(timezone.utc)}},
+            upsert=True
+        )
+
+    async def record(self, logs: List[Dict[str, Any]]):
+        """Log writer listener: count a batch of newly written logs"""
+        await self._apply(self._increments(logs))
+
+    async def forget(self, logs: List[Dict[str, Any]]):
+        """Un-count deleted logs"""
+        await self._apply(self._increments(logs, sign=-1))
+
+    async def forget_matching(self, query: Dict[str, Any]):
+        """Un-count the logs matching query (call before deleting them)"""
+        counts = await self._count(query)
+        await self._apply({field: -count for field, count in counts.items()})
+
+    async def move_status(self, endpoint_id: str, integration: str, from_status: str, to_status: str, count: int):
+        """Move logs from one status to another (e.g. queued -> success)"""
+        if not count or from_status == to_status:
+            return
+        endpoint, integration = endpoint_field_name(endpoint_id, self.known_endpoint), field_name(integration)
+        increments = {}
+        for status, sign in ((field_name(from_status), -count), (field_name(to_status), count)):
+            increments[f'status.{status}'] = sign
+            increments[f'endpoints.{endpoint}.status.{status}'] = sign
+            increments[f'integrations.{integration}.status.{status}'] = sign
+        await self._apply(increments)
+
+    async def get(self) -> Dict[str, Any]:
+        doc = await self.collection.find_one({"_id": STATS_DOC_ID}, {"_id": 0})
+        if doc is None:
+            doc = await self.reconcile()
+        return doc
+
+    async def reset(self):
+        await self.collection.replace_one(
+            {"_id": STATS_DOC_ID},
+            {"total": 0, "status": {}, "endpoints": {}, "integrations": {}, "updated_at": datetime.now(timezone.utc)},
+            upsert=True
+        )
+
+    async def _count(self, query: Dict[str, Any]) -> Counter:
+        """Counter increments for the logs matching query"""
+        pipeline = [
+            {"$match": query},
+            {"$group": {
+                "_id": {"endpoint_id": "$endpoint_id", "integration": "$integration", "status": "$status"},
+                "count": {"$sum": 1}
+            }}
+        ]
+        counts = Counter()
+        async for group in self.db.webhook_logs.aggregate(pipeline, allowDiskUse=True):
+            counts.update(self._increments([group['_id']], sign=group['count']))
+        return counts
+
+    @staticmethod
+    def _flatten(doc: Dict[str, Any]) -> Counter:
+        """The counter fields of a stats document as dotted increments"""
+        counts = Counter({'total': doc.get('total', 0)})
+        for status, count in doc.get('status', {}).items():
+            counts[f'status.{status}'] = count
+        for section in ('endpoints', 'integrations'):
+            for name, entry in doc.get(section, {}).items():
+                counts[f'{section}.{name}.total'] = entry.get('total', 0)
+                for status, count in entry.get('status', {}).items():
+                    counts[f'{section}.{name}.status.{status}'] = count
+        return counts
+
+    async def reconcile(self) -> Dict[str, Any]:
+        """
+        Recount webhook_logs and correct the counters with a delta, so
+        increments applied by the listener meanwhile are kept. The slow
+        recount covers logs older than the settle window, which the listener
+        has long finished with; the recent logs are counted right after the
+        counters are read.
+        """
+        fence = datetime.now(timezone.utc) - timedelta(seconds=self.settle_seconds)
+        expected = await self._count({"timestamp": {"$not": {"$gte": fence}}})
+
+        current = await self.collection.find_one({"_id": STATS_DOC_ID}, {"_id": 0}) or {}
+        expected.update(await self._count({"timestamp": {"$gte": fence}}))
+
+        # Drop counters of endpoints that are not registered (deleted, or
+        # recorded before unknown ids were folded into one key)
+        stale = [name for name in current.get('endpoints', {})
+                 if name != UNKNOWN and endpoint_field_name(name, self.known_endpoint) == UNKNOWN]
+        stale_prefixes = tuple(f'endpoints.{name}.' for name in stale)
+
+        recorded = self._flatten(current)
+        delta = {field: expected[field] - recorded[field] for field in set(expected) | set(recorded)
+                 if not field.startswith(stale_prefixes)}
+        delta = {field: value for field, value in delta.items() if value}
+        now = datetime.now(timezone.utc)
+        update = {"$set": {"updated_at": now, "reconciled_at": now}}
+        if delta:
+            update["$inc"] = delta
+        if stale:
+            update["$unset"] = {f'endpoints.{name}': "" for name in stale}
+        doc = await self.collection.find_one_and_update(
+            {"_id": STATS_DOC_ID},
+            update,
+            upsert=True,
+            projection={"_id": 0},
+            return_document=ReturnDocument.AFTER
+        )
+        logger.info(f"Dashboard stats reconciled ({doc.get('total', 0)} logs, {len(delta)} counters corrected)")
+        return doc
+
+    def start(self):
+        """Start the periodic background recount"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._reconcile_loop())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _reconcile_loop(self):
+        while True:
+            await asyncio.sleep(self.reconcile_interval)
+            try:
+                await self.reconcile()
+            except PyMongoError as e:
+                logger.error(f"Dashboard stats reconcile failed: {e}")
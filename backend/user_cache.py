@@ -0,0 +1,40 @@
+"""
+User Cache Module
+Caches user principals by id so authenticated requests do not query users
+on every call. Entries expire after a short TTL and are dropped whenever a
+user is created, deleted or changes password; the token_version stored on
+the user lets tokens issued before a password change be rejected.
+"""
+
+import time
+import logging
+from typing import Dict, Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class UserCache:
+    """TTL cache of user documents (without password_hash) keyed by user id"""
+
+    def __init__(self, db, ttl: float = 30.0):
+        self.db = db
+        self.ttl = ttl
+        self._entries: Dict[str, Tuple[float, Optional[Dict[str, Any]]]] = {}
+
+    async def get(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Return the user, or None if it does not exist (misses are cached too)"""
+        entry = self._entries.get(user_id)
+        now = time.monotonic()
+        if entry and entry[0] > now:
+            return entry[1]
+
+        user = await self.db.users.find_one({"id": user_id}, {"_id": 0, "password_hash": 0})
+        self._entries[user_id] = (now + self.ttl, user)
+        return user
+
+    def invalidate(self, user_id: Optional[str] = None):
+        """Drop one user (or everything) from the cache"""
+        if user_id is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(user_id, None)
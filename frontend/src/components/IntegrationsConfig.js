@@ -14,7 +14,7 @@ const IntegrationsConfig = () => {
   const [discordConfig, setDiscordConfig] = useState({ webhook_url: '' });
   const [slackConfig, setSlackConfig] = useState({ webhook_url: '' });
   const [telegramConfig, setTelegramConfig] = useState({ bot_token: '', chat_id: '' });
-  const [syslogConfig, setSyslogConfig] = useState({ host: '', port: 514, protocol: 'udp', enabled: true });
+  const [syslogConfig, setSyslogConfig] = useState({ host: '', port: 514, protocol: 'udp', framing: 'non_transparent', enabled: true });
   const [testing, setTesting] = useState({});
   const [saving, setSaving] = useState({});
 
@@ -105,9 +105,24 @@ const IntegrationsConfig = () => {
               <SelectContent>
                 <SelectItem value="udp">UDP (Standard)</SelectItem>
                 <SelectItem value="tcp">TCP (Reliable)</SelectItem>
+                <SelectItem value="tls">TLS (Encrypted)</SelectItem>
               </SelectContent>
             </Select>
           </div>
+          {syslogConfig.protocol !== 'udp' && (
+            <div>
+              <Label htmlFor="syslog-framing">Framing</Label>
+              <Select value={syslogConfig.framing} onValueChange={(val) => setSyslogConfig({ ...syslogConfig, framing: val })}>
+                <SelectTrigger>
+                  <SelectValue />
+                </SelectTrigger>
+                <SelectContent>
+                  <SelectItem value="non_transparent">Newline terminated</SelectItem>
+                  <SelectItem value="octet_counting">Octet counting (RFC 6587)</SelectItem>
+                </SelectContent>
+              </Select>
+            </div>
+          )}
           <div className="flex space-x-2">
             <Button onClick={testSyslog} variant="outline" disabled={testing.syslog}>
               {testing.syslog ? 'Testing...' : 'Test Connection'}
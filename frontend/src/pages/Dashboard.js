@@ -29,6 +29,18 @@ const Dashboard = () => {
     }
   };
 
+  const handleLogClick = async (log) => {
+    setSelectedLog(log);
+    setDialogOpen(true);
+    // Recent activity omits payloads; fetch the full entry on demand
+    try {
+      const response = await axios.get(`${API}/webhooks/logs/${log.id}`);
+      setSelectedLog(response.data);
+    } catch (error) {
+      toast.error('Failed to load log details');
+    }
+  };
+
   if (loading) {
     return (
       <div className="flex items-center justify-center h-64">
@@ -111,10 +123,7 @@ const Dashboard = () => {
                 <div
                   key={log.id}
                   className="flex items-center justify-between p-4 rounded-lg bg-white dark:bg-gray-800 border border-gray-200 dark:border-gray-700 hover:border-blue-300 dark:hover:border-blue-600 cursor-pointer transition-colors"
-                  onClick={() => {
-                    setSelectedLog(log);
-                    setDialogOpen(true);
-                  }}
+                  onClick={() => handleLogClick(log)}
                   data-testid="activity-log-item"
                 >
                   <div className="flex items-center space-x-4">
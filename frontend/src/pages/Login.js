@@ -50,15 +50,17 @@ const Login = ({ setUser }) => {
     setLoading(true);
 
     try {
-      await axios.post(
+      const changeResponse = await axios.post(
         `${API}/auth/change-password`,
         { old_password: oldPassword, new_password: newPassword },
         { headers: { Authorization: `Bearer ${tempToken}` } }
       );
 
-      localStorage.setItem('token', tempToken);
+      // Changing the password revokes the old token
+      const newToken = changeResponse.data.token;
+      localStorage.setItem('token', newToken);
       const response = await axios.get(`${API}/auth/me`, {
-        headers: { Authorization: `Bearer ${tempToken}` }
+        headers: { Authorization: `Bearer ${newToken}` }
       });
       setUser(response.data);
       toast.success('Password changed successfully!');
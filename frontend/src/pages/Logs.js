@@ -4,6 +4,7 @@ import { API } from '../App';
 import { Card, CardContent, CardHeader, CardTitle } from '../components/ui/card';
 import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from '../components/ui/select';
 import { Button } from '../components/ui/button';
+import { Input } from '../components/ui/input';
 import { Dialog, DialogContent, DialogDescription, DialogHeader, DialogTitle } from '../components/ui/dialog';
 import { toast } from 'sonner';
 import { Download, FileText, CheckCircle, XCircle, AlertCircle, RefreshCw, Trash2 } from 'lucide-react';
@@ -13,6 +14,11 @@ const Logs = () => {
   const [endpoints, setEndpoints] = useState([]);
   const [selectedEndpoint, setSelectedEndpoint] = useState('all');
   const [selectedIntegration, setSelectedIntegration] = useState('all');
+  const [selectedStatus, setSelectedStatus] = useState('all');
+  const [searchInput, setSearchInput] = useState('');
+  const [search, setSearch] = useState('');
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [integrations, setIntegrations] = useState([]);
   const [loading, setLoading] = useState(true);
   const [refreshing, setRefreshing] = useState(false);
@@ -20,6 +26,7 @@ const Logs = () => {
   const [dialogOpen, setDialogOpen] = useState(false);
   const [retrying, setRetrying] = useState(false);
   const [deleting, setDeleting] = useState(false);
+  const [bulkRetryJob, setBulkRetryJob] = useState(null);
 
   const getModeLabel = (mode) => {
     const modeLabels = {
@@ -54,7 +61,7 @@ const Logs = () => {
 
   useEffect(() => {
     fetchLogs();
-  }, [selectedEndpoint, selectedIntegration]);
+  }, [selectedEndpoint, selectedIntegration, selectedStatus, search]);
 
   const fetchEndpoints = async () => {
     try {
@@ -75,7 +82,7 @@ const Logs = () => {
     }
   };
 
-  const fetchLogs = async () => {
+  const fetchLogs = async (cursor = null) => {
     try {
       let url = `${API}/webhooks/logs?limit=100`;
       
@@ -87,8 +94,21 @@ const Logs = () => {
         url += `&integration=${selectedIntegration}`;
       }
       
+      if (selectedStatus !== 'all') {
+        url += `&status=${selectedStatus}`;
+      }
+      
+      if (search) {
+        url += `&search=${encodeURIComponent(search)}`;
+      }
+      
+      if (cursor) {
+        url += `&cursor=${cursor}`;
+      }
+      
       const response = await axios.get(url);
-      setLogs(response.data);
+      setLogs(cursor ? (prev) => [...prev, ...response.data] : response.data);
+      setNextCursor(response.headers['x-next-cursor'] || null);
     } catch (error) {
       toast.error('Failed to fetch logs');
     } finally {
@@ -96,6 +116,12 @@ const Logs = () => {
     }
   };
 
+  const handleLoadMore = async () => {
+    setLoadingMore(true);
+    await fetchLogs(nextCursor);
+    setLoadingMore(false);
+  };
+
   const handleRefresh = async () => {
     setRefreshing(true);
     try {
@@ -133,9 +159,16 @@ const Logs = () => {
     toast.success('CSV exported successfully');
   };
 
-  const handleLogClick = (log) => {
+  const handleLogClick = async (log) => {
     setSelectedLog(log);
     setDialogOpen(true);
+    // The list omits payloads; fetch the full entry on demand
+    try {
+      const response = await axios.get(`${API}/webhooks/logs/${log.id}`);
+      setSelectedLog(response.data);
+    } catch (error) {
+      toast.error('Failed to load log details');
+    }
   };
 
   const handleClearLogs = async () => {
@@ -165,6 +198,47 @@ const Logs = () => {
     }
   };
 
+  const pollBulkRetry = async (jobId) => {
+    try {
+      const response = await axios.get(`${API}/webhooks/logs/retry-bulk/${jobId}`);
+      const job = response.data;
+      setBulkRetryJob(job);
+      if (job.status === 'running') {
+        setTimeout(() => pollBulkRetry(jobId), 2000);
+        return;
+      }
+      setBulkRetryJob(null);
+      toast.success(`Bulk retry ${job.status}: ${job.succeeded} succeeded, ${job.failed} failed, ${job.skipped} skipped`);
+      fetchLogs();
+    } catch (error) {
+      setBulkRetryJob(null);
+      toast.error('Failed to fetch bulk retry progress');
+    }
+  };
+
+  const handleBulkRetry = async () => {
+    if (!window.confirm('Retry all failed webhooks matching the current filters?')) return;
+    
+    const filters = {};
+    if (selectedEndpoint !== 'all') {
+      filters.endpoint_id = selectedEndpoint;
+    }
+    if (selectedIntegration !== 'all') {
+      filters.integration = selectedIntegration;
+    }
+    
+    try {
+      const response = await axios.post(`${API}/webhooks/logs/retry-bulk`, filters);
+      toast.success(response.data.message);
+      if (response.data.total > 0) {
+        setBulkRetryJob({ id: response.data.job_id, total: response.data.total, processed: 0 });
+        pollBulkRetry(response.data.job_id);
+      }
+    } catch (error) {
+      toast.error(error.response?.data?.detail || 'Failed to start bulk retry');
+    }
+  };
+
   const handleDeleteLog = async (logId) => {
     if (!window.confirm('Are you sure you want to delete this log entry?')) return;
     
@@ -234,6 +308,15 @@ const Logs = () => {
             <RefreshCw className={`h-4 w-4 mr-2 ${refreshing ? 'animate-spin' : ''}`} />
             {refreshing ? 'Refreshing...' : 'Refresh'}
           </Button>
+          <Button 
+            onClick={handleBulkRetry}
+            disabled={bulkRetryJob !== null}
+            variant="outline"
+            className="btn-transition text-orange-600 border-orange-300"
+          >
+            <RefreshCw className={`h-4 w-4 mr-2 ${bulkRetryJob ? 'animate-spin' : ''}`} />
+            {bulkRetryJob ? `Retrying ${bulkRetryJob.processed}/${bulkRetryJob.total}` : 'Retry Failed'}
+          </Button>
           <Button 
             onClick={handleDeleteAllFailed}
             disabled={deleting}
@@ -292,6 +375,27 @@ const Logs = () => {
                 </SelectContent>
               </Select>
               
+              <Select value={selectedStatus} onValueChange={setSelectedStatus}>
+                <SelectTrigger className="w-40">
+                  <SelectValue placeholder="Filter by Status" />
+                </SelectTrigger>
+                <SelectContent>
+                  <SelectItem value="all">All Statuses</SelectItem>
+                  <SelectItem value="success">Success</SelectItem>
+                  <SelectItem value="failed">Failed</SelectItem>
+                  <SelectItem value="unauthorized">Unauthorized</SelectItem>
+                  <SelectItem value="queued">Queued</SelectItem>
+                </SelectContent>
+              </Select>
+              
+              <Input
+                className="w-64"
+                placeholder="Search responses..."
+                value={searchInput}
+                onChange={(e) => setSearchInput(e.target.value)}
+                onKeyDown={(e) => e.key === 'Enter' && setSearch(searchInput.trim())}
+              />
+              
               <Button 
                 onClick={handleMigrateLogs}
                 variant="outline"
@@ -429,6 +533,17 @@ const Logs = () => {
                   ))}
                 </tbody>
               </table>
+              {nextCursor && (
+                <div className="flex justify-center p-4">
+                  <Button
+                    onClick={handleLoadMore}
+                    disabled={loadingMore}
+                    variant="outline"
+                  >
+                    {loadingMore ? 'Loading...' : 'Load More'}
+                  </Button>
+                </div>
+              )}
             </div>
           ) : (
             <div className="text-center py-12 text-gray-500">
@@ -72,11 +72,14 @@ const Profile = ({ user }) => {
 
     setChangingPassword(true);
     try {
-      await axios.post(`${API}/auth/change-password`, {
+      const response = await axios.post(`${API}/auth/change-password`, {
         old_password: passwordData.old_password,
         new_password: passwordData.new_password
       });
       
+      // Changing the password revokes the old token
+      localStorage.setItem('token', response.data.token);
+      
       toast.success('Password changed successfully!');
       
       // Clear form
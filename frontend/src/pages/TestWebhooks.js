@@ -140,16 +140,52 @@ const TestWebhooks = () => {
     }
   };
 
+  const signatureHeader = (endpoint) => endpoint.signature_header || 'X-Webhook-Signature';
+
+  // Auth headers for the endpoint's auth_mode; HMAC modes sign the exact body sent
+  const authHeaders = async (endpoint, body) => {
+    const authMode = endpoint.auth_mode || 'token';
+    if (authMode === 'token') {
+      return { 'X-Webhook-Token': endpoint.secret_token };
+    }
+    const encoder = new TextEncoder();
+    const key = await crypto.subtle.importKey(
+      'raw', encoder.encode(endpoint.secret_token), { name: 'HMAC', hash: 'SHA-256' }, false, ['sign']
+    );
+    const timestamp = Math.floor(Date.now() / 1000);
+    const signed = authMode === 'hmac_sha256_timestamp' ? `${timestamp}.${body}` : body;
+    const digest = await crypto.subtle.sign('HMAC', key, encoder.encode(signed));
+    const hex = Array.from(new Uint8Array(digest)).map((b) => b.toString(16).padStart(2, '0')).join('');
+    const value = authMode === 'hmac_sha256_timestamp' ? `t=${timestamp},v1=${hex}` : `sha256=${hex}`;
+    return { [signatureHeader(endpoint)]: value };
+  };
+
   const generateCurlCommand = () => {
     if (!selectedEndpoint) return;
     
     const url = `${window.location.origin}/api/hooks/${selectedEndpoint.path}`;
     const token = selectedEndpoint.secret_token;
+    const body = payload.replace(/\n/g, ' ').replace(/\s+/g, ' ');
+    const authMode = selectedEndpoint.auth_mode || 'token';
     
-    const command = `curl -X POST '${url}' \\
+    let command;
+    if (authMode === 'token') {
+      command = `curl -X POST '${url}' \\
   -H 'X-Webhook-Token: ${token}' \\
   -H 'Content-Type: application/json' \\
-  -d '${payload.replace(/\n/g, ' ').replace(/\s+/g, ' ')}'`;
+  -d '${body}'`;
+    } else {
+      const hmac = (input) => `$(printf '%s' ${input} | openssl dgst -sha256 -hmac '${token}' | sed 's/^.* //')`;
+      const signature = authMode === 'hmac_sha256_timestamp'
+        ? `t=$TS,v1=${hmac('"$TS.$BODY"')}`
+        : `sha256=${hmac('"$BODY"')}`;
+      command = `BODY='${body}'
+TS=$(date +%s)
+curl -X POST '${url}' \\
+  -H "${signatureHeader(selectedEndpoint)}: ${signature}" \\
+  -H 'Content-Type: application/json' \\
+  -d "$BODY"`;
+    }
     
     setCurlCommand(command);
   };
@@ -167,10 +203,12 @@ const TestWebhooks = () => {
       const parsedPayload = JSON.parse(payload);
       const url = `${window.location.origin}/api/hooks/${selectedEndpoint.path}`;
       
+      const body = JSON.stringify(parsedPayload);
+      
       const startTime = Date.now();
-      const result = await axios.post(url, parsedPayload, {
+      const result = await axios.post(url, body, {
         headers: {
-          'X-Webhook-Token': selectedEndpoint.secret_token,
+          ...(await authHeaders(selectedEndpoint, body)),
           'Content-Type': 'application/json'
         }
       });
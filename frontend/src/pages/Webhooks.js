@@ -52,7 +52,15 @@ const Webhooks = () => {
     sendgrid_list_id: '',
     sendgrid_template_id: '',
     email_from: '',
-    email_from_name: ''
+    email_from_name: '',
+    delivery_mode: 'sync',
+    contact_batching: false,
+    max_logged_payload_bytes: null,
+    max_body_bytes: null,
+    retry_policy: null,
+    auth_mode: 'token',
+    signature_header: null,
+    signature_tolerance_seconds: null
   });
 
   useEffect(() => {
@@ -172,7 +180,15 @@ const Webhooks = () => {
       sendgrid_list_id: '',
       sendgrid_template_id: '',
       email_from: '',
-      email_from_name: ''
+      email_from_name: '',
+      delivery_mode: 'sync',
+      contact_batching: false,
+      max_logged_payload_bytes: null,
+      max_body_bytes: null,
+      retry_policy: null,
+      auth_mode: 'token',
+      signature_header: null,
+      signature_tolerance_seconds: null
     });
     setTemplateKeys([]);
   };
@@ -217,7 +233,15 @@ const Webhooks = () => {
       sendgrid_list_id: endpoint.sendgrid_list_id || '',
       sendgrid_template_id: endpoint.sendgrid_template_id || '',
       email_from: endpoint.email_from || '',
-      email_from_name: endpoint.email_from_name || ''
+      email_from_name: endpoint.email_from_name || '',
+      delivery_mode: endpoint.delivery_mode || 'sync',
+      contact_batching: endpoint.contact_batching || false,
+      max_logged_payload_bytes: endpoint.max_logged_payload_bytes || null,
+      max_body_bytes: endpoint.max_body_bytes || null,
+      retry_policy: endpoint.retry_policy || null,
+      auth_mode: endpoint.auth_mode || 'token',
+      signature_header: endpoint.signature_header || null,
+      signature_tolerance_seconds: endpoint.signature_tolerance_seconds || null
     });
     // Fetch template keys if template is selected
     if (endpoint.sendgrid_template_id) {
@@ -258,7 +282,15 @@ const Webhooks = () => {
       sendgrid_list_id: endpoint.sendgrid_list_id || '',
       sendgrid_template_id: endpoint.sendgrid_template_id || '',
       email_from: endpoint.email_from || '',
-      email_from_name: endpoint.email_from_name || ''
+      email_from_name: endpoint.email_from_name || '',
+      delivery_mode: endpoint.delivery_mode || 'sync',
+      contact_batching: endpoint.contact_batching || false,
+      max_logged_payload_bytes: endpoint.max_logged_payload_bytes || null,
+      max_body_bytes: endpoint.max_body_bytes || null,
+      retry_policy: endpoint.retry_policy || null,
+      auth_mode: endpoint.auth_mode || 'token',
+      signature_header: endpoint.signature_header || null,
+      signature_tolerance_seconds: endpoint.signature_tolerance_seconds || null
     });
     setEditingEndpoint(null); // Set to null so it creates new instead of editing
     setDialogOpen(true);
@@ -490,6 +522,132 @@ const Webhooks = () => {
                 </Select>
               </div>
 
+              <div className="space-y-2">
+                <Label htmlFor="delivery_mode">Delivery</Label>
+                <Select
+                  value={formData.delivery_mode}
+                  onValueChange={(value) => setFormData({ ...formData, delivery_mode: value })}
+                >
+                  <SelectTrigger data-testid="webhook-delivery-mode-select">
+                    <SelectValue />
+                  </SelectTrigger>
+                  <SelectContent>
+                    <SelectItem value="sync">Synchronous: respond after delivery</SelectItem>
+                    <SelectItem value="async">Asynchronous: queue and respond 202 immediately</SelectItem>
+                  </SelectContent>
+                </Select>
+              </div>
+
+              {formData.mode === 'add_contact' && (
+                <div className="flex items-center space-x-2">
+                  <Checkbox
+                    id="contact_batching"
+                    checked={formData.contact_batching}
+                    onCheckedChange={(checked) => setFormData({ ...formData, contact_batching: checked === true })}
+                  />
+                  <Label htmlFor="contact_batching">Batch contacts into shared SendGrid upserts</Label>
+                </div>
+              )}
+
+              <div className="space-y-2">
+                <Label htmlFor="auth_mode">Authentication</Label>
+                <Select
+                  value={formData.auth_mode}
+                  onValueChange={(value) => setFormData({ ...formData, auth_mode: value })}
+                >
+                  <SelectTrigger data-testid="webhook-auth-mode-select">
+                    <SelectValue />
+                  </SelectTrigger>
+                  <SelectContent>
+                    <SelectItem value="token">Secret token (X-Webhook-Token header)</SelectItem>
+                    <SelectItem value="hmac_sha256">HMAC-SHA256 body signature (sha256=&lt;hex&gt;)</SelectItem>
+                    <SelectItem value="hmac_sha256_timestamp">HMAC-SHA256 timestamped signature (t=&lt;unix&gt;,v1=&lt;hex&gt;)</SelectItem>
+                  </SelectContent>
+                </Select>
+                {formData.auth_mode !== 'token' && (
+                  <p className="text-xs text-gray-500 dark:text-gray-400">
+                    Signatures are computed over the raw request body with the endpoint's secret token as the key
+                  </p>
+                )}
+              </div>
+
+              {formData.auth_mode !== 'token' && (
+                <div className="grid grid-cols-2 gap-4">
+                  <div className="space-y-2">
+                    <Label htmlFor="signature_header">Signature Header</Label>
+                    <Input
+                      id="signature_header"
+                      placeholder="X-Webhook-Signature"
+                      value={formData.signature_header ?? ''}
+                      onChange={(e) => setFormData({ ...formData, signature_header: e.target.value || null })}
+                    />
+                  </div>
+                  {formData.auth_mode === 'hmac_sha256_timestamp' && (
+                    <div className="space-y-2">
+                      <Label htmlFor="signature_tolerance_seconds">Timestamp Tolerance (seconds)</Label>
+                      <Input
+                        id="signature_tolerance_seconds"
+                        type="number"
+                        min="1"
+                        placeholder="300"
+                        value={formData.signature_tolerance_seconds ?? ''}
+                        onChange={(e) => setFormData({ ...formData, signature_tolerance_seconds: e.target.value ? parseInt(e.target.value, 10) : null })}
+                      />
+                    </div>
+                  )}
+                </div>
+              )}
+
+              <div className="space-y-2">
+                <Label htmlFor="retry_max_attempts">Max Delivery Attempts</Label>
+                <Input
+                  id="retry_max_attempts"
+                  type="number"
+                  min="1"
+                  placeholder="Server default"
+                  value={formData.retry_policy?.max_attempts ?? ''}
+                  onChange={(e) => setFormData({
+                    ...formData,
+                    retry_policy: e.target.value
+                      ? { ...(formData.retry_policy || {}), max_attempts: parseInt(e.target.value, 10) }
+                      : null
+                  })}
+                />
+                <p className="text-xs text-gray-500 dark:text-gray-400">
+                  Failed deliveries are retried with exponential backoff; exhausted ones go to dead letters. Set 1 to disable retries
+                </p>
+              </div>
+
+              <div className="space-y-2">
+                <Label htmlFor="max_logged_payload_bytes">Max Logged Payload Size (bytes)</Label>
+                <Input
+                  id="max_logged_payload_bytes"
+                  type="number"
+                  min="0"
+                  placeholder="Server default"
+                  value={formData.max_logged_payload_bytes ?? ''}
+                  onChange={(e) => setFormData({ ...formData, max_logged_payload_bytes: e.target.value ? parseInt(e.target.value, 10) : null })}
+                />
+                <p className="text-xs text-gray-500 dark:text-gray-400">
+                  Larger payloads are compressed in the logs; payloads still above this size keep only a summary
+                </p>
+              </div>
+
+              <div className="space-y-2">
+                <Label htmlFor="max_body_bytes">Max Request Body Size (bytes)</Label>
+                <Input
+                  id="max_body_bytes"
+                  type="number"
+                  min="1"
+                  placeholder="Server default"
+                  value={formData.max_body_bytes ?? ''}
+                  onChange={(e) => setFormData({ ...formData, max_body_bytes: e.target.value ? parseInt(e.target.value, 10) : null })}
+                />
+                <p className="text-xs text-gray-500 dark:text-gray-400">
+                  Requests with a larger body are rejected with 413 Payload Too Large
+                </p>
+              </div>
+
               {/* Dynamic Field Mapping - Only for SendGrid modes */}
               {(formData.mode === 'add_contact' || formData.mode === 'send_email') && (
               <div className="space-y-3">